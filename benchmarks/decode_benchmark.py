@@ -0,0 +1,81 @@
+"""Compare the compiled decoders with the old field-by-field `weak_structure` loop,
+and eager `Market`s with `LazyMarket`s when only a few fields are read.
+
+Run with:
+```
+python benchmarks/decode_benchmark.py
+```
+"""
+import timeit
+from typing import Any, Type
+
+from manifoldpy import api
+
+N = 100_000
+
+
+def field_loop(json: dict, cls: Type[Any]) -> Any:
+    """The previous implementation of `weak_structure`."""
+    fields = {}
+    for f in cls.__attrs_attrs__:
+        fields[f.name] = json.get(f.name, f.default)
+    return cls(**fields)
+
+
+def bet_json(i: int) -> dict:
+    return {
+        "id": f"b{i}",
+        "contractId": f"c{i % 100}",
+        "userId": f"u{i % 1000}",
+        "createdTime": 1_600_000_000_000 + i,
+        "shares": 10.0,
+        "amount": 5,
+        "probAfter": 0.51,
+        "probBefore": 0.5,
+        "outcome": "YES",
+        "answerId": None,
+        "isFilled": True,
+        "isCancelled": False,
+        "limitProb": 0.55,
+        "fees": {"creatorFee": 0, "platformFee": 0, "liquidityFee": 0},
+        "fills": [{"amount": 5, "shares": 10.0, "timestamp": 1_600_000_000_000 + i}],
+    }
+
+
+def market_json(i: int) -> dict:
+    json = {f.name: None for f in api.Market.__attrs_attrs__}  # type: ignore
+    json.update(
+        id=f"c{i}",
+        createdTime=1_600_000_000_000 + i,
+        probability=0.5,
+        description={"type": "doc", "content": [{"type": "paragraph", "text": "x" * 200}] * 5},
+        bets=[bet_json(i * 10 + j) for j in range(10)],
+    )
+    return json
+
+
+def main() -> None:
+    records = [bet_json(i) for i in range(N)]
+    decode = api.decoder(api.Bet)
+    assert [decode(r) for r in records[:100]] == [field_loop(r, api.Bet) for r in records[:100]]
+    for name, fn in (
+        ("field loop", lambda: [field_loop(r, api.Bet) for r in records]),
+        ("compiled", lambda: [decode(r) for r in records]),
+    ):
+        best = min(timeit.repeat(fn, number=1, repeat=5))
+        print(f"{name:>10}: {best:.3f}s for {N} bets ({N / best:,.0f} bets/s)")
+
+    markets = [market_json(i) for i in range(N // 10)]
+    for name, cls in (("eager", api.Market), ("lazy", api.LazyMarket)):
+        # from_json replaces the nested bets, so each run gets fresh copies
+        copies = [[dict(m) for m in markets] for _ in range(5)]
+        times = []
+        for batch in copies:
+            start = timeit.default_timer()
+            sum(m.probability for m in map(cls.from_json, batch) if m.id)
+            times.append(timeit.default_timer() - start)
+        print(f"{name:>10}: {min(times):.3f}s for {len(markets)} full markets, reading id and probability")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""Benchmark suite, run against a local stand-in for the API (see `standin.py`), so results are repeatable.
+
+Measures pagination throughput, decode cost per object, full-market fetch rate and order round-trip latency,
+and compares them with a saved baseline. Results more than `--threshold` worse than the baseline are flagged.
+
+Run with:
+```
+python benchmarks/run.py --save     # record a baseline on this machine
+python benchmarks/run.py --check    # compare with it, exiting with an error on regressions
+```
+"""
+import argparse
+import json
+import multiprocessing
+import sys
+import time
+import timeit
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from standin import StandIn
+
+from manifoldpy import api, orders, retry, transport
+from manifoldpy.metrics import LatencyHistogram
+
+BASELINE = Path(__file__).parent / "baseline.json"
+
+Result = Dict[str, Any]
+
+
+def _serve(kwargs: Dict[str, Any], urls: Any, stop: Any) -> None:
+    with StandIn(**kwargs) as server:
+        urls.put(server.url)
+        stop.wait()
+
+
+class StandInProcess:
+    """Runs a `StandIn` in its own process, so serving requests doesn't compete with the client for the GIL."""
+
+    def __init__(self, **kwargs: Any) -> None:
+        ctx = multiprocessing.get_context("spawn")
+        urls = ctx.Queue()
+        self._stop = ctx.Event()
+        self._process = ctx.Process(target=_serve, args=(kwargs, urls, self._stop), daemon=True)
+        self._process.start()
+        self.url: str = urls.get(timeout=120)
+
+    def __enter__(self) -> "StandInProcess":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self._stop.set()
+        self._process.join()
+
+
+def use(url: str, **kwargs: Any) -> transport.Transport:
+    """Send every request to a stand-in, retrying injected errors quickly."""
+    t = transport.Transport(
+        base_url=url,
+        pool_maxsize=32,
+        retry=retry.RetryPolicy(max_attempts=10, backoff=0.001, max_backoff=0.01),
+        **kwargs,
+    )
+    transport.set_transport(t)
+    return t
+
+
+def higher(value: float, unit: str) -> Result:
+    return {"value": value, "unit": unit, "better": "higher"}
+
+
+def lower(value: float, unit: str) -> Result:
+    return {"value": value, "unit": unit, "better": "lower"}
+
+
+def best_of(fn: Callable[[], Any], repeat: int = 5) -> float:
+    return min(timeit.repeat(fn, number=1, repeat=repeat))
+
+
+def bench_pagination(url: str) -> Dict[str, Result]:
+    use(url)
+    n_bets = sum(1 for _ in api.iter_bets())
+    n_markets = sum(1 for _ in api.iter_markets())
+    return {
+        "paginate_bets": higher(n_bets / best_of(lambda: sum(1 for _ in api.iter_bets())), "bets/s"),
+        "paginate_markets": higher(
+            n_markets / best_of(lambda: sum(1 for _ in api.iter_markets())), "markets/s"
+        ),
+        "paginate_markets_lazy": higher(
+            n_markets / best_of(lambda: sum(1 for _ in api.iter_markets(lazy=True))), "markets/s"
+        ),
+    }
+
+
+def bench_pagination_errors(url: str) -> Dict[str, Result]:
+    use(url)
+    n_bets = sum(1 for _ in api.iter_bets())
+    return {
+        "paginate_bets_with_errors": higher(
+            n_bets / best_of(lambda: sum(1 for _ in api.iter_bets())), "bets/s"
+        )
+    }
+
+
+def bench_decode(url: str) -> Dict[str, Result]:
+    use(url)
+    records = {
+        "bet": (api.Bet, api._get_bets(limit=1000)),
+        "market": (api.Market, api._get_markets(limit=1000)),
+        "comment": (api.Comment, api._get_comments(marketId=api._get_markets(limit=1)[0]["id"])),
+    }
+    results = {}
+    for name, (cls, json_records) in records.items():
+        decode = api.decoder(cls)
+        batch = json_records * max(1, 20_000 // len(json_records))
+        seconds = best_of(lambda: [decode(r) for r in batch])
+        results[f"decode_{name}"] = lower(seconds / len(batch) * 1e6, "us/object")
+    return results
+
+
+def bench_full_markets(url: str, n: int = 200) -> Dict[str, Result]:
+    use(url)
+    ids = [m["id"] for m in api._get_markets(limit=n)]
+    seconds = best_of(lambda: list(api.get_full_markets(ids, max_workers=16)), repeat=2)
+    return {"full_markets": higher(len(ids) / seconds, "markets/s")}
+
+
+def bench_orders(url: str, n: int = 500) -> Dict[str, Result]:
+    t = use(url)
+    wrapper = api.APIWrapper("benchmark", transport=t)
+    sender = orders.BetSender("benchmark", transport=t)
+    sender.warm()
+    for _ in range(n):
+        sender.make_bet(10, "m000000", "YES", limitProb=0.5)
+    wrapper_latency = LatencyHistogram()
+    for _ in range(n):
+        start = time.perf_counter()
+        wrapper.make_bet(10, "m000000", "YES", limitProb=0.5)
+        wrapper_latency.record(time.perf_counter() - start)
+    return {
+        "order_p50": lower(sender.histogram.percentile(0.5) * 1000, "ms"),
+        "order_p99": lower(sender.histogram.percentile(0.99) * 1000, "ms"),
+        "order_wrapper_p50": lower(wrapper_latency.percentile(0.5) * 1000, "ms"),
+        "order_wrapper_p99": lower(wrapper_latency.percentile(0.99) * 1000, "ms"),
+    }
+
+
+# Each benchmark, with the stand-in settings it runs against
+BENCHMARKS: Dict[str, Tuple[Callable[[str], Dict[str, Result]], Dict[str, Any]]] = {
+    "pagination": (bench_pagination, {}),
+    "pagination_errors": (bench_pagination_errors, {"error_rate": 0.05}),
+    "decode": (bench_decode, {}),
+    "full_markets": (bench_full_markets, {"latency": 0.002}),
+    "orders": (bench_orders, {"n_markets": 10}),
+}
+
+
+def run(names: List[str], n_markets: int, bets_per_market: int) -> Dict[str, Result]:
+    results: Dict[str, Result] = {}
+    for name in names:
+        fn, settings = BENCHMARKS[name]
+        kwargs = {"n_markets": n_markets, "bets_per_market": bets_per_market, **settings}
+        with StandInProcess(**kwargs) as server:
+            results.update(fn(server.url))
+    return results
+
+
+def compare(results: Dict[str, Result], baseline: Dict[str, Result], threshold: float) -> List[str]:
+    """Print each result next to its baseline, and return the names of results that regressed."""
+    regressions = []
+    for name, r in results.items():
+        line = f"{name:<28} {r['value']:>12.2f} {r['unit']:<10}"
+        base = baseline.get(name)
+        if base is not None:
+            ratio = r["value"] / base["value"] if base["value"] else float("inf")
+            worse = ratio < 1 - threshold if r["better"] == "higher" else ratio > 1 + threshold
+            line += f" baseline {base['value']:>12.2f} ({ratio - 1:+.0%})"
+            if worse:
+                line += "  REGRESSION"
+                regressions.append(name)
+        print(line)
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("benchmarks", nargs="*", help=f"Benchmarks to run, out of {', '.join(BENCHMARKS)}")
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--save", action="store_true", help="Save the results as the new baseline")
+    parser.add_argument("--check", action="store_true", help="Exit with an error if anything regressed")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown, as a fraction")
+    parser.add_argument("--markets", type=int, default=5000)
+    parser.add_argument("--bets-per-market", type=int, default=20)
+    args = parser.parse_args(argv)
+    unknown = set(args.benchmarks) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"Unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    results = run(args.benchmarks or list(BENCHMARKS), args.markets, args.bets_per_market)
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    regressions = compare(results, baseline, args.threshold)
+    if args.save:
+        args.baseline.write_text(json.dumps({**baseline, **results}, indent=2, sort_keys=True) + "\n")
+        print(f"Saved baseline to {args.baseline}")
+    if regressions:
+        print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1 if args.check else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,249 @@
+"""A local stand-in for the Manifold API, for benchmarking without touching the real one.
+
+Serves `GET /v0/markets`, `/v0/market/{id}`, `/v0/bets` and `/v0/comments` with cursor pagination like the API,
+and accepts `POST /v0/bet` and `/v0/bet/cancel/{id}`. The records are either loaded from a directory of JSON
+files (`markets.json`, `bets.json`, `comments.json`, e.g. saved from real API responses) or generated.
+Every request can be delayed, and a fraction of them can fail with a 503, to exercise retries.
+
+Point the library at it with a transport:
+```
+server = StandIn()
+transport.set_transport(transport.Transport(base_url=server.url))
+```
+"""
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+from urllib.parse import parse_qs, urlsplit
+
+Reply = Tuple[int, Dict[str, str], bytes]
+
+
+def generate(n_markets: int, bets_per_market: int, comments_per_market: int) -> Dict[str, List[dict]]:
+    """Generate markets, bets and comments shaped like real API records, newest first."""
+    rng = random.Random(0)
+    start = 1_650_000_000_000
+    markets, bets, comments = [], [], []
+    for m in range(n_markets):
+        market_id = f"m{m:06d}"
+        created = start + m * 10_000_000
+        markets.append(
+            {
+                "id": market_id,
+                "creatorId": f"u{m % 97}",
+                "creatorUsername": f"user{m % 97}",
+                "creatorName": f"User {m % 97}",
+                "createdTime": created,
+                "creatorAvatarUrl": "https://example.com/avatar.png",
+                "closeTime": created + 30 * 86_400_000,
+                "question": f"Will benchmark market {m} resolve YES?",
+                "url": f"https://manifold.markets/user{m % 97}/market-{m}",
+                "slug": f"market-{m}",
+                "pool": {"NO": 100 + m % 50, "YES": 100 + m % 70},
+                "probability": rng.random(),
+                "p": 0.5,
+                "totalLiquidity": 100,
+                "outcomeType": "BINARY",
+                "mechanism": "cpmm-1",
+                "volume": 1000.0,
+                "volume24Hours": 10.0,
+                "isResolved": False,
+                "uniqueBettorCount": 10,
+                "lastUpdatedTime": created + bets_per_market * 1000,
+                "lastBetTime": created + bets_per_market * 1000,
+            }
+        )
+        prob = 0.5
+        for b in range(bets_per_market):
+            after = min(0.99, max(0.01, prob + rng.uniform(-0.05, 0.05)))
+            bets.append(
+                {
+                    "id": f"b{m:06d}{b:05d}",
+                    "contractId": market_id,
+                    "userId": f"u{rng.randrange(1000)}",
+                    "createdTime": created + (b + 1) * 1000,
+                    "amount": rng.randrange(1, 100),
+                    "shares": rng.uniform(1, 200),
+                    "outcome": rng.choice(("YES", "NO")),
+                    "probBefore": prob,
+                    "probAfter": after,
+                    "answerId": None,
+                    "isFilled": True,
+                    "isCancelled": False,
+                    "limitProb": None,
+                    "fees": {"creatorFee": 0, "platformFee": 0, "liquidityFee": 0},
+                    "fills": [],
+                    "isRedemption": False,
+                }
+            )
+            prob = after
+        for c in range(comments_per_market):
+            comments.append(
+                {
+                    "id": f"c{m:06d}{c:03d}",
+                    "commentId": f"c{m:06d}{c:03d}",
+                    "contractId": market_id,
+                    "contractQuestion": markets[-1]["question"],
+                    "contractSlug": markets[-1]["slug"],
+                    "userId": f"u{c}",
+                    "userName": f"User {c}",
+                    "userUsername": f"user{c}",
+                    "userAvatarUrl": "https://example.com/avatar.png",
+                    "createdTime": created + c * 5000,
+                    "content": {"type": "doc", "content": [{"type": "paragraph", "text": "Nice"}]},
+                    "commentType": "contract",
+                    "visibility": "public",
+                    "isApi": False,
+                }
+            )
+    for records in (markets, bets, comments):
+        records.sort(key=lambda r: r["createdTime"], reverse=True)
+    return {"markets": markets, "bets": bets, "comments": comments}
+
+
+class _Collection:
+    """Records pre-encoded as JSON, with indexes for cursor pagination and per-market filtering."""
+
+    def __init__(self, records: List[dict], key: Optional[str] = None) -> None:
+        self.records = records
+        self.encoded = [json.dumps(r).encode() for r in records]
+        self.position = {r["id"]: i for i, r in enumerate(records)}
+        self.groups: Dict[str, List[int]] = {}
+        if key is not None:
+            for i, r in enumerate(records):
+                self.groups.setdefault(r[key], []).append(i)
+
+    def page(self, group: Optional[str], limit: int, before: Optional[str]) -> bytes:
+        rows = range(len(self.records)) if group is None else self.groups.get(group, [])
+        start = 0
+        if before is not None:
+            cursor = self.position.get(before, -1)
+            # Rows are in record order, so the first row after the cursor is found by bisection
+            lo, hi = 0, len(rows)
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if rows[mid] <= cursor:
+                    lo = mid + 1
+                else:
+                    hi = mid
+            start = lo
+        return b"[" + b",".join(self.encoded[i] for i in rows[start : start + limit]) + b"]"
+
+
+class StandIn:
+    """A local HTTP server that imitates the parts of the Manifold API used by the benchmarks.
+
+    Args:
+        data: A directory with `markets.json`, `bets.json` and `comments.json`, or None to generate records.
+        latency: Seconds to wait before answering each request.
+        error_rate: Fraction of requests answered with a 503 (with `Retry-After: 0`).
+        n_markets: Number of markets to generate.
+        bets_per_market: Number of bets to generate per market.
+        comments_per_market: Number of comments to generate per market.
+    """
+
+    def __init__(
+        self,
+        data: Optional[Union[str, Path]] = None,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        n_markets: int = 1000,
+        bets_per_market: int = 100,
+        comments_per_market: int = 5,
+    ) -> None:
+        self.latency = latency
+        self.error_rate = error_rate
+        self._rng = random.Random(1)
+        if data is None:
+            records = generate(n_markets, bets_per_market, comments_per_market)
+        else:
+            records = {
+                name: json.loads((Path(data) / f"{name}.json").read_text())
+                for name in ("markets", "bets", "comments")
+            }
+        self.markets = _Collection(records["markets"])
+        self.bets = _Collection(records["bets"], key="contractId")
+        self.comments = _Collection(records["comments"], key="contractId")
+        self.requests = 0
+        self._bet_ids = 0
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body are written separately, so Nagle's algorithm would hold the body back
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+            def handle_request(self) -> None:
+                parts = urlsplit(self.path)
+                query = {k: v[0] for k, v in parse_qs(parts.query).items()}
+                length = int(self.headers.get("Content-Length") or 0)
+                if length:
+                    self.rfile.read(length)
+                status, headers, body = stand_in.reply(self.command, parts.path, query)
+                self.send_response(status)
+                for k, v in headers.items():
+                    self.send_header(k, v)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = handle_request
+            do_POST = handle_request
+
+        class Server(ThreadingHTTPServer):
+            daemon_threads = True
+            request_queue_size = 128
+
+            def handle_error(self, request: Any, client_address: Any) -> None:
+                pass
+
+        self.httpd = Server(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/v0/"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+
+    def __enter__(self) -> "StandIn":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def reply(self, method: str, path: str, query: Dict[str, str]) -> Reply:
+        """Answer one request."""
+        self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if self.error_rate and self._rng.random() < self.error_rate:
+            return 503, {"Retry-After": "0"}, b'{"message": "Injected error"}'
+        route = path[len("/v0/") :]
+        limit = int(query.get("limit", 1000))
+        before = query.get("before")
+        contract = query.get("contractId")
+        if method == "GET" and route == "markets":
+            return 200, {}, self.markets.page(None, limit, before)
+        elif method == "GET" and route == "bets":
+            return 200, {}, self.bets.page(contract, limit, before)
+        elif method == "GET" and route == "comments":
+            return 200, {}, self.comments.page(contract, limit, before)
+        elif method == "GET" and route.startswith("market/"):
+            i = self.markets.position.get(route[len("market/") :])
+            if i is not None:
+                return 200, {}, self.markets.encoded[i]
+        elif method == "POST" and route == "bet":
+            self._bet_ids += 1
+            return 200, {}, b'{"betId": "new%d"}' % self._bet_ids
+        elif method == "POST" and route.startswith("bet/cancel/"):
+            return 200, {}, b"{}"
+        return 404, {}, b'{"message": "Not found"}'
@@ -1,14 +1,37 @@
 """API bindings"""
-import bisect
-from typing import Any, Dict, List, Literal, Mapping, Optional, Tuple, Type, TypeVar
+import threading
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import partial
+from operator import attrgetter
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Literal,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
 
 import numpy as np
 import numpy.typing as npt
 import requests
 from attr import define, field
 
+from manifoldpy.transport import API_URL, Transport, get_transport
 
-V0_URL = "https://api.manifold.markets/v0/"
+
+V0_URL = API_URL
 
 # GET URLs
 
@@ -39,6 +62,9 @@ RESOLVE_MARKET_URL = V0_URL + "market/{}/resolve"
 SELL_SHARES_URL = V0_URL + "market/{}/sell"
 MAKE_COMMENT_URL = V0_URL + "comment"
 
+# POST endpoints that have the same effect if they're repeated, so they're safe to retry
+IDEMPOTENT_POSTS = (CANCEL_BET_URL, CLOSE_URL, RESOLVE_MARKET_URL)
+
 
 MarketT = TypeVar("MarketT", bound="Market")
 OutcomeType = Literal[
@@ -49,12 +75,61 @@ Visibility = Literal["public", "unlisted"]
 T = TypeVar("T")
 
 
+# How many times each (class name, key) pair was seen in decoded JSON without a matching field
+UNKNOWN_KEYS: Counter = Counter()
+# Decoding runs on several threads at once, e.g. in `_paginate` and `get_full_markets`
+_UNKNOWN_KEYS_LOCK = threading.Lock()
+
+_DECODERS: Dict[type, Callable[[dict], Any]] = {}
+
+
+def _report_unknown(json: dict, cls: type, known: FrozenSet[str]) -> None:
+    unknown = json.keys() - known
+    with _UNKNOWN_KEYS_LOCK:
+        for key in unknown:
+            UNKNOWN_KEYS[(cls.__name__, key)] += 1
+
+
+def compile_decoder(cls: Type[T]) -> Callable[[dict], T]:
+    """Generate a function that builds `cls` from a JSON dict, with the field lookups unrolled.
+    Missing fields get their default, and keys with no matching field are counted in `UNKNOWN_KEYS`.
+    """
+    fields = cls.__attrs_attrs__  # type: ignore
+    namespace: Dict[str, Any] = {
+        "cls": cls,
+        "known": frozenset(f.name for f in fields),
+        "report": _report_unknown,
+    }
+    positional, keyword = [], []
+    for i, f in enumerate(fields):
+        namespace[f"default_{i}"] = f.default
+        lookup = f"get({f.name!r}, default_{i})"
+        if f.kw_only:
+            keyword.append(f"{f.name}={lookup}")
+        else:
+            positional.append(lookup)
+    source = (
+        "def decode(json):\n"
+        "    if not known.issuperset(json):\n"
+        "        report(json, cls, known)\n"
+        "    get = json.get\n"
+        f"    return cls({', '.join(positional + keyword)})\n"
+    )
+    exec(compile(source, f"<{cls.__name__} decoder>", "exec"), namespace)
+    return namespace["decode"]
+
+
+def decoder(cls: Type[T]) -> Callable[[dict], T]:
+    """The compiled decoder for a class, generated on first use."""
+    try:
+        return _DECODERS[cls]
+    except KeyError:
+        return _DECODERS.setdefault(cls, compile_decoder(cls))
+
+
 def weak_structure(json: dict, cls: Type[T]) -> T:
-    fields = {}
-    for f in cls.__attrs_attrs__:  # type: ignore
-        val = json.get(f.name, f.default)
-        fields[f.name] = val
-    return cls(**fields)  # type: ignore
+    """Build an attrs class from a JSON dict. Missing fields get their default."""
+    return decoder(cls)(json)
 
 
 def _maybe_unstructure(val: Any) -> Any:
@@ -256,31 +331,68 @@ class Market:
     deleted: Optional[bool] = field(kw_only=True, default=None)
 
     def get_full_data(self) -> "Market":
-        self.bets = get_bets(marketId=self.id)
+        self.bets = list(iter_bets(marketId=self.id))
         self.comments = get_comments(marketId=self.id)
         return self
 
-    def get_updates(self) -> Tuple[np.ndarray, np.ndarray]:  # pragma: no cover
+    def _bet_columns(self, **dtypes: Any) -> Tuple[np.ndarray, ...]:
+        """Columns of this market's bets, with the given names and dtypes.
+        A list of `Bet`s is read in a single Python pass for all the columns. Only columnar bets, e.g. a
+        `BetFrame`, are read without a loop, so for many markets use `history.probability_histories`.
+        """
+        if self.bets is None:
+            raise ValueError("This market has no bets loaded. Call get_full_data first.")
+        if isinstance(self.bets, list):
+            get = attrgetter(*dtypes)
+            rows = [get(b) for b in self.bets]
+            columns: List[Sequence[Any]] = [rows]
+            if len(dtypes) > 1:
+                columns = list(zip(*rows)) if rows else [[]] * len(dtypes)
+            return tuple(np.array(c, dtype=t) for c, t in zip(columns, dtypes.values()))
+        # Columnar bets, e.g. a BetFrame
+        return tuple(np.asarray(getattr(self.bets, k), dtype=t) for k, t in dtypes.items())
+
+    def get_updates(self) -> Tuple[np.ndarray, np.ndarray]:
         """Get all updates to this market.
 
         Returns:
             Tuple[np.ndarray, np.ndarray]: The time of each update, and the probabilities after each update.
         """
-        raise NotImplementedError
+        times, probabilities = self._bet_columns(createdTime=np.int64, probAfter=np.float64)
+        order = np.argsort(times, kind="stable")
+        return times[order], probabilities[order]
 
-    def num_traders(self) -> int:  # pragma: no cover
-        raise NotImplementedError
+    def num_traders(self) -> int:
+        """Get the number of distinct users who have bet on this market."""
+        (users,) = self._bet_columns(userId=object)
+        # None is falsy, so this drops bets without a user
+        return len(np.unique(users[users.astype(bool)].astype(str)))
 
-    def probability_history(self) -> Tuple[np.ndarray, np.ndarray]:  # pragma: no cover
-        raise NotImplementedError
+    def probability_history(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Get the probability of this market over time, starting from its creation.
 
-    def start_probability(self) -> float:  # pragma: no cover
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The time of each change, and the probability after each change.
+        """
+        times, before, after = self._bet_columns(
+            createdTime=np.int64, probBefore=np.float64, probAfter=np.float64
+        )
+        if len(times) == 0:
+            return np.array([self.createdTime], dtype=np.int64), np.array(
+                [self.probability], dtype=np.float64
+            )
+        order = np.argsort(times, kind="stable")
+        return np.concatenate(([self.createdTime], times[order])), np.concatenate(
+            ([before[order[0]]], after[order])
+        )
+
+    def start_probability(self) -> float:
         """Get the starting probability of the market"""
-        raise NotImplementedError
+        return float(self.probability_history()[1][0])
 
-    def final_probability(self) -> float:  # pragma: no cover
+    def final_probability(self) -> float:
         """Get the final probability of this market"""
-        raise NotImplementedError
+        return float(self.probability_history()[1][-1])
 
     @staticmethod
     def from_json(json: Any) -> "Market":
@@ -319,6 +431,131 @@ class ContractMetric:
         return weak_structure(json_dict, cls)
 
 
+# Compile the decoders of the API types up front, rather than on the first request
+for _cls in (Bet, Comment, Market, User, Group, ContractMetric):
+    _DECODERS[_cls] = compile_decoder(_cls)
+
+
+def _decode_field(name: str, value: Any) -> Any:
+    if name == "bets" and value is not None:
+        return [weak_structure(x, Bet) for x in value]
+    elif name == "comments" and value is not None:
+        return [weak_structure(x, Comment) for x in value]
+    return value
+
+
+def _lazy_field(name: str, default: Any) -> property:
+    slot = Market.__dict__[name]
+
+    def get(self: "LazyMarket") -> Any:
+        try:
+            return slot.__get__(self)
+        except AttributeError:
+            value = _decode_field(name, self._raw.pop(name, default))
+            slot.__set__(self, value)
+            return value
+
+    def set(self: "LazyMarket", value: Any) -> None:
+        slot.__set__(self, value)
+        self._raw.pop(name, None)
+
+    return property(get, set)
+
+
+class LazyMarket(Market):
+    """A `Market` that keeps its raw JSON, and only decodes each field the first time it's read.
+    Creating one does no work, which makes listing many markets much cheaper when only a few fields are used.
+    Nested bets and comments are only turned into `Bet` and `Comment` objects if they're accessed.
+    It compares equal to a `Market` with the same fields, and pickles without decoding fields that haven't been read.
+    """
+
+    __slots__ = ("_raw",)
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        self._raw: Dict[str, Any] = {}
+        super().__init__(*args, **kwargs)
+
+    def __eq__(self, other: Any) -> bool:
+        # attrs' equality requires the exact same class
+        if not isinstance(other, Market):
+            return NotImplemented
+        names = [f.name for f in Market.__attrs_attrs__]  # type: ignore
+        return tuple(getattr(self, n) for n in names) == tuple(getattr(other, n) for n in names)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = {"_raw": dict(self._raw)}
+        for f in Market.__attrs_attrs__:  # type: ignore
+            try:
+                state[f.name] = Market.__dict__[f.name].__get__(self)
+            except AttributeError:
+                # Not decoded yet
+                pass
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        state = dict(state)
+        self._raw = state.pop("_raw")
+        for name, value in state.items():
+            Market.__dict__[name].__set__(self, value)
+
+    @staticmethod
+    def from_json(json: Any) -> "LazyMarket":
+        market = object.__new__(LazyMarket)
+        market._raw = json
+        return market
+
+
+for _f in Market.__attrs_attrs__:  # type: ignore
+    setattr(LazyMarket, _f.name, _lazy_field(_f.name, _f.default))
+
+
+def _paginate(
+    fetch: Callable[..., List[Dict[str, Any]]],
+    page_size: int = 1000,
+    before: Optional[str] = None,
+    **kwargs: Any,
+) -> Iterator[List[Dict[str, Any]]]:
+    """Follow the `before` cursor of a paginated endpoint, yielding one page of raw JSON at a time.
+    The next page is requested in a background thread while the caller processes the current one,
+    and at most two pages are held in memory at once.
+
+    Args:
+        fetch: The underlying API call, e.g. `_get_bets`. Must accept `limit` and `before`.
+        page_size: Number of records to request per page. Maximum 1000.
+        before: ID of a record to start fetching before.
+        kwargs: Additional arguments passed through to `fetch`.
+    """
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        future = pool.submit(fetch, limit=page_size, before=before, **kwargs)
+        while True:
+            page = future.result()
+            if len(page) == 0:
+                return
+            if len(page) == page_size:
+                future = pool.submit(fetch, limit=page_size, before=page[-1]["id"], **kwargs)
+            yield page
+            if len(page) < page_size:
+                return
+
+
+def _get_json(
+    template: str, *args: Any, params: Optional[Dict[str, Any]] = None, **kwargs: Any
+) -> Any:
+    """GET an endpoint through the shared transport and decode the JSON response.
+
+    Args:
+        template: The endpoint's URL template, e.g. `SINGLE_MARKET_URL`.
+        args: Positional values to format the template with.
+        params: Query parameters.
+        kwargs: Keyword values to format the template with.
+    """
+    url = template.format(*args, **kwargs)
+    transport = get_transport()
+    resp = transport.get(url, params=params, endpoint=template)
+    resp.raise_for_status()
+    return transport.decode_json(resp, template)
+
+
 def _get_bets(
     userId: Optional[str] = None,
     username: Optional[str] = None,
@@ -326,6 +563,7 @@ def _get_bets(
     marketSlug: Optional[str] = None,
     limit: Optional[int] = 1000,
     before: Optional[str] = None,
+    kinds: Optional[str] = None,
 ) -> List[Dict[str, Any]]:
     """Get bets, optionally associated with a user or market.
     Retrieves at most 1000 bets.
@@ -338,6 +576,7 @@ def _get_bets(
         marketSlug: Slug of the market to get bets for
         limit: Number of bets to return. Maximum 1000.
         before: ID of a bet to fetch bets before.
+        kinds: Only get some kinds of bets. The API supports "open-limit", for limit orders that are still open.
     """
     params: Dict[str, Any] = {"limit": limit}
     if userId is not None:
@@ -352,10 +591,9 @@ def _get_bets(
         params["limit"] = limit
     if before is not None:
         params["before"] = before
-    resp = requests.get(BETS_URL, params=params)
-    resp.raise_for_status()
-
-    unsorted = resp.json()
+    if kinds is not None:
+        params["kinds"] = kinds
+    unsorted = _get_json(BETS_URL, params=params)
     return sorted(unsorted, key=lambda x: x["createdTime"], reverse=True)
 
 
@@ -366,6 +604,7 @@ def get_bets(
     marketSlug: Optional[str] = None,
     limit: Optional[int] = 1000,
     before: Optional[str] = None,
+    kinds: Optional[str] = None,
 ) -> List[Bet]:
     """Get bets, optionally associated with a user or market.
     Retrieves at most 1000 bets.
@@ -378,6 +617,7 @@ def get_bets(
         marketSlug: Slug of the market to get bets for
         limit: Number of bets to return. Maximum 1000.
         before: ID of a bet to fetch bets before.
+        kinds: Only get some kinds of bets. The API supports "open-limit", for limit orders that are still open.
         as_json: If true, return the raw json instead of a list of Bet objects.
     """
     return [
@@ -389,10 +629,46 @@ def get_bets(
             marketSlug=marketSlug,
             limit=limit,
             before=before,
+            kinds=kinds,
         )
     ]
 
 
+def iter_bets(
+    userId: Optional[str] = None,
+    username: Optional[str] = None,
+    marketId: Optional[str] = None,
+    marketSlug: Optional[str] = None,
+    before: Optional[str] = None,
+    page_size: int = 1000,
+    kinds: Optional[str] = None,
+) -> Iterator[Bet]:
+    """Iterate over every bet matching the filters, newest first.
+    Unlike `get_bets` this is not limited to 1000 bets: pages are fetched lazily by following the `before` cursor.
+
+    Args:
+        userId: ID of user to get bets for.
+        username: Username of user to get bets for.
+        marketId: The market to get bets for.
+        marketSlug: Slug of the market to get bets for
+        before: ID of a bet to fetch bets before.
+        kinds: Only get some kinds of bets. The API supports "open-limit", for limit orders that are still open.
+        page_size: Number of bets to request per page. Maximum 1000.
+    """
+    for page in _paginate(
+        _get_bets,
+        page_size=page_size,
+        before=before,
+        userId=userId,
+        username=username,
+        marketId=marketId,
+        marketSlug=marketSlug,
+        kinds=kinds,
+    ):
+        for x in page:
+            yield weak_structure(x, Bet)
+
+
 def _get_comments(
     marketId: Optional[str] = None, marketSlug: Optional[str] = None
 ) -> List[Dict[str, Any]]:
@@ -402,9 +678,7 @@ def _get_comments(
         params["contractId"] = marketId
     if marketSlug is not None:
         params["contractSlug"] = marketSlug
-    resp = requests.get(COMMENTS_URL, params)
-    resp.raise_for_status()
-    return resp.json()
+    return _get_json(COMMENTS_URL, params=params)
 
 
 def get_comments(
@@ -421,30 +695,23 @@ def get_comments(
 
 def get_groups() -> List[Group]:
     """Get a list of all groups."""
-    resp = requests.get(GROUPS_URL, timeout=20)
-    resp.raise_for_status()
-    return [weak_structure(x, Group) for x in resp.json()]
+    return [weak_structure(x, Group) for x in _get_json(GROUPS_URL)]
 
 
 def get_group_by_slug(slug: str) -> Group:
     """Get a group by its slug."""
-    resp = requests.get(GROUP_SLUG_URL.format(group_slug=slug), timeout=20)
-    resp.raise_for_status()
-    return weak_structure(resp.json(), Group)
+    return weak_structure(_get_json(GROUP_SLUG_URL, group_slug=slug), Group)
 
 
 def get_group_by_id(group_id: str) -> Group:
     """Get a group by its ID."""
-    resp = requests.get(GROUP_ID_URL.format(group_id=group_id), timeout=20)
-    resp.raise_for_status()
-    return weak_structure(resp.json(), Group)
+    return weak_structure(_get_json(GROUP_ID_URL, group_id=group_id), Group)
 
 
 def get_group_markets(group_id: str) -> List[Market]:
     """Get all markets attached to a group."""
-    resp = requests.get(GROUP_MARKETS_URL.format(group_id=group_id), timeout=20)
-    resp.raise_for_status()
-    return [weak_structure(x, Market) for x in resp.json()]
+    json = _get_json(GROUP_MARKETS_URL, group_id=group_id)
+    return [weak_structure(x, Market) for x in json]
 
 
 def get_market(market_id: str) -> Market:
@@ -455,9 +722,7 @@ def get_market(market_id: str) -> Market:
         market_id: ID of the market to get.
 
     """
-    resp = requests.get(SINGLE_MARKET_URL.format(market_id), timeout=20)
-    resp.raise_for_status()
-    return Market.from_json(resp.json())
+    return Market.from_json(_get_json(SINGLE_MARKET_URL, market_id))
 
 
 def get_market_positions(
@@ -477,9 +742,8 @@ def get_market_positions(
         userId: The user ID to query by. Default: null. If provided, only the position for this user will be returned.
     """
     params = {"order": order, "top": top, "bottom": bottom, "userId": userId}
-    resp = requests.get(POSITION_URL.format(market_id), timeout=20, params=params)
-    resp.raise_for_status()
-    return [ContractMetric.from_json(x) for x in resp.json()]
+    json = _get_json(POSITION_URL, market_id, params=params)
+    return [ContractMetric.from_json(x) for x in json]
 
 
 def get_full_market(market_id: str) -> Market:
@@ -490,11 +754,41 @@ def get_full_market(market_id: str) -> Market:
         market_id: ID of the market to fetch.
     """
     market = get_market(market_id)
-    market.bets = get_bets(marketId=market_id, limit=None)
+    market.bets = list(iter_bets(marketId=market_id))
     market.comments = get_comments(marketId=market_id)
     return market
 
 
+def get_full_markets(
+    ids: Optional[Iterable[str]] = None, max_workers: int = 8
+) -> Iterator[Market]:
+    """Get many full markets concurrently.
+    Markets are yielded in the order they finish, not the order of `ids`.
+    At most `max_workers` markets are in flight at once, so `ids` can be an arbitrarily long iterable.
+
+    Args:
+        ids: IDs of the markets to fetch. If None, every market is fetched.
+        max_workers: The maximum number of markets to fetch at once.
+    """
+    if ids is None:
+        tasks: Iterator[Callable[[], Market]] = (m.get_full_data for m in iter_markets())
+    else:
+        tasks = (partial(get_full_market, i) for i in ids)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        pending: set = set()
+        for task in tasks:
+            pending.add(pool.submit(task))
+            if len(pending) >= max_workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+
 def _get_markets(
     limit: int = 1000, before: Optional[str] = None
 ) -> List[Dict[str, Any]]:
@@ -512,22 +806,40 @@ def _get_markets(
     params: Dict[str, Any] = {"limit": limit}
     if before is not None:
         params["before"] = before
-    resp = requests.get(ALL_MARKETS_URL, params=params)
-    resp.raise_for_status()
-    return resp.json()
+    return _get_json(ALL_MARKETS_URL, params=params)
 
 
-def get_markets(limit: int = 1000, before: Optional[str] = None) -> List[Market]:
+def get_markets(
+    limit: int = 1000, before: Optional[str] = None, lazy: bool = False
+) -> List[Market]:
     """Get a list of markets (not including comments or bets).
     [API reference](https://docs.manifold.markets/api#get-v0markets)
 
     Args:
         limit: Number of markets to fetch. Max 1000.
         before: ID of a market to fetch markets before.
+        lazy: Return `LazyMarket`s, which only decode fields when they're read.
 
     """
     json_markets = _get_markets(limit=limit, before=before)
-    return [Market.from_json(x) for x in json_markets]
+    from_json = LazyMarket.from_json if lazy else Market.from_json
+    return [from_json(x) for x in json_markets]
+
+
+def iter_markets(
+    before: Optional[str] = None, page_size: int = 1000, lazy: bool = False
+) -> Iterator[Market]:
+    """Iterate over every market (not including comments or bets), newest first.
+
+    Args:
+        before: ID of a market to fetch markets before.
+        page_size: Number of markets to request per page. Max 1000.
+        lazy: Yield `LazyMarket`s, which only decode fields when they're read.
+    """
+    from_json = LazyMarket.from_json if lazy else Market.from_json
+    for page in _paginate(_get_markets, page_size=page_size, before=before):
+        for x in page:
+            yield from_json(x)
 
 
 def search_markets(terms: List[str]) -> List[Market]:
@@ -538,17 +850,14 @@ def search_markets(terms: List[str]) -> List[Market]:
     """
     joined_terms = " ".join(terms)
     params: Dict[str, Any] = {"term": joined_terms}
-    resp = requests.get(SEARCH_MARKETS_URL, params=params)
-    resp.raise_for_status()
-    return [Market.from_json(x) for x in resp.json()]
+    return [Market.from_json(x) for x in _get_json(SEARCH_MARKETS_URL, params=params)]
 
 
 def get_slug(slug: str) -> Market:
     """Get a market by its slug.
     [API reference](https://docs.manifold.markets/api#get-v0slugmarketslug)
     """
-    market = requests.get(MARKET_SLUG_URL.format(slug)).json()
-    return Market.from_json(market)
+    return Market.from_json(_get_json(MARKET_SLUG_URL, slug))
 
 
 def get_user_by_name(username: str) -> User:
@@ -558,9 +867,7 @@ def get_user_by_name(username: str) -> User:
     Args:
         username: The user's username.
     """
-    resp = requests.get(USERNAME_URL.format(username))
-    resp.raise_for_status()
-    return weak_structure(resp.json(), User)
+    return weak_structure(_get_json(USERNAME_URL, username), User)
 
 
 def get_user_by_id(user_id: str) -> User:
@@ -570,9 +877,17 @@ def get_user_by_id(user_id: str) -> User:
     Args:
         user_id: The user's ID.
     """
-    resp = requests.get(USER_ID_URL.format(user_id))
-    resp.raise_for_status()
-    return weak_structure(resp.json(), User)
+    return weak_structure(_get_json(USER_ID_URL, user_id), User)
+
+
+def _get_users(
+    limit: int = 1000, before: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """Underlying API call for `get_users`."""
+    params: Dict[str, Any] = {"limit": limit}
+    if before is not None:
+        params["before"] = before
+    return _get_json(USERS_URL, params=params)
 
 
 def get_users(limit: int = 1000, before: Optional[str] = None) -> List[User]:
@@ -586,25 +901,127 @@ def get_users(limit: int = 1000, before: Optional[str] = None) -> List[User]:
     Returns:
         A list of users.
     """
-    params: Dict[str, Any] = {"limit": limit}
-    if before is not None:
-        params["before"] = before
-    resp = requests.get(USERS_URL, params=params)  # type: ignore
-    resp.raise_for_status()
-    return [weak_structure(x, User) for x in resp.json()]
+    return [weak_structure(x, User) for x in _get_users(limit=limit, before=before)]
+
+
+def iter_users(before: Optional[str] = None, page_size: int = 1000) -> Iterator[User]:
+    """Iterate over every user.
+
+    Args:
+        before: The ID of a user to get users before.
+        page_size: Number of users to request per page. Max 1000.
+    """
+    for page in _paginate(_get_users, page_size=page_size, before=before):
+        for x in page:
+            yield weak_structure(x, User)
+
+
+@define
+class BetOrder:
+    """A bet to place with `APIWrapper.submit_batch`. See `APIWrapper.make_bet`."""
+
+    amount: float
+    contractId: str
+    outcome: str
+    limitProb: Optional[float] = None
+
+    @property
+    def market(self) -> Optional[str]:
+        return self.contractId
+
+    def _prep(self, wrapper: "APIWrapper") -> Tuple[requests.PreparedRequest, str]:
+        prepped = wrapper._prep_make_bet(self.amount, self.contractId, self.outcome, self.limitProb)
+        return prepped, MAKE_BET_URL
+
+
+@define
+class CancelOrder:
+    """A bet to cancel with `APIWrapper.submit_batch`. See `APIWrapper.cancel_bet`.
+
+    Attributes:
+        bet_id: The bet to cancel.
+        contractId: The market the bet is on. If given, the cancel stays in order with the market's other orders.
+    """
+
+    bet_id: str
+    contractId: Optional[str] = None
+
+    @property
+    def market(self) -> Optional[str]:
+        return self.contractId
+
+    def _prep(self, wrapper: "APIWrapper") -> Tuple[requests.PreparedRequest, str]:
+        return wrapper._prep_cancel_bet(self.bet_id), CANCEL_BET_URL
+
+
+@define
+class SellOrder:
+    """A sale to make with `APIWrapper.submit_batch`. See `APIWrapper.sell_shares`."""
+
+    market_id: str
+    outcome: Optional[str] = None
+    shares: Optional[int] = None
+
+    @property
+    def market(self) -> Optional[str]:
+        return self.market_id
+
+    def _prep(self, wrapper: "APIWrapper") -> Tuple[requests.PreparedRequest, str]:
+        return wrapper._prep_sell(self.market_id, self.outcome, self.shares), SELL_SHARES_URL
+
+
+Order = Union[BetOrder, CancelOrder, SellOrder]
+
+
+@define
+class OrderResult:
+    """The outcome of one order sent by `APIWrapper.submit_batch`.
+
+    Attributes:
+        order: The order.
+        response: The response, or None if the request failed.
+        error: The exception raised while sending, if any.
+        sent: When the request was sent, as a Unix timestamp.
+        elapsed: Seconds from sending the request to receiving the response (or the error).
+    """
+
+    order: Order
+    response: Optional[requests.Response]
+    error: Optional[Exception]
+    sent: float
+    elapsed: float
+
+    @property
+    def ok(self) -> bool:
+        return self.response is not None and self.response.ok
 
 
 @define
 class APIWrapper:
+    """Authenticated access to the API.
+
+    Args:
+        key: Your API key.
+        transport: The transport to send requests with. Defaults to the shared transport from `get_transport`.
+    """
+
     key: str
+    transport: Optional[Transport] = None
 
-    def __init__(self, key: str) -> None:
+    def __init__(self, key: str, transport: Optional[Transport] = None) -> None:
         self.key = key
+        self.transport = transport
 
     @property
     def headers(self) -> Dict[str, str]:
         return {"Content-Type": "application/json", "Authorization": f"Key {self.key}"}
 
+    def _send(self, prepped: requests.PreparedRequest, template: str) -> requests.Response:
+        """Send a prepared request through this wrapper's transport."""
+        transport = self.transport if self.transport is not None else get_transport()
+        idempotent = True if template in IDEMPOTENT_POSTS else None
+        return transport.send(prepped, endpoint=template, idempotent=idempotent)
+
     def _prep_add_liquidity(
         self, market_id: str, amount: float
     ) -> requests.PreparedRequest:
@@ -624,7 +1041,7 @@ class APIWrapper:
             amount:     The amount of liquidity to add.
         """
         prepped = self._prep_add_liquidity(market_id, amount)
-        return requests.Session().send(prepped)
+        return self._send(prepped, ADD_LIQUIDITY_URL)
 
     def _prep_me(self) -> requests.PreparedRequest:
         """Prepare a me GET request.
@@ -637,7 +1054,7 @@ class APIWrapper:
     def me(self) -> requests.Response:
         """Return the authenticated user"""
         prepped = self._prep_me()
-        return requests.Session().send(prepped)
+        return self._send(prepped, ME_URL)
 
     def _prep_make_bet(
         self,
@@ -672,7 +1089,7 @@ class APIWrapper:
             limitProb: A limit probability for the bet. If spending the full amount would push the market past this probability, then only enough to push the market to this probability will be bought. Any additional funds will be left often as a bet that can later be matched by an opposing offer.
         """
         prepped = self._prep_make_bet(amount, contractId, outcome, limitProb=limitProb)
-        return requests.Session().send(prepped)
+        return self._send(prepped, MAKE_BET_URL)
 
     def _prep_cancel_bet(
         self,
@@ -698,8 +1115,7 @@ class APIWrapper:
             bet_id: The bet id.
         """
         prepped = self._prep_cancel_bet(bet_id)
-        s = requests.Session()
-        return s.send(prepped)
+        return self._send(prepped, CANCEL_BET_URL)
 
     def _prep_create_market(
         self,
@@ -815,7 +1231,7 @@ class APIWrapper:
             initialValue=initialValue,
             answers=answers,
         )
-        return requests.Session().send(prepped)
+        return self._send(prepped, CREATE_MARKET_URL)
 
     def _prep_resolve(
         self,
@@ -875,7 +1291,7 @@ class APIWrapper:
             resolutions=resolutions,
             value=value,
         )
-        return requests.Session().send(prepped)
+        return self._send(prepped, RESOLVE_MARKET_URL)
 
     def _prep_sell(
         self,
@@ -910,7 +1326,7 @@ class APIWrapper:
             outcome: The kind of shares to sell. Must be YES or NO.
         """
         prepped = self._prep_sell(market_id, outcome, shares=shares)
-        return requests.Session().send(prepped)
+        return self._send(prepped, SELL_SHARES_URL)
 
     def _prep_make_comment(
         self,
@@ -939,7 +1355,46 @@ class APIWrapper:
             content: The comment to post, formatted as a markdown string.
         """
         prepped = self._prep_make_comment(contractId, content)
-        return requests.Session().send(prepped)
+        return self._send(prepped, MAKE_COMMENT_URL)
+
+    def _submit(self, order: Order) -> OrderResult:
+        sent, start = time.time(), time.perf_counter()
+        try:
+            response: Optional[requests.Response] = self._send(*order._prep(self))
+            error = None
+        except requests.RequestException as e:
+            response, error = None, e
+        return OrderResult(order, response, error, sent, time.perf_counter() - start)
+
+    def submit_batch(self, orders: Iterable[Order], max_workers: int = 8) -> List[OrderResult]:
+        """Send many orders at once.
+        Orders on the same market are sent one at a time, in the order given, while different markets
+        are sent in parallel. Cancels without a `contractId` are sent independently of everything else.
+        A failed order doesn't stop later orders on the same market.
+
+        Args:
+            orders: `BetOrder`s, `CancelOrder`s and `SellOrder`s.
+            max_workers: The most markets to send orders to at once.
+                Shouldn't be more than the transport's `pool_maxsize`.
+
+        Returns:
+            The result of each order, in the order given.
+        """
+        orders = list(orders)
+        lanes: Dict[Any, List[int]] = {}
+        for i, order in enumerate(orders):
+            key = order.market if order.market is not None else ("unordered", i)
+            lanes.setdefault(key, []).append(i)
+        results: List[Optional[OrderResult]] = [None] * len(orders)
+
+        def run(lane: List[int]) -> None:
+            for i in lane:
+                results[i] = self._submit(orders[i])
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(lanes)))) as pool:
+            for future in [pool.submit(run, lane) for lane in lanes.values()]:
+                future.result()
+        return results  # type: ignore
 
 
 def use_api(f):
@@ -0,0 +1,460 @@
+"""Asyncio bindings.
+Mirrors the GET functions and `APIWrapper` methods in `manifoldpy.api`, using aiohttp instead of requests.
+POST payloads are built with the same `_prep_*` methods as `APIWrapper`, so both clients send identical requests.
+"""
+import asyncio
+from functools import partial
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, TypeVar
+
+try:
+    import aiohttp
+except ImportError as e:  # pragma: no cover
+    raise ImportError(
+        "The async client requires aiohttp. Install it with `pip install manifoldpy[async]`."
+    ) from e
+
+import requests
+
+from manifoldpy import api, jsonlib
+from manifoldpy.api import (
+    Bet,
+    Comment,
+    ContractMetric,
+    Group,
+    Market,
+    OrderType,
+    OutcomeType,
+    User,
+    Visibility,
+    weak_structure,
+)
+from manifoldpy.ratelimit import RateLimiter
+from manifoldpy.transport import endpoint_name
+
+T = TypeVar("T")
+
+
+def _clean_params(params: Dict[str, Any]) -> Dict[str, str]:
+    """Drop unset parameters and stringify the rest, matching what requests does."""
+    return {k: str(v) for k, v in params.items() if v is not None}
+
+
+class AsyncClient:
+    """An asyncio Manifold client.
+    All requests share one connection pool, so a single client can serve thousands of concurrent calls.
+    Should be used as an async context manager, or closed with `close`.
+
+    Args:
+        key: API key. Only required for the POST methods and `me`.
+        timeout: Default timeout in seconds for each request.
+        limit_per_host: Maximum number of simultaneous connections to the API host.
+        rate_limiter: An optional limit on the rate of requests.
+            Endpoint budgets only apply to endpoints without path parameters, e.g. "bets".
+    """
+
+    def __init__(
+        self,
+        key: Optional[str] = None,
+        timeout: float = 20,
+        limit_per_host: int = 100,
+        rate_limiter: Optional[RateLimiter] = None,
+    ) -> None:
+        self.key = key
+        self.timeout = timeout
+        self.limit_per_host = limit_per_host
+        self.rate_limiter = rate_limiter
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def __aenter__(self) -> "AsyncClient":
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.close()
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=0, limit_per_host=self.limit_per_host)
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+
+    @property
+    def wrapper(self) -> api.APIWrapper:
+        if self.key is None:
+            raise ValueError("An API key is required for this endpoint.")
+        return api.APIWrapper(self.key)
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _timeout(self, timeout: Optional[float]) -> aiohttp.ClientTimeout:
+        return aiohttp.ClientTimeout(total=self.timeout if timeout is None else timeout)
+
+    async def _throttle(self, url: str) -> None:
+        if self.rate_limiter is not None:
+            delay = self.rate_limiter.reserve(endpoint_name(url.split("?", 1)[0]))
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+    async def _get(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+    ) -> Any:
+        await self._throttle(url)
+        async with self.session.get(
+            url, params=_clean_params(params or {}), timeout=self._timeout(timeout)
+        ) as resp:
+            resp.raise_for_status()
+            return jsonlib.loads(await resp.read())
+
+    async def _send(
+        self, prepped: requests.PreparedRequest, timeout: Optional[float] = None
+    ) -> aiohttp.ClientResponse:
+        """Send a request built by one of the `APIWrapper._prep_*` methods.
+        The body is read before returning, so the connection is released back to the pool.
+        """
+        await self._throttle(prepped.url)  # type: ignore
+        async with self.session.request(
+            prepped.method,  # type: ignore
+            prepped.url,  # type: ignore
+            headers=dict(prepped.headers),
+            data=prepped.body,
+            timeout=self._timeout(timeout),
+        ) as resp:
+            await resp.read()
+            return resp
+
+    async def _paginate(
+        self,
+        url: str,
+        decode: Callable[[Dict[str, Any]], T],
+        params: Dict[str, Any],
+        page_size: int,
+        before: Optional[str],
+        timeout: Optional[float],
+        sort: bool = False,
+    ) -> AsyncIterator[T]:
+        """Async equivalent of `api._paginate`, prefetching the next page as a task."""
+
+        async def fetch(cursor: Optional[str]) -> List[Dict[str, Any]]:
+            page = await self._get(
+                url, {**params, "limit": page_size, "before": cursor}, timeout
+            )
+            if sort:
+                page.sort(key=lambda x: x["createdTime"], reverse=True)
+            return page
+
+        task = asyncio.ensure_future(fetch(before))
+        try:
+            while True:
+                page = await task
+                if len(page) == page_size:
+                    task = asyncio.ensure_future(fetch(page[-1]["id"]))
+                for x in page:
+                    yield decode(x)
+                if len(page) < page_size:
+                    return
+        finally:
+            task.cancel()
+
+    # GET endpoints
+
+    async def get_bets(
+        self,
+        userId: Optional[str] = None,
+        username: Optional[str] = None,
+        marketId: Optional[str] = None,
+        marketSlug: Optional[str] = None,
+        limit: Optional[int] = 1000,
+        before: Optional[str] = None,
+        kinds: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ) -> List[Bet]:
+        """See `api.get_bets`."""
+        params = {
+            "userId": userId,
+            "username": username,
+            "contractId": marketId,
+            "contractSlug": marketSlug,
+            "limit": limit,
+            "before": before,
+            "kinds": kinds,
+        }
+        unsorted = await self._get(api.BETS_URL, params, timeout)
+        return [
+            weak_structure(x, Bet)
+            for x in sorted(unsorted, key=lambda x: x["createdTime"], reverse=True)
+        ]
+
+    def iter_bets(
+        self,
+        userId: Optional[str] = None,
+        username: Optional[str] = None,
+        marketId: Optional[str] = None,
+        marketSlug: Optional[str] = None,
+        before: Optional[str] = None,
+        page_size: int = 1000,
+        kinds: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ) -> AsyncIterator[Bet]:
+        """See `api.iter_bets`."""
+        params = {
+            "userId": userId,
+            "username": username,
+            "contractId": marketId,
+            "contractSlug": marketSlug,
+            "kinds": kinds,
+        }
+        return self._paginate(
+            api.BETS_URL,
+            partial(weak_structure, cls=Bet),
+            params,
+            page_size,
+            before,
+            timeout,
+            sort=True,
+        )
+
+    async def get_comments(
+        self,
+        marketId: Optional[str] = None,
+        marketSlug: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ) -> List[Comment]:
+        """See `api.get_comments`."""
+        params = {"contractId": marketId, "contractSlug": marketSlug}
+        json = await self._get(api.COMMENTS_URL, params, timeout)
+        return [weak_structure(x, Comment) for x in json]
+
+    async def get_groups(self, timeout: Optional[float] = None) -> List[Group]:
+        """See `api.get_groups`."""
+        json = await self._get(api.GROUPS_URL, timeout=timeout)
+        return [weak_structure(x, Group) for x in json]
+
+    async def get_group_by_slug(self, slug: str, timeout: Optional[float] = None) -> Group:
+        """See `api.get_group_by_slug`."""
+        json = await self._get(api.GROUP_SLUG_URL.format(group_slug=slug), timeout=timeout)
+        return weak_structure(json, Group)
+
+    async def get_group_by_id(self, group_id: str, timeout: Optional[float] = None) -> Group:
+        """See `api.get_group_by_id`."""
+        json = await self._get(api.GROUP_ID_URL.format(group_id=group_id), timeout=timeout)
+        return weak_structure(json, Group)
+
+    async def get_group_markets(
+        self, group_id: str, timeout: Optional[float] = None
+    ) -> List[Market]:
+        """See `api.get_group_markets`."""
+        json = await self._get(
+            api.GROUP_MARKETS_URL.format(group_id=group_id), timeout=timeout
+        )
+        return [weak_structure(x, Market) for x in json]
+
+    async def get_market(self, market_id: str, timeout: Optional[float] = None) -> Market:
+        """See `api.get_market`."""
+        json = await self._get(api.SINGLE_MARKET_URL.format(market_id), timeout=timeout)
+        return Market.from_json(json)
+
+    async def get_market_positions(
+        self,
+        market_id: str,
+        order: Optional[OrderType] = None,
+        top: Optional[int] = None,
+        bottom: Optional[int] = None,
+        userId: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ) -> List[ContractMetric]:
+        """See `api.get_market_positions`."""
+        params = {"order": order, "top": top, "bottom": bottom, "userId": userId}
+        json = await self._get(api.POSITION_URL.format(market_id), params, timeout)
+        return [ContractMetric.from_json(x) for x in json]
+
+    async def get_full_market(
+        self, market_id: str, timeout: Optional[float] = None
+    ) -> Market:
+        """See `api.get_full_market`.
+        The market, its bets and its comments are requested concurrently.
+        """
+        market, bets, comments = await asyncio.gather(
+            self.get_market(market_id, timeout=timeout),
+            self._collect(self.iter_bets(marketId=market_id, timeout=timeout)),
+            self.get_comments(marketId=market_id, timeout=timeout),
+        )
+        market.bets = bets
+        market.comments = comments
+        return market
+
+    @staticmethod
+    async def _collect(it: AsyncIterator[T]) -> List[T]:
+        return [x async for x in it]
+
+    async def get_markets(
+        self,
+        limit: int = 1000,
+        before: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ) -> List[Market]:
+        """See `api.get_markets`."""
+        params = {"limit": limit, "before": before}
+        json = await self._get(api.ALL_MARKETS_URL, params, timeout)
+        return [Market.from_json(x) for x in json]
+
+    def iter_markets(
+        self,
+        before: Optional[str] = None,
+        page_size: int = 1000,
+        timeout: Optional[float] = None,
+    ) -> AsyncIterator[Market]:
+        """See `api.iter_markets`."""
+        return self._paginate(
+            api.ALL_MARKETS_URL, Market.from_json, {}, page_size, before, timeout
+        )
+
+    async def search_markets(
+        self, terms: List[str], timeout: Optional[float] = None
+    ) -> List[Market]:
+        """See `api.search_markets`."""
+        params = {"term": " ".join(terms)}
+        json = await self._get(api.SEARCH_MARKETS_URL, params, timeout)
+        return [Market.from_json(x) for x in json]
+
+    async def get_slug(self, slug: str, timeout: Optional[float] = None) -> Market:
+        """See `api.get_slug`."""
+        json = await self._get(api.MARKET_SLUG_URL.format(slug), timeout=timeout)
+        return Market.from_json(json)
+
+    async def get_user_by_name(self, username: str, timeout: Optional[float] = None) -> User:
+        """See `api.get_user_by_name`."""
+        json = await self._get(api.USERNAME_URL.format(username), timeout=timeout)
+        return weak_structure(json, User)
+
+    async def get_user_by_id(self, user_id: str, timeout: Optional[float] = None) -> User:
+        """See `api.get_user_by_id`."""
+        json = await self._get(api.USER_ID_URL.format(user_id), timeout=timeout)
+        return weak_structure(json, User)
+
+    async def get_users(
+        self,
+        limit: int = 1000,
+        before: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ) -> List[User]:
+        """See `api.get_users`."""
+        params = {"limit": limit, "before": before}
+        json = await self._get(api.USERS_URL, params, timeout)
+        return [weak_structure(x, User) for x in json]
+
+    def iter_users(
+        self,
+        before: Optional[str] = None,
+        page_size: int = 1000,
+        timeout: Optional[float] = None,
+    ) -> AsyncIterator[User]:
+        """See `api.iter_users`."""
+        return self._paginate(
+            api.USERS_URL, partial(weak_structure, cls=User), {}, page_size, before, timeout
+        )
+
+    # POST endpoints
+
+    async def add_liquidity(
+        self, market_id: str, amount: float, timeout: Optional[float] = None
+    ) -> aiohttp.ClientResponse:
+        """See `APIWrapper.add_liquidity`."""
+        return await self._send(self.wrapper._prep_add_liquidity(market_id, amount), timeout)
+
+    async def me(self, timeout: Optional[float] = None) -> aiohttp.ClientResponse:
+        """See `APIWrapper.me`."""
+        return await self._send(self.wrapper._prep_me(), timeout)
+
+    async def make_bet(
+        self,
+        amount: float,
+        contractId: str,
+        outcome: str,
+        limitProb: Optional[float] = None,
+        timeout: Optional[float] = None,
+    ) -> aiohttp.ClientResponse:
+        """See `APIWrapper.make_bet`."""
+        prepped = self.wrapper._prep_make_bet(amount, contractId, outcome, limitProb=limitProb)
+        return await self._send(prepped, timeout)
+
+    async def cancel_bet(
+        self, bet_id: str, timeout: Optional[float] = None
+    ) -> aiohttp.ClientResponse:
+        """See `APIWrapper.cancel_bet`."""
+        return await self._send(self.wrapper._prep_cancel_bet(bet_id), timeout)
+
+    async def create_market(
+        self,
+        outcomeType: OutcomeType,
+        question: str,
+        description: str,
+        closeTime: int,
+        initialProb: Optional[int] = None,
+        min: Optional[float] = None,
+        max: Optional[float] = None,
+        groupId: Optional[str] = None,
+        visibility: Optional[Visibility] = None,
+        isLogScale: Optional[bool] = None,
+        initialValue: Optional[float] = None,
+        answers: Optional[List[str]] = None,
+        timeout: Optional[float] = None,
+    ) -> aiohttp.ClientResponse:
+        """See `APIWrapper.create_market`."""
+        prepped = self.wrapper._prep_create_market(
+            outcomeType,
+            question,
+            description,
+            closeTime,
+            initialProb=initialProb,
+            min=min,
+            max=max,
+            groupId=groupId,
+            visibility=visibility,
+            isLogScale=isLogScale,
+            initialValue=initialValue,
+            answers=answers,
+        )
+        return await self._send(prepped, timeout)
+
+    async def resolve_market(
+        self,
+        market_id: str,
+        outcome: str,
+        probabilityInt: Optional[int] = None,
+        resolutions: Optional[List[Any]] = None,
+        value: Optional[Any] = None,
+        timeout: Optional[float] = None,
+    ) -> aiohttp.ClientResponse:
+        """See `APIWrapper.resolve_market`."""
+        prepped = self.wrapper._prep_resolve(
+            market_id,
+            outcome,
+            probabilityInt=probabilityInt,
+            resolutions=resolutions,
+            value=value,
+        )
+        return await self._send(prepped, timeout)
+
+    async def sell_shares(
+        self,
+        market_id: str,
+        outcome: Optional[str] = None,
+        shares: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ) -> aiohttp.ClientResponse:
+        """See `APIWrapper.sell_shares`."""
+        prepped = self.wrapper._prep_sell(market_id, outcome, shares=shares)
+        return await self._send(prepped, timeout)
+
+    async def make_comment(
+        self, contractId: str, content: str, timeout: Optional[float] = None
+    ) -> aiohttp.ClientResponse:
+        """See `APIWrapper.make_comment`."""
+        prepped = self.wrapper._prep_make_comment(contractId, content)
+        return await self._send(prepped, timeout)
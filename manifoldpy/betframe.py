@@ -0,0 +1,346 @@
+"""Columnar storage for large numbers of bets.
+A `BetFrame` holds each `Bet` field as a NumPy array instead of holding a list of `Bet` objects:
+numbers are int64/float64 columns, booleans are bit-packed masks, and strings are categorical codes
+into a sorted array of the distinct values.
+"""
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union, overload
+
+import numpy as np
+import numpy.typing as npt
+
+from manifoldpy import api
+from manifoldpy.api import Bet
+
+INT_FIELDS = ("createdTime",)
+FLOAT_FIELDS = (
+    "shares",
+    "amount",
+    "probAfter",
+    "probBefore",
+    "orderAmount",
+    "limitProb",
+    "dpmShares",
+    "loanAmount",
+)
+BOOL_FIELDS = (
+    "isLiquidityProvision",
+    "isCancelled",
+    "isFilled",
+    "isSold",
+    "isRedemption",
+    "isAnte",
+)
+CATEGORICAL_FIELDS = ("id", "contractId", "userId", "outcome", "answerId", "challengeSlug")
+# Every other field (fills, fees, sale) is kept as an object array, or not at all if it's always None
+BET_FIELDS: Tuple[str, ...] = tuple(f.name for f in Bet.__attrs_attrs__)  # type: ignore
+OBJECT_FIELDS = tuple(
+    f for f in BET_FIELDS if f not in INT_FIELDS + FLOAT_FIELDS + BOOL_FIELDS + CATEGORICAL_FIELDS
+)
+
+# Number of records decoded at once when building a frame from JSON
+CHUNK_SIZE = 1 << 16
+
+Index = Union[slice, Sequence[int], npt.NDArray[Any]]
+
+
+def _encode(values: Sequence[Optional[str]]) -> Tuple[np.ndarray, np.ndarray]:
+    """Encode strings as codes into a sorted array of categories. None is encoded as -1."""
+    index: Dict[str, int] = {}
+    codes = np.fromiter(
+        (-1 if v is None else index.setdefault(v, len(index)) for v in values),
+        dtype=np.int32,
+        count=len(values),
+    )
+    categories = np.array(list(index), dtype=str)
+    order = np.argsort(categories, kind="stable")
+    rank = np.empty(len(order) + 1, dtype=np.int32)
+    rank[order] = np.arange(len(order), dtype=np.int32)
+    # Index -1 (None) maps to the extra last slot, which stays -1
+    rank[-1] = -1
+    return rank[codes], categories[order]
+
+
+def _recode(codes: np.ndarray, categories: np.ndarray, union: np.ndarray) -> np.ndarray:
+    """Map codes into `categories` onto codes into `union`, a sorted superset of `categories`."""
+    mapping = np.append(np.searchsorted(union, categories).astype(np.int32), -1)
+    return mapping[codes]
+
+
+def _unpack(packed: np.ndarray, n: int) -> np.ndarray:
+    return np.unpackbits(packed, count=n).astype(bool)
+
+
+def _take_bits(packed: np.ndarray, n: int, key: Union[slice, np.ndarray]) -> np.ndarray:
+    """Select from a packed mask. Contiguous slices only unpack the bytes they cover."""
+    if isinstance(key, slice):
+        start, stop, step = key.indices(n)
+        if step == 1:
+            if stop <= start:
+                return np.packbits(np.zeros(0, dtype=bool))
+            first = start // 8
+            bits = np.unpackbits(packed[first : (stop + 7) // 8]).astype(bool)
+            return np.packbits(bits[start - 8 * first : stop - 8 * first])
+    return np.packbits(_unpack(packed, n)[key])
+
+
+class BetFrame:
+    """Bets stored as columns.
+
+    Args:
+        columns: One array per field. Categorical fields hold codes, boolean fields hold packed bits.
+        categories: The sorted distinct values of each categorical field.
+        n: Number of bets.
+    """
+
+    def __init__(
+        self, columns: Dict[str, Optional[np.ndarray]], categories: Dict[str, np.ndarray], n: int
+    ) -> None:
+        self._columns = columns
+        self._categories = categories
+        self._n = n
+
+    def __len__(self) -> int:
+        return self._n
+
+    def __repr__(self) -> str:
+        return f"BetFrame({self._n} bets)"
+
+    # Construction
+
+    @classmethod
+    def from_json(cls, records: Iterable[Dict[str, Any]]) -> "BetFrame":
+        """Build a frame directly from bet JSON, e.g. the output of `api._get_bets`, without creating `Bet` objects.
+        `records` may be an iterator, and is consumed in chunks so the full JSON never needs to be in memory.
+        """
+        it = iter(records)
+        frames = []
+        while True:
+            chunk = list(islice(it, CHUNK_SIZE))
+            if len(chunk) == 0:
+                break
+            frames.append(cls._from_chunk(chunk))
+        return cls.concat(frames)
+
+    @classmethod
+    def _from_chunk(cls, records: List[Dict[str, Any]]) -> "BetFrame":
+        n = len(records)
+        columns: Dict[str, Optional[np.ndarray]] = {}
+        categories: Dict[str, np.ndarray] = {}
+        for name in INT_FIELDS:
+            columns[name] = np.fromiter((r.get(name) or 0 for r in records), dtype=np.int64, count=n)
+        for name in FLOAT_FIELDS:
+            columns[name] = np.fromiter(
+                (np.nan if (v := r.get(name)) is None else v for r in records),
+                dtype=np.float64,
+                count=n,
+            )
+        for name in BOOL_FIELDS:
+            values = [r.get(name) for r in records]
+            columns[name] = np.packbits(np.fromiter((v is True for v in values), bool, n))
+            columns[name + "?"] = np.packbits(np.fromiter((v is not None for v in values), bool, n))
+        for name in CATEGORICAL_FIELDS:
+            columns[name], categories[name] = _encode([r.get(name) for r in records])
+        for name in OBJECT_FIELDS:
+            values = [r.get(name) for r in records]
+            if any(v is not None for v in values):
+                columns[name] = np.fromiter(values, dtype=object, count=n)
+            else:
+                columns[name] = None
+        return cls(columns, categories, n)
+
+    @classmethod
+    def from_bets(cls, bets: Iterable[Bet]) -> "BetFrame":
+        """Build a frame from `Bet` objects."""
+        return cls.from_json(api.weak_unstructure(b) for b in bets)
+
+    @classmethod
+    def from_api(cls, page_size: int = 1000, **filters: Any) -> "BetFrame":
+        """Fetch every bet matching the filters of `api.iter_bets` straight into a frame."""
+        pages = api._paginate(api._get_bets, page_size=page_size, **filters)
+        return cls.from_json(x for page in pages for x in page)
+
+    @classmethod
+    def empty(cls) -> "BetFrame":
+        return cls._from_chunk([])
+
+    @classmethod
+    def concat(cls, frames: Sequence["BetFrame"]) -> "BetFrame":
+        """Concatenate frames, merging the categories of each categorical field."""
+        if len(frames) == 0:
+            return cls.empty()
+        elif len(frames) == 1:
+            return frames[0]
+        n = sum(len(f) for f in frames)
+        columns: Dict[str, Optional[np.ndarray]] = {}
+        categories: Dict[str, np.ndarray] = {}
+        for name in INT_FIELDS + FLOAT_FIELDS:
+            columns[name] = np.concatenate([f._columns[name] for f in frames])  # type: ignore
+        for name in BOOL_FIELDS:
+            for key in (name, name + "?"):
+                columns[key] = np.packbits(
+                    np.concatenate([_unpack(f._columns[key], len(f)) for f in frames])  # type: ignore
+                )
+        for name in CATEGORICAL_FIELDS:
+            union = np.unique(np.concatenate([f._categories[name] for f in frames]))
+            categories[name] = union
+            columns[name] = np.concatenate(
+                [_recode(f._columns[name], f._categories[name], union) for f in frames]  # type: ignore
+            )
+        for name in OBJECT_FIELDS:
+            if all(f._columns[name] is None for f in frames):
+                columns[name] = None
+            else:
+                columns[name] = np.concatenate([f.column(name) for f in frames])
+        return cls(columns, categories, n)
+
+    # Access
+
+    def column(self, name: str) -> np.ndarray:
+        """Get a field as an array.
+        Categorical fields are decoded to an object array of strings (with None for missing values),
+        and boolean fields are unpacked (with missing values as False).
+        """
+        if name in CATEGORICAL_FIELDS:
+            codes = self.codes(name)
+            values = np.empty(self._n, dtype=object)
+            present = codes >= 0
+            values[present] = self._categories[name][codes[present]]
+            return values
+        elif name in BOOL_FIELDS:
+            return self.mask(name)
+        col = self._columns[name]
+        if col is None:
+            return np.full(self._n, None, dtype=object)
+        return col
+
+    def __getattr__(self, name: str) -> np.ndarray:
+        if name in BET_FIELDS:
+            return self.column(name)
+        raise AttributeError(name)
+
+    def codes(self, name: str) -> np.ndarray:
+        """The codes of a categorical field. -1 means the value is None."""
+        return self._columns[name]  # type: ignore
+
+    def categories(self, name: str) -> np.ndarray:
+        """The sorted distinct values of a categorical field."""
+        return self._categories[name]
+
+    def code_of(self, name: str, value: str) -> int:
+        """The code of a value of a categorical field, or -1 if no bet has that value."""
+        cats = self._categories[name]
+        i = int(np.searchsorted(cats, value))
+        return i if i < len(cats) and cats[i] == value else -1
+
+    def mask(self, name: str) -> np.ndarray:
+        """A boolean field as a mask. Missing values are False."""
+        return _unpack(self._columns[name], self._n)  # type: ignore
+
+    def isin(self, name: str, values: Iterable[str]) -> np.ndarray:
+        """A mask of the bets whose categorical field `name` is one of `values`."""
+        cats = self._categories[name]
+        wanted = np.asarray(list(values), dtype=str)
+        return np.isin(self.codes(name), np.nonzero(np.isin(cats, wanted))[0])
+
+    def bet(self, i: int) -> Bet:
+        """Reconstruct a single `Bet`."""
+        if not -self._n <= i < self._n:
+            raise IndexError(i)
+        i = i % self._n
+        kwargs: Dict[str, Any] = {}
+        for name in INT_FIELDS:
+            kwargs[name] = int(self._columns[name][i])  # type: ignore
+        for name in FLOAT_FIELDS:
+            v = float(self._columns[name][i])  # type: ignore
+            kwargs[name] = None if np.isnan(v) else v
+        for name in BOOL_FIELDS:
+            byte, bit = divmod(i, 8)
+            if (self._columns[name + "?"][byte] >> (7 - bit)) & 1:  # type: ignore
+                kwargs[name] = bool((self._columns[name][byte] >> (7 - bit)) & 1)  # type: ignore
+            else:
+                kwargs[name] = None
+        for name in CATEGORICAL_FIELDS:
+            code = self._columns[name][i]  # type: ignore
+            kwargs[name] = None if code < 0 else str(self._categories[name][code])
+        for name in OBJECT_FIELDS:
+            col = self._columns[name]
+            kwargs[name] = None if col is None else col[i]
+        return Bet(**kwargs)
+
+    def to_bets(self) -> List[Bet]:
+        return [self.bet(i) for i in range(self._n)]
+
+    def __iter__(self) -> Iterator[Bet]:
+        return (self.bet(i) for i in range(self._n))
+
+    @overload
+    def __getitem__(self, key: int) -> Bet:
+        ...
+
+    @overload
+    def __getitem__(self, key: Index) -> "BetFrame":
+        ...
+
+    def __getitem__(self, key):
+        """Get one `Bet` by position, or a new frame from a slice, boolean mask or array of positions."""
+        if isinstance(key, (int, np.integer)):
+            return self.bet(int(key))
+        return self.take(key)
+
+    # Selection
+
+    def take(self, key: Index) -> "BetFrame":
+        """Select bets by slice, boolean mask or positions.
+        Slices of numeric and categorical columns are views, not copies.
+        """
+        if not isinstance(key, slice):
+            key = np.asarray(key)
+            if key.dtype == bool:
+                if len(key) != self._n:
+                    raise IndexError(f"Mask has length {len(key)}, expected {self._n}")
+                key = np.flatnonzero(key)
+        n = len(range(*key.indices(self._n))) if isinstance(key, slice) else len(key)
+        columns: Dict[str, Optional[np.ndarray]] = {}
+        for name, col in self._columns.items():
+            if col is None:
+                columns[name] = None
+            elif name.rstrip("?") in BOOL_FIELDS:
+                columns[name] = _take_bits(col, self._n, key)
+            else:
+                columns[name] = col[key]
+        return BetFrame(columns, self._categories, n)
+
+    def filter(self, mask: np.ndarray) -> "BetFrame":
+        """Select the bets where `mask` is true."""
+        return self.take(mask)
+
+    def argsort(self, by: Union[str, Sequence[str]], descending: bool = False) -> np.ndarray:
+        """Positions that would sort the frame by one or more fields, the first field being the primary key.
+        Categorical fields sort by value, since categories are sorted. Ascending sorts are stable.
+        """
+        fields = [by] if isinstance(by, str) else list(by)
+        keys = [self.mask(f) if f in BOOL_FIELDS else self._columns[f] for f in reversed(fields)]
+        order = np.lexsort(keys)  # type: ignore
+        return order[::-1] if descending else order
+
+    def sort(self, by: Union[str, Sequence[str]], descending: bool = False) -> "BetFrame":
+        """Sort by one or more fields. See `argsort`."""
+        return self.take(self.argsort(by, descending))
+
+    def where(self, **equals: Any) -> "BetFrame":
+        """Select the bets whose fields equal the given values, e.g. `frame.where(contractId="abc", outcome="YES")`."""
+        mask = np.ones(self._n, dtype=bool)
+        for name, value in equals.items():
+            if name in CATEGORICAL_FIELDS:
+                code = self.code_of(name, value)
+                mask &= (self.codes(name) == code) & (code >= 0)
+            else:
+                mask &= self.column(name) == value
+        return self.take(mask)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the columns and categories, not counting objects referenced by object columns."""
+        cols = sum(c.nbytes for c in self._columns.values() if c is not None)
+        return cols + sum(c.nbytes for c in self._categories.values())
@@ -0,0 +1,126 @@
+"""In-process cache for GET responses of single-entity endpoints.
+Enable it by giving the transport a cache:
+```
+from manifoldpy import cache, transport
+transport.set_transport(transport.Transport(cache=cache.ResponseCache()))
+```
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+import requests
+from attr import define
+
+from manifoldpy.transport import endpoint_name
+
+# Time to live in seconds for each cached endpoint
+DEFAULT_TTLS: Dict[str, float] = {
+    "market/{}": 60,
+    "slug/{}": 60,
+    "user/{}": 300,
+    "user/by-id/{}": 300,
+    "group/by-id/{group_id}": 300,
+}
+
+
+@define
+class CacheStats:
+    """Counters for a `ResponseCache`.
+
+    Attributes:
+        hits: Responses served from the cache without a request.
+        misses: Responses fetched in full.
+        revalidations: Stale responses confirmed unchanged by the server (a 304 response).
+        evictions: Entries dropped because the cache was full.
+    """
+
+    hits: int = 0
+    misses: int = 0
+    revalidations: int = 0
+    evictions: int = 0
+
+
+@define
+class _Entry:
+    response: requests.Response
+    expires: float
+
+
+class ResponseCache:
+    """A size-bounded LRU cache of responses, with a time to live per endpoint.
+    Once an entry expires it is revalidated with `If-None-Match`/`If-Modified-Since`
+    if the server sent an `ETag` or `Last-Modified` header, so an unchanged entity costs a 304 response.
+
+    Args:
+        maxsize: The maximum number of responses to keep.
+        ttls: Time to live in seconds for each endpoint, e.g. `{"market/{}": 60}`.
+            Only endpoints listed here are cached. Defaults to `DEFAULT_TTLS`.
+    """
+
+    def __init__(self, maxsize: int = 10000, ttls: Optional[Dict[str, float]] = None) -> None:
+        self.maxsize = maxsize
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self.stats = CacheStats()
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def caches(self, endpoint: str) -> bool:
+        """Check if responses from an endpoint are cached."""
+        return endpoint_name(endpoint) in self.ttls
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def get(
+        self,
+        prepped: requests.PreparedRequest,
+        endpoint: str,
+        fetch: Callable[[requests.PreparedRequest], requests.Response],
+    ) -> requests.Response:
+        """Get a response from the cache, using `fetch` to send the request if needed.
+
+        Args:
+            prepped: The GET request.
+            endpoint: The URL template of the endpoint.
+            fetch: Sends a request and returns its response.
+        """
+        key: str = prepped.url  # type: ignore
+        ttl = self.ttls[endpoint_name(endpoint)]
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                if time.monotonic() < entry.expires:
+                    self.stats.hits += 1
+                    return entry.response
+
+        if entry is not None:
+            etag = entry.response.headers.get("ETag")
+            last_modified = entry.response.headers.get("Last-Modified")
+            if etag is not None:
+                prepped.headers["If-None-Match"] = etag
+            if last_modified is not None:
+                prepped.headers["If-Modified-Since"] = last_modified
+
+        resp = fetch(prepped)
+        with self._lock:
+            if resp.status_code == 304 and entry is not None:
+                self.stats.revalidations += 1
+                entry.expires = time.monotonic() + ttl
+                self._entries[key] = entry
+                return entry.response
+
+            self.stats.misses += 1
+            if resp.status_code == 200:
+                self._entries[key] = _Entry(resp, time.monotonic() + ttl)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                    self.stats.evictions += 1
+        return resp
@@ -0,0 +1,161 @@
+"""Accuracy metrics for resolved binary markets: Brier scores, log scores and calibration.
+Everything operates on arrays of probabilities and outcomes (1 for YES, 0 for NO), so large sets of markets are scored at once.
+"""
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from manifoldpy import api
+from manifoldpy.betframe import BetFrame
+from manifoldpy.history import Histories, probability_histories
+
+# Points in a market's life that `build_dataframe` computes probabilities at
+POINTS = ("start", "midpoint", "close")
+
+DEFAULT_BINS = np.linspace(0, 1, 11)
+
+
+def brier_scores(probs: np.ndarray, outcomes: np.ndarray) -> np.ndarray:
+    """The Brier score of each forecast. Lower is better."""
+    return (np.asarray(probs, dtype=np.float64) - outcomes) ** 2
+
+
+def brier_score(probs: np.ndarray, outcomes: np.ndarray) -> float:
+    """The mean Brier score of a set of forecasts. Lower is better."""
+    return float(np.mean(brier_scores(probs, outcomes)))
+
+
+def log_scores(probs: np.ndarray, outcomes: np.ndarray, eps: float = 1e-15) -> np.ndarray:
+    """The log score (log probability assigned to the actual outcome) of each forecast. Higher is better.
+
+    Args:
+        probs: Forecast probabilities of YES.
+        outcomes: 1 for YES, 0 for NO.
+        eps: Probabilities are clipped to [eps, 1 - eps], so a confident miss isn't infinitely bad.
+    """
+    p = np.clip(np.asarray(probs, dtype=np.float64), eps, 1 - eps)
+    return np.where(np.asarray(outcomes) == 1, np.log(p), np.log1p(-p))
+
+
+def log_score(probs: np.ndarray, outcomes: np.ndarray, eps: float = 1e-15) -> float:
+    """The mean log score of a set of forecasts. Higher is better."""
+    return float(np.mean(log_scores(probs, outcomes, eps)))
+
+
+def calibration_curve(
+    probs: np.ndarray, outcomes: np.ndarray, bins: np.ndarray = DEFAULT_BINS
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Bin forecasts by probability and compare each bin's average forecast with how often it resolved YES.
+
+    Args:
+        probs: Forecast probabilities of YES.
+        outcomes: 1 for YES, 0 for NO.
+        bins: Bin edges. Forecasts equal to the last edge go in the last bin.
+
+    Returns:
+        The mean forecast in each bin, the fraction of YES outcomes in each bin (both NaN for empty bins),
+        and the number of forecasts in each bin.
+    """
+    probs = np.asarray(probs, dtype=np.float64)
+    n_bins = len(bins) - 1
+    index = np.clip(np.digitize(probs, bins) - 1, 0, n_bins - 1)
+    counts = np.bincount(index, minlength=n_bins)
+    prob_sums = np.bincount(index, weights=probs, minlength=n_bins)
+    yes_sums = np.bincount(index, weights=np.asarray(outcomes, dtype=np.float64), minlength=n_bins)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return prob_sums / counts, yes_sums / counts, counts
+
+
+def market_set_accuracy(
+    yes_probs: np.ndarray, no_probs: np.ndarray, bins: np.ndarray = DEFAULT_BINS
+) -> np.ndarray:
+    """The fraction of markets in each probability bin that resolved YES.
+
+    Args:
+        yes_probs: Probabilities of markets that resolved YES.
+        no_probs: Probabilities of markets that resolved NO.
+        bins: Bin edges.
+    """
+    probs = np.concatenate((np.asarray(yes_probs), np.asarray(no_probs)))
+    outcomes = np.concatenate((np.ones(len(yes_probs)), np.zeros(len(no_probs))))
+    return calibration_curve(probs, outcomes, bins)[1]
+
+
+def build_dataframe(
+    markets: Sequence[api.Market], bets: Optional[BetFrame] = None
+) -> Tuple[pd.DataFrame, Histories]:
+    """Tabulate binary markets with their probability at several points in their life.
+    The points are "start" (the starting probability), "midpoint" (halfway between creation and close),
+    "close" (at the earlier of the close and resolution times), and "final" (after the last bet).
+    Markets without bets use their current probability at every point.
+
+    Args:
+        markets: Binary markets.
+        bets: All bets on the markets. If not given, the markets' own bets are used.
+
+    Returns:
+        The table, with one row per market and an "outcome" column (1 for YES, 0 for NO, NaN otherwise),
+        and the probability histories of the markets.
+    """
+    if bets is None:
+        bets = BetFrame.concat([BetFrame.from_bets(m.bets or []) for m in markets])
+    df = pd.DataFrame(
+        {
+            "id": [m.id for m in markets],
+            "resolution": [m.resolution for m in markets],
+            "createdTime": [m.createdTime for m in markets],
+            "probability": [m.probability for m in markets],
+        }
+    )
+    histories = probability_histories(bets, dict(zip(df["id"], df["createdTime"])))
+
+    never = np.iinfo(np.int64).max
+    created = df["createdTime"].to_numpy(dtype=np.int64)
+    close_times = [
+        min(t for t in (m.closeTime, m.resolutionTime, never) if t is not None) for m in markets
+    ]
+    close = np.array(close_times, dtype=np.int64)
+    midpoint = np.where(close == never, never, created + (close - created) // 2)
+
+    position = histories.positions(df["id"].to_numpy(dtype=str))
+    has_history = position >= 0
+    fallback = df["probability"].to_numpy(dtype=np.float64)
+
+    def at(per_market: np.ndarray) -> np.ndarray:
+        values = fallback.copy()
+        values[has_history] = per_market[position[has_history]]
+        return values
+
+    def at_times(times: np.ndarray) -> np.ndarray:
+        query = np.full(len(histories), never, dtype=np.int64)
+        query[position[has_history]] = times[has_history]
+        return at(histories.at(query))
+
+    df["start"] = at(histories.start)
+    df["midpoint"] = at_times(midpoint)
+    df["close"] = at_times(close)
+    df["final"] = at(histories.final)
+    df["outcome"] = df["resolution"].map({"YES": 1.0, "NO": 0.0})
+    return df, histories
+
+
+def score_points(df: pd.DataFrame, points: Sequence[str] = POINTS + ("final",)) -> pd.DataFrame:
+    """Brier and log scores of the markets in a `build_dataframe` table at each point.
+    Markets that didn't resolve YES or NO are skipped.
+
+    Returns:
+        A table with one row per point, and columns "brier", "log" and "n".
+    """
+    resolved = df[df["outcome"].notna()]
+    outcomes = resolved["outcome"].to_numpy()
+    rows = {}
+    for point in points:
+        probs = resolved[point].to_numpy(dtype=np.float64)
+        valid = ~np.isnan(probs)
+        rows[point] = {
+            "brier": brier_score(probs[valid], outcomes[valid]) if valid.any() else np.nan,
+            "log": log_score(probs[valid], outcomes[valid]) if valid.any() else np.nan,
+            "n": int(valid.sum()),
+        }
+    return pd.DataFrame.from_dict(rows, orient="index")
@@ -0,0 +1,141 @@
+"""A memory-mapped, on-disk columnar store of bets.
+Bets are grouped by market and written one file per column, plus an index from market to row range.
+Opening a store only reads file headers, and loading a market's bets returns zero-copy views of the files.
+
+Layout of a store directory:
+    meta.json               Number of bets and the list of columns.
+    {column}.npy            Fixed-width column, in `BetFrame` format (codes, packed bits or numbers).
+    {column}.valid.npy      Packed mask of which values of a boolean column are present.
+    {column}.cat.npy        Sorted categories of a categorical column.
+    {column}.json.bin       Object columns (fills, fees, sale) as concatenated JSON...
+    {column}.json.off.npy   ...and the byte offset of each row.
+    index.npy               Row offsets of each market, aligned with contractId.cat.npy.
+"""
+import json
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+import numpy as np
+
+from manifoldpy import jsonlib
+from manifoldpy.betframe import CATEGORICAL_FIELDS, OBJECT_FIELDS, BetFrame
+
+FORMAT_VERSION = 1
+
+
+def _filename(column: str) -> str:
+    # The validity masks of boolean columns are named e.g. "isFilled?"
+    return column.replace("?", ".valid") + ".npy"
+
+
+def write_colstore(frame: BetFrame, directory: Union[str, Path]) -> None:
+    """Write bets to a store directory, grouped by market and sorted by time within each market.
+
+    Args:
+        frame: The bets to write.
+        directory: Where to write the store. Created if it doesn't exist. Existing files are overwritten.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    frame = frame.sort(["contractId", "createdTime"])
+    columns = []
+    for name, col in frame._columns.items():
+        if name in OBJECT_FIELDS:
+            if col is None:
+                continue
+            encoded = [jsonlib.dumps(v) for v in col]
+            offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+            np.cumsum([len(e) for e in encoded], out=offsets[1:])
+            (directory / f"{name}.json.bin").write_bytes(b"".join(encoded))
+            np.save(directory / f"{name}.json.off.npy", offsets)
+        else:
+            np.save(directory / _filename(name), col)  # type: ignore
+        columns.append(name)
+    for name in CATEGORICAL_FIELDS:
+        np.save(directory / f"{name}.cat.npy", frame.categories(name))
+
+    codes = frame.codes("contractId")
+    n_markets = len(frame.categories("contractId"))
+    index = np.searchsorted(codes, np.arange(n_markets + 1)).astype(np.int64)
+    np.save(directory / "index.npy", index)
+    meta = {"version": FORMAT_VERSION, "n": len(frame), "columns": columns}
+    (directory / "meta.json").write_text(json.dumps(meta))
+
+
+class ColumnStore:
+    """A read-only view of a store directory written by `write_colstore`.
+
+    Args:
+        directory: The store directory.
+    """
+
+    def __init__(self, directory: Union[str, Path]) -> None:
+        self.directory = Path(directory)
+        meta = json.loads((self.directory / "meta.json").read_text())
+        if meta["version"] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported store version {meta['version']}")
+        self.n: int = meta["n"]
+        self._columns: Dict[str, Optional[np.ndarray]] = {}
+        self._objects: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        for name in meta["columns"]:
+            if name in OBJECT_FIELDS:
+                blob = self._load_bytes(f"{name}.json.bin")
+                offsets = np.load(self.directory / f"{name}.json.off.npy", mmap_mode="r")
+                self._objects[name] = (blob, offsets)
+            else:
+                self._columns[name] = np.load(self.directory / _filename(name), mmap_mode="r")
+        for name in OBJECT_FIELDS:
+            self._columns.setdefault(name, None)
+        self._categories = {
+            name: np.load(self.directory / f"{name}.cat.npy", mmap_mode="r")
+            for name in CATEGORICAL_FIELDS
+        }
+        self._index = np.load(self.directory / "index.npy", mmap_mode="r")
+
+    def _load_bytes(self, name: str) -> np.ndarray:
+        path = self.directory / name
+        if path.stat().st_size == 0:
+            return np.zeros(0, dtype=np.uint8)
+        return np.memmap(path, dtype=np.uint8, mode="r")
+
+    def __len__(self) -> int:
+        return self.n
+
+    def __contains__(self, market_id: str) -> bool:
+        return self._market_code(market_id) >= 0
+
+    @property
+    def market_ids(self) -> np.ndarray:
+        """The IDs of every market with bets in the store, sorted."""
+        return self._categories["contractId"]
+
+    def _market_code(self, market_id: str) -> int:
+        ids = self.market_ids
+        i = int(np.searchsorted(ids, market_id))
+        return i if i < len(ids) and ids[i] == market_id else -1
+
+    def rows(self, market_id: str) -> Tuple[int, int]:
+        """The row range of a market's bets. Empty if the market has no bets in the store."""
+        code = self._market_code(market_id)
+        if code < 0:
+            return (0, 0)
+        return int(self._index[code]), int(self._index[code + 1])
+
+    def _frame(self, start: int, stop: int) -> BetFrame:
+        view = BetFrame(self._columns, self._categories, self.n)[start:stop]
+        for name, (blob, offsets) in self._objects.items():
+            col = np.empty(stop - start, dtype=object)
+            for i, row in enumerate(range(start, stop)):
+                col[i] = jsonlib.loads(blob[offsets[row] : offsets[row + 1]].tobytes())
+            view._columns[name] = col
+        return view
+
+    def bets(self, market_id: str) -> BetFrame:
+        """A market's bets, oldest first.
+        Numeric and categorical columns are views of the memory-mapped files.
+        """
+        return self._frame(*self.rows(market_id))
+
+    def frame(self) -> BetFrame:
+        """Every bet in the store, grouped by market."""
+        return self._frame(0, self.n)
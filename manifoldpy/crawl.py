@@ -0,0 +1,283 @@
+"""Crawl every market, with its bets and comments, using several processes.
+
+The market IDs are split into one shard per worker process. Each worker has its own connection pool and writes
+JSON lines to its own directory, checkpointing after every market, so a killed crawl resumes where it stopped.
+The workers share one rate limit through files in the output directory.
+When the crawl is done, `merge` loads the shards into a `Store`, keeping one copy of each record.
+
+Can be run as a script:
+```
+python -m manifoldpy.crawl crawl_dir --workers 8
+python -m manifoldpy.crawl crawl_dir --merge
+```
+"""
+import argparse
+import multiprocessing
+import os
+import warnings
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set, Tuple, Union
+
+import requests
+
+from manifoldpy import api, jsonlib, ratelimit, retry, transport
+from manifoldpy.metrics import Telemetry
+from manifoldpy.store import DB_LOC, Store
+
+KINDS = ("markets", "bets", "comments")
+
+
+def _shard_dir(out_dir: Path, shard: int) -> Path:
+    return out_dir / f"shard-{shard:03d}"
+
+
+def _list_markets(base_url: str, page_size: int = 1000) -> List[str]:
+    """The ID of every market on a server other than the Manifold API, e.g. a local stand-in."""
+    ids: List[str] = []
+    params: Dict[str, Any] = {"limit": page_size}
+    with transport.Transport(retry=retry.RetryPolicy(), base_url=base_url) as t:
+        while True:
+            resp = t.get(api.ALL_MARKETS_URL, params=params, endpoint=api.ALL_MARKETS_URL)
+            resp.raise_for_status()
+            page = t.decode_json(resp, api.ALL_MARKETS_URL)
+            ids.extend(m["id"] for m in page)
+            if len(page) < page_size:
+                return ids
+            params["before"] = page[-1]["id"]
+
+
+def plan(
+    out_dir: Union[str, Path],
+    workers: int,
+    market_ids: Optional[Sequence[str]] = None,
+    base_url: Optional[str] = None,
+) -> List[List[str]]:
+    """Split the markets to crawl into shards, one per worker.
+    The plan is saved in the output directory, and an existing plan is reused so a resumed crawl shards the same way.
+
+    Args:
+        out_dir: The crawl's output directory.
+        workers: Number of shards.
+        market_ids: The markets to crawl. Defaults to every market.
+        base_url: List the markets from here instead of the Manifold API. See `transport.Transport`.
+
+    Returns:
+        The market IDs in each shard.
+    """
+    out_dir = Path(out_dir)
+    path = out_dir / "plan.json"
+    if path.exists():
+        return jsonlib.loads(path.read_bytes())["shards"]
+    if market_ids is None and base_url is not None:
+        market_ids = _list_markets(base_url)
+    elif market_ids is None:
+        market_ids = [m["id"] for page in api._paginate(api._get_markets) for m in page]
+    shards = [list(market_ids[i::workers]) for i in range(workers)]
+    out_dir.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_bytes(jsonlib.dumps({"shards": shards}))
+    os.replace(tmp, path)
+    return shards
+
+
+def read_checkpoint(shard_dir: Path) -> Tuple[Set[str], Dict[str, int]]:
+    """The markets a shard has finished, and the size of each of its files at the last checkpoint,
+    keyed by `KINDS` and "checkpoint".
+    """
+    done: Set[str] = set()
+    sizes = {kind: 0 for kind in KINDS}
+    valid = 0
+    path = shard_dir / "checkpoint.jsonl"
+    if path.exists():
+        with path.open("rb") as f:
+            for line in f:
+                try:
+                    entry = jsonlib.loads(line)
+                except ValueError:
+                    entry = None
+                if entry is None or not line.endswith(b"\n"):
+                    # A checkpoint cut short by the crawl being killed
+                    break
+                done.add(entry["id"])
+                sizes = entry["sizes"]
+                valid += len(line)
+    return done, {**sizes, "checkpoint": valid}
+
+
+def crawl_shard(
+    shard_dir: Union[str, Path], market_ids: Sequence[str], verbose: bool = False
+) -> Tuple[int, int]:
+    """Fetch the markets in one shard, with their bets and comments, through the default transport.
+    Records are appended to `markets.jsonl`, `bets.jsonl` and `comments.jsonl`, and each finished market is
+    recorded in `checkpoint.jsonl`. Output written after the last checkpoint is discarded when resuming.
+    Markets that fail are skipped, and retried by the next run.
+
+    Args:
+        shard_dir: The shard's output directory.
+        market_ids: The markets in the shard.
+        verbose: If true, print progress.
+
+    Returns:
+        The number of markets finished by this call, and the number that failed.
+    """
+    shard_dir = Path(shard_dir)
+    shard_dir.mkdir(parents=True, exist_ok=True)
+    done, sizes = read_checkpoint(shard_dir)
+    files = {}
+    for kind in (*KINDS, "checkpoint"):
+        f = (shard_dir / f"{kind}.jsonl").open("ab")
+        f.truncate(sizes[kind])
+        f.seek(sizes[kind])
+        files[kind] = f
+    checkpoint = files.pop("checkpoint")
+    finished, failed = 0, 0
+    try:
+        for market_id in market_ids:
+            if market_id in done:
+                continue
+            try:
+                bets = api._paginate(api._get_bets, marketId=market_id)
+                records = {
+                    "markets": [api._get_json(api.SINGLE_MARKET_URL, market_id)],
+                    "bets": [x for page in bets for x in page],
+                    "comments": api._get_comments(marketId=market_id),
+                }
+            except requests.RequestException as e:
+                warnings.warn(f"Failed to crawl market {market_id}: {e!r}")
+                failed += 1
+                continue
+            for kind, f in files.items():
+                f.write(b"".join(jsonlib.dumps(x) + b"\n" for x in records[kind]))
+                f.flush()
+            sizes = {kind: f.tell() for kind, f in files.items()}
+            checkpoint.write(jsonlib.dumps({"id": market_id, "sizes": sizes}) + b"\n")
+            checkpoint.flush()
+            finished += 1
+            if verbose and finished % 100 == 0:
+                print(f"{shard_dir.name}: {len(done) + finished}/{len(market_ids)}")
+    finally:
+        checkpoint.close()
+        for f in files.values():
+            f.close()
+    return finished, failed
+
+
+def _worker(
+    shard_dir: Path,
+    market_ids: List[str],
+    rate_path: Path,
+    base_url: Optional[str],
+    verbose: bool,
+) -> None:
+    # A fresh transport, so each process has its own connection pool, sharing one rate limit through files
+    transport.set_transport(
+        transport.Transport(
+            rate_limiter=ratelimit.RateLimiter(path=rate_path),
+            retry=retry.RetryPolicy(),
+            concurrency=retry.AdaptiveLimit(),
+            telemetry=Telemetry(),
+            base_url=base_url,
+        )
+    )
+    finished, failed = crawl_shard(shard_dir, market_ids, verbose)
+    if verbose:
+        print(f"{shard_dir.name}: finished {finished} markets, {failed} failed")
+
+
+def crawl(
+    out_dir: Union[str, Path],
+    workers: int = 4,
+    market_ids: Optional[Sequence[str]] = None,
+    base_url: Optional[str] = None,
+    verbose: bool = False,
+) -> int:
+    """Crawl markets with one process per shard. Rerunning a crawl in the same directory resumes it.
+
+    Args:
+        out_dir: The crawl's output directory.
+        workers: Number of worker processes. Ignored when resuming, since the shards are already planned.
+        market_ids: The markets to crawl. Defaults to every market.
+        base_url: Send requests here instead of the Manifold API. See `transport.Transport`.
+        verbose: If true, print progress.
+
+    Returns:
+        The number of planned markets that haven't been crawled, e.g. because fetching them failed.
+    """
+    out_dir = Path(out_dir)
+    shards = plan(out_dir, workers, market_ids, base_url)
+    ctx = multiprocessing.get_context("spawn")
+    processes = [
+        ctx.Process(
+            target=_worker,
+            args=(_shard_dir(out_dir, i), ids, out_dir / "ratelimit", base_url, verbose),
+        )
+        for i, ids in enumerate(shards)
+    ]
+    for p in processes:
+        p.start()
+    for i, p in enumerate(processes):
+        p.join()
+        if p.exitcode != 0:
+            warnings.warn(f"Worker for shard {i} exited with code {p.exitcode}")
+    missing = sum(
+        len(set(ids) - read_checkpoint(_shard_dir(out_dir, i))[0]) for i, ids in enumerate(shards)
+    )
+    if verbose:
+        print(f"{missing} markets not crawled")
+    return missing
+
+
+def iter_shards(out_dir: Union[str, Path], kind: str) -> Iterator[Dict[str, Any]]:
+    """Iterate over the checkpointed records of one kind in every shard, without deduplicating them."""
+    for shard_dir in sorted(Path(out_dir).glob("shard-*")):
+        size = read_checkpoint(shard_dir)[1][kind]
+        if size == 0:
+            continue
+        with (shard_dir / f"{kind}.jsonl").open("rb") as f:
+            while f.tell() < size:
+                yield jsonlib.loads(f.readline())
+
+
+def _note_ids(records: Iterator[Dict[str, Any]], seen: Set[str]) -> Iterator[Dict[str, Any]]:
+    for x in records:
+        seen.add(x["id"])
+        yield x
+
+
+def merge(out_dir: Union[str, Path], store: Store) -> Dict[str, int]:
+    """Load every shard of a crawl into a store, keeping one copy of each record.
+    Records that appear more than once, or are already stored, are replaced by the last copy.
+
+    Returns:
+        The number of distinct markets, bets and comments in the crawl.
+    """
+    counts = {}
+    for kind, add in (
+        ("markets", store.add_markets),
+        ("bets", store.add_bets),
+        ("comments", store.add_comments),
+    ):
+        seen: Set[str] = set()
+        add(_note_ids(iter_shards(out_dir, kind), seen))
+        counts[kind] = len(seen)
+    return counts
+
+
+def main() -> None:  # pragma: no cover
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("out_dir", type=Path)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument(
+        "--merge", action="store_true", help="Merge a finished crawl into the store"
+    )
+    parser.add_argument("--db", type=Path, default=DB_LOC)
+    args = parser.parse_args()
+    if args.merge:
+        with Store(args.db) as store:
+            print(f"Merged {merge(args.out_dir, store)}")
+    else:
+        crawl(args.out_dir, args.workers, verbose=True)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -0,0 +1,161 @@
+"""Load Manifold's bulk data dumps into a local `Store`.
+[Data dumps](https://docs.manifold.markets/api#trade-history-dumps)
+
+Dump files are parsed incrementally, so multi-gigabyte files never need to fit in memory.
+Supported formats are JSON arrays, JSON lines (`.jsonl`/`.ndjson`), either optionally gzipped,
+and zip archives of those.
+
+Can be run as a script:
+```
+python -m manifoldpy.dumps manifold-dump-bets-*.json --catch-up
+```
+"""
+import argparse
+import gzip
+import io
+import json
+import zipfile
+from itertools import takewhile
+from pathlib import Path
+from typing import IO, Any, Dict, Iterator, Optional, Union
+
+from manifoldpy import api
+from manifoldpy.store import DB_LOC, Store
+
+# Characters read from a dump at a time
+READ_SIZE = 1 << 20
+# The most characters read ahead looking for the end of one record, before the dump is taken to be malformed
+MAX_RECORD = 1 << 26
+
+KINDS = ("bets", "markets", "comments")
+
+
+def iter_json_array(
+    f: IO[str], read_size: int = READ_SIZE, max_record: int = MAX_RECORD
+) -> Iterator[Any]:
+    """Iterate over the elements of a JSON array (or JSON lines) in a text stream, without reading it all.
+
+    Raises:
+        json.JSONDecodeError: If the stream ends partway through a record, or a record still can't be decoded
+            after reading `max_record` characters past its start.
+    """
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+    eof = False
+    while True:
+        # Skip separators between elements
+        while pos < len(buf) and buf[pos] in " \t\r\n,[]":
+            pos += 1
+        if pos == len(buf):
+            if eof:
+                return
+            buf, pos = f.read(read_size), 0
+            eof = len(buf) == 0
+            continue
+        try:
+            obj, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            if eof or len(buf) - pos > max_record:
+                raise
+            chunk = f.read(read_size)
+            eof = len(chunk) == 0
+            buf, pos = buf[pos:] + chunk, 0
+            continue
+        yield obj
+        pos = end
+
+
+def _open_text(name: str, raw: IO[bytes]) -> IO[str]:
+    if name.endswith(".gz"):
+        raw = gzip.open(raw)  # type: ignore
+    return io.TextIOWrapper(raw, encoding="utf-8")
+
+
+def iter_dump(path: Union[str, Path]) -> Iterator[Dict[str, Any]]:
+    """Iterate over the records in a dump file."""
+    path = Path(path)
+    if path.suffix == ".zip":
+        with zipfile.ZipFile(path) as archive:
+            for name in archive.namelist():
+                if name.endswith("/"):
+                    continue
+                with archive.open(name) as raw:
+                    yield from iter_json_array(_open_text(name, raw))
+    else:
+        with path.open("rb") as raw:
+            yield from iter_json_array(_open_text(path.name, raw))
+
+
+def dump_kind(path: Union[str, Path]) -> str:
+    """Guess whether a dump holds bets, markets or comments from its name."""
+    name = Path(path).name.lower()
+    if "contract" in name:
+        return "markets"
+    for kind in KINDS:
+        if kind in name:
+            return kind
+    raise ValueError(f"Can't tell what {name} contains, pass kind explicitly.")
+
+
+def load_dump(path: Union[str, Path], store: Store, kind: Optional[str] = None) -> int:
+    """Load a dump file into a store. Records that are already stored are replaced.
+
+    Args:
+        path: The dump file.
+        store: The store to load into.
+        kind: One of "bets", "markets" or "comments". Guessed from the file name if not given.
+
+    Returns:
+        The number of records loaded.
+    """
+    kind = kind or dump_kind(path)
+    records = iter_dump(path)
+    if kind == "bets":
+        return store.add_bets(records)
+    elif kind == "markets":
+        return store.add_markets(records)
+    elif kind == "comments":
+        return store.add_comments(records)
+    raise ValueError(f"Unknown kind {kind}, expected one of {KINDS}")
+
+
+def catch_up(store: Store) -> Dict[str, int]:
+    """Fetch bets and markets created after the newest stored ones from the API.
+    Existing markets that changed after the dump aren't refetched; use `sync` for that.
+    Comments aren't caught up, since `api.get_comments` has no cursor to follow back to the newest stored one.
+    Fetch them per market with `api.get_comments(marketId=...)` instead.
+
+    Returns:
+        The number of new bets and markets stored.
+    """
+    counts = {}
+    for kind, fetch, add in (
+        ("bets", api._get_bets, store.add_bets),
+        ("markets", api._get_markets, store.add_markets),
+    ):
+        latest = store.latest_time(kind) or 0
+        pages = api._paginate(fetch)  # type: ignore
+        records = (x for page in pages for x in page)
+        counts[kind] = add(takewhile(lambda x: x["createdTime"] > latest, records))
+    return counts
+
+
+def main() -> None:  # pragma: no cover
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("files", nargs="*", type=Path)
+    parser.add_argument("--db", type=Path, default=DB_LOC)
+    parser.add_argument("--kind", choices=KINDS, default=None)
+    parser.add_argument(
+        "--catch-up", action="store_true", help="Fetch newer bets and markets from the API"
+    )
+    args = parser.parse_args()
+    with Store(args.db) as store:
+        for path in args.files:
+            print(f"Loaded {load_dump(path, store, args.kind)} records from {path}")
+        if args.catch_up:
+            print(f"Caught up: {catch_up(store)}")
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -0,0 +1,232 @@
+"""Probability histories for many markets at once, computed from a `BetFrame`."""
+from typing import Literal, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from manifoldpy.betframe import BetFrame
+
+
+Method = Literal["last", "twap"]
+
+
+class Histories:
+    """The probability histories of a set of markets, stored end to end.
+    Market `k`'s history is `times[offsets[k]:offsets[k + 1]]` and `probs[offsets[k]:offsets[k + 1]]`,
+    and its first point is the market's starting probability.
+
+    Args:
+        market_ids: Sorted IDs of the markets.
+        offsets: Where each market's history starts, plus the total length at the end.
+        times: Time of each point, sorted within each market.
+        probs: Probability at each point.
+    """
+
+    def __init__(
+        self, market_ids: np.ndarray, offsets: np.ndarray, times: np.ndarray, probs: np.ndarray
+    ) -> None:
+        self.market_ids = market_ids
+        self.offsets = offsets
+        self.times = times
+        self.probs = probs
+
+    def __len__(self) -> int:
+        return len(self.market_ids)
+
+    def __contains__(self, market_id: str) -> bool:
+        return self.index(market_id) >= 0
+
+    def index(self, market_id: str) -> int:
+        """Position of a market, or -1 if it isn't included."""
+        return int(self.positions(np.array([market_id]))[0])
+
+    def positions(self, market_ids: np.ndarray) -> np.ndarray:
+        """Positions of several markets, with -1 for markets that aren't included."""
+        market_ids = np.asarray(market_ids, dtype=str)
+        if len(self.market_ids) == 0:
+            return np.full(len(market_ids), -1)
+        found = np.minimum(np.searchsorted(self.market_ids, market_ids), len(self.market_ids) - 1)
+        return np.where(self.market_ids[found] == market_ids, found, -1)
+
+    def __getitem__(self, market_id: str) -> Tuple[np.ndarray, np.ndarray]:
+        """The history of one market, in the same format as `Market.probability_history`."""
+        i = self.index(market_id)
+        if i < 0:
+            raise KeyError(market_id)
+        lo, hi = self.offsets[i], self.offsets[i + 1]
+        return self.times[lo:hi], self.probs[lo:hi]
+
+    @property
+    def start(self) -> np.ndarray:
+        """The starting probability of each market."""
+        return self.probs[self.offsets[:-1]]
+
+    @property
+    def final(self) -> np.ndarray:
+        """The final probability of each market."""
+        return self.probs[self.offsets[1:] - 1]
+
+    @property
+    def market_index(self) -> np.ndarray:
+        """The position of the market each point belongs to."""
+        return np.repeat(np.arange(len(self.market_ids)), np.diff(self.offsets))
+
+    def _locate(self, markets: np.ndarray, times: np.ndarray) -> np.ndarray:
+        """For each (market position, time) query, find the last point of that market at or before that time.
+        Returns -1 where the time is before the market's first point.
+        """
+        # Replace times with their ranks, so (market, time) fits in one int64 key without overflow
+        _, ranks = np.unique(np.concatenate((self.times, times)), return_inverse=True)
+        ranks = ranks.reshape(-1)
+        span = len(ranks) + 1
+        point_keys = self.market_index.astype(np.int64) * span + ranks[: len(self.times)]
+        query_keys = markets.astype(np.int64) * span + ranks[len(self.times) :]
+        found = np.searchsorted(point_keys, query_keys, side="right") - 1
+        return np.where(found >= self.offsets[markets], found, -1)
+
+    def at(self, times: np.ndarray) -> np.ndarray:
+        """The probability of each market at a time, one time per market.
+        NaN where the time is before the market's first point.
+
+        Args:
+            times: One time per market, aligned with `market_ids`.
+        """
+        if len(self) == 0:
+            return np.zeros(0)
+        found = self._locate(np.arange(len(self)), np.asarray(times, dtype=np.int64))
+        return np.where(found >= 0, self.probs[found], np.nan)
+
+    def _cumulative_area(self) -> np.ndarray:
+        """The integral of each market's probability over time, from its first point up to each point."""
+        area = np.zeros(len(self.times))
+        if len(self.times) > 1:
+            step = self.probs[:-1] * np.diff(self.times)
+            area[1:] = np.cumsum(step)
+            # Steps that cross from one market to the next don't count
+            area -= np.repeat(area[self.offsets[:-1]], np.diff(self.offsets))
+        return area
+
+    def probability_at(
+        self,
+        timestamps: Sequence[int],
+        market_ids: Optional[Sequence[str]] = None,
+        method: Method = "last",
+    ) -> np.ndarray:
+        """The probability of many markets at many times, in one vectorized lookup.
+
+        Args:
+            timestamps: Times to query, in milliseconds since epoch. Must be sorted for "twap".
+            market_ids: Markets to query. Defaults to `market_ids`.
+            method: "last" gives the probability at each timestamp.
+                "twap" gives the time-weighted average probability over the interval ending at each timestamp,
+                starting at the previous timestamp (or the market's first point, for the first timestamp).
+
+        Returns:
+            A (markets x timestamps) matrix. Entries are NaN for unknown markets,
+            and for times (or whole intervals) before a market's first point.
+        """
+        ts = np.asarray(timestamps, dtype=np.int64)
+        positions = (
+            np.arange(len(self))
+            if market_ids is None
+            else self.positions(np.asarray(market_ids, dtype=str))
+        )
+        result = np.full((len(positions), len(ts)), np.nan)
+        known = np.flatnonzero(positions >= 0)
+        if len(known) == 0 or len(ts) == 0:
+            return result
+        markets = np.repeat(positions[known], len(ts))
+        times = np.tile(ts, len(known))
+        found = self._locate(markets, times)
+        valid = found >= 0
+        last = np.where(valid, self.probs[found], np.nan)
+
+        if method == "last":
+            result[known] = last.reshape(len(known), len(ts))
+            return result
+        elif method != "twap":
+            raise ValueError(f"Unknown method {method}, expected 'last' or 'twap'")
+        if np.any(np.diff(ts) < 0):
+            raise ValueError("Timestamps must be sorted for 'twap'")
+
+        cumulative = self._cumulative_area()
+        area = np.where(valid, cumulative[found] + last * (times - self.times[found]), 0.0)
+        area = area.reshape(len(known), len(ts))
+        # Each window runs from the previous timestamp, but never starts before the market's first point
+        first_time = self.times[self.offsets[positions[known]]][:, None]
+        previous = np.concatenate(([np.iinfo(np.int64).min], ts[:-1]))
+        window_start = np.maximum(previous[None, :], first_time)
+        window_area = np.diff(area, axis=1, prepend=0.0)
+        length = ts[None, :] - window_start
+        with np.errstate(invalid="ignore", divide="ignore"):
+            twap = np.where(length > 0, window_area / length, last.reshape(len(known), len(ts)))
+        result[known] = twap
+        return result
+
+
+def probability_histories(
+    frame: BetFrame, created_times: Optional[Mapping[str, int]] = None
+) -> Histories:
+    """Build the probability history of every market in a frame in one pass.
+    Each history matches `Market.probability_history`: the market's starting probability
+    (the `probBefore` of its first bet) followed by the `probAfter` of each bet.
+
+    Args:
+        frame: Bets from any number of markets.
+        created_times: Creation time of each market, used as the time of the first point.
+            Markets that are missing start at the time of their first bet.
+    """
+    order = frame.argsort(["contractId", "createdTime"])
+    codes = frame.codes("contractId")[order]
+    keep = codes >= 0
+    order, codes = order[keep], codes[keep]
+    bet_times = frame.createdTime[order]
+    after = frame.probAfter[order]
+
+    # Positions of the first bet of each market that has bets
+    first = np.flatnonzero(np.diff(codes, prepend=-1))
+    market_codes = codes[first]
+    market_ids = frame.categories("contractId")[market_codes]
+    n_markets = len(first)
+    n_points = len(codes) + n_markets
+
+    # Each market's bets are shifted right by one more slot per earlier market, to make room for start points
+    group = np.repeat(np.arange(n_markets), np.diff(np.append(first, len(codes))))
+    bet_slots = np.arange(len(codes)) + group + 1
+    start_slots = first + np.arange(n_markets)
+
+    start_times = bet_times[first]
+    if created_times is not None and n_markets > 0:
+        created = np.array([created_times.get(m, -1) for m in market_ids], dtype=np.int64)
+        start_times = np.where(created >= 0, created, start_times)
+
+    times = np.empty(n_points, dtype=np.int64)
+    probs = np.empty(n_points, dtype=np.float64)
+    times[bet_slots] = bet_times
+    probs[bet_slots] = after
+    times[start_slots] = start_times
+    probs[start_slots] = frame.probBefore[order[first]]
+    offsets = np.append(start_slots, n_points).astype(np.int64)
+    return Histories(np.asarray(market_ids, dtype=str), offsets, times, probs)
+
+
+def probability_at(
+    frame: BetFrame,
+    timestamps: Sequence[int],
+    market_ids: Optional[Sequence[str]] = None,
+    method: Method = "last",
+    created_times: Optional[Mapping[str, int]] = None,
+) -> np.ndarray:
+    """The probability of many markets at many times, computed directly from their bets.
+    See `Histories.probability_at`.
+    """
+    return probability_histories(frame, created_times).probability_at(timestamps, market_ids, method)
+
+
+def start_final_probabilities(frame: BetFrame) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """The starting and final probability of every market in a frame.
+
+    Returns:
+        The sorted market IDs, their starting probabilities and their final probabilities.
+    """
+    histories = probability_histories(frame)
+    return histories.market_ids, histories.start, histories.final
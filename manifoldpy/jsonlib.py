@@ -0,0 +1,70 @@
+"""The JSON backend used to decode API responses and encode local stores.
+Uses [orjson](https://github.com/ijl/orjson) when it's installed (`pip install manifoldpy[fast]`),
+and the standard library otherwise.
+Both decode straight from bytes, so responses don't need to be converted to text first.
+"""
+import json
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+Loads = Callable[[Union[bytes, bytearray, str]], Any]
+Dumps = Callable[[Any], bytes]
+
+
+def _stdlib_dumps(obj: Any) -> bytes:
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+
+def _available() -> Dict[str, Tuple[Loads, Dumps]]:
+    backends: Dict[str, Tuple[Loads, Dumps]] = {}
+    try:
+        import orjson
+
+        backends["orjson"] = (orjson.loads, orjson.dumps)
+    except ImportError:
+        pass
+    backends["stdlib"] = (json.loads, _stdlib_dumps)
+    return backends
+
+
+BACKENDS = _available()
+
+backend = ""
+_loads: Loads = json.loads
+_dumps: Dumps = _stdlib_dumps
+
+
+def set_backend(name: Optional[str] = None) -> str:
+    """Choose the JSON backend.
+
+    Args:
+        name: "orjson" or "stdlib". Defaults to the fastest one installed.
+
+    Returns:
+        The name of the backend now in use.
+    """
+    global backend, _loads, _dumps
+    if name is None:
+        name = next(iter(BACKENDS))
+    if name not in BACKENDS:
+        raise ValueError(f"JSON backend {name} is not available, expected one of {list(BACKENDS)}")
+    backend = name
+    _loads, _dumps = BACKENDS[name]
+    return name
+
+
+def loads(data: Union[bytes, bytearray, str]) -> Any:
+    """Decode JSON from bytes or text."""
+    return _loads(data)
+
+
+def dumps(obj: Any) -> bytes:
+    """Encode an object as compact UTF-8 JSON."""
+    return _dumps(obj)
+
+
+def dumps_str(obj: Any) -> str:
+    """Encode an object as compact JSON text."""
+    return _dumps(obj).decode()
+
+
+set_backend()
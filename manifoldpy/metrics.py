@@ -0,0 +1,240 @@
+"""Lightweight latency measurement, and telemetry for every request made through a `Transport`.
+```
+from manifoldpy import transport
+telemetry = transport.get_transport().telemetry
+telemetry.add_hook(lambda event: print(event.endpoint, event.status, event.elapsed))
+...
+print(telemetry.snapshot())
+```
+"""
+import math
+import threading
+import time
+import warnings
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Union
+
+from attr import define, field
+
+
+class LatencyHistogram:
+    """A thread-safe histogram of latencies, with logarithmically spaced buckets.
+    Percentiles are accurate to within one bucket, i.e. about 9% with the default 8 buckets per doubling.
+
+    Args:
+        min_latency: Latencies below this, in seconds, are counted in the first bucket.
+        max_latency: Latencies above this, in seconds, are counted in the last bucket.
+        buckets_per_doubling: How many buckets each doubling of latency is split into.
+    """
+
+    def __init__(
+        self, min_latency: float = 1e-5, max_latency: float = 100.0, buckets_per_doubling: int = 8
+    ) -> None:
+        self.min_latency = min_latency
+        self._scale = buckets_per_doubling / math.log(2)
+        self.counts: List[int] = [0] * (self._bucket(max_latency) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def _bucket(self, seconds: float) -> int:
+        if seconds <= self.min_latency:
+            return 0
+        return int(math.log(seconds / self.min_latency) * self._scale) + 1
+
+    def upper_bound(self, bucket: int) -> float:
+        """The largest latency counted in a bucket."""
+        return self.min_latency * math.exp(bucket / self._scale)
+
+    def record(self, seconds: float) -> None:
+        """Add one latency, in seconds."""
+        bucket = min(self._bucket(seconds), len(self.counts) - 1)
+        with self._lock:
+            self.counts[bucket] += 1
+            self.count += 1
+            self.total += seconds
+            if self.min is None or seconds < self.min:
+                self.min = seconds
+            if self.max is None or seconds > self.max:
+                self.max = seconds
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        """Add the counts of another histogram with the same buckets."""
+        if len(other.counts) != len(self.counts) or other.min_latency != self.min_latency:
+            raise ValueError("Histograms have different buckets")
+        with self._lock:
+            self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+            self.count += other.count
+            self.total += other.total
+            for value in (other.min, other.max):
+                if value is not None:
+                    self.min = value if self.min is None else min(self.min, value)
+                    self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, q: float) -> float:
+        """The latency below which a fraction `q` of the recorded latencies fall, e.g. `q=0.99` for p99.
+        NaN if nothing has been recorded.
+        """
+        with self._lock:
+            if self.count == 0:
+                return math.nan
+            target = max(1, math.ceil(q * self.count))
+            seen = 0
+            for bucket, n in enumerate(self.counts):
+                seen += n
+                if seen >= target:
+                    break
+            if bucket == len(self.counts) - 1:
+                # The last bucket also holds everything above max_latency
+                return self.max  # type: ignore
+            return min(self.upper_bound(bucket), self.max)  # type: ignore
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else math.nan
+
+    def summary(self) -> Dict[str, float]:
+        """The count, mean, min, p50, p90, p99 and max latency."""
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "min": math.nan if self.min is None else self.min,
+            "p50": self.percentile(0.5),
+            "p90": self.percentile(0.9),
+            "p99": self.percentile(0.99),
+            "max": math.nan if self.max is None else self.max,
+        }
+
+    def __str__(self) -> str:
+        s = self.summary()
+        ms = " ".join(f"{k}={s[k] * 1000:.2f}ms" for k in ("mean", "p50", "p90", "p99", "max"))
+        return f"n={self.count} {ms}"
+
+
+@define
+class RequestEvent:
+    """One request made through a transport, including any retries.
+
+    Attributes:
+        endpoint: The endpoint name, e.g. `market/{}`.
+        method: The HTTP method.
+        status: The status of the final response, or None if the request failed without one.
+        error: The name of the exception that ended the request, if any.
+        attempts: How many times the request was sent.
+        elapsed: Seconds from first sending the request to the final response, including retries.
+        request_bytes: Size of the request body.
+        response_bytes: Size of the final response body.
+    """
+
+    endpoint: str
+    method: str
+    status: Optional[int]
+    error: Optional[str]
+    attempts: int
+    elapsed: float
+    request_bytes: int
+    response_bytes: int
+
+
+@define
+class EndpointStats:
+    """Totals for one endpoint.
+
+    Attributes:
+        latency: Request latencies, including retries.
+        decode: Time spent decoding response bodies.
+        requests: Number of requests.
+        errors: Requests that failed, either with an exception or an error status.
+        retries: Extra attempts made by retries.
+        statuses: Count of each final status code.
+        bytes_sent: Total size of request bodies.
+        bytes_received: Total size of response bodies.
+    """
+
+    latency: LatencyHistogram = field(factory=LatencyHistogram)
+    decode: LatencyHistogram = field(factory=LatencyHistogram)
+    requests: int = 0
+    errors: int = 0
+    retries: int = 0
+    statuses: Counter = field(factory=Counter)
+    bytes_sent: int = 0
+    bytes_received: int = 0
+
+
+Hook = Callable[[RequestEvent], None]
+
+
+class Telemetry:
+    """Per-endpoint statistics for the requests made through a transport, plus user hooks called on each request.
+    Hooks are called on the requesting thread, so they should be quick. Exceptions in hooks are turned into warnings.
+    """
+
+    def __init__(self) -> None:
+        self.stats: Dict[str, EndpointStats] = {}
+        self.hooks: List[Hook] = []
+        self._lock = threading.Lock()
+
+    def add_hook(self, hook: Hook) -> None:
+        """Call a function with the `RequestEvent` of every request."""
+        self.hooks.append(hook)
+
+    def remove_hook(self, hook: Hook) -> None:
+        self.hooks.remove(hook)
+
+    def _endpoint(self, endpoint: str) -> EndpointStats:
+        stats = self.stats.get(endpoint)
+        if stats is None:
+            with self._lock:
+                stats = self.stats.setdefault(endpoint, EndpointStats())
+        return stats
+
+    def record(self, event: RequestEvent) -> None:
+        """Add a request to the statistics and pass it to the hooks."""
+        stats = self._endpoint(event.endpoint)
+        stats.latency.record(event.elapsed)
+        with self._lock:
+            stats.requests += 1
+            stats.retries += event.attempts - 1
+            stats.errors += int(event.error is not None or (event.status or 0) >= 400)
+            if event.status is not None:
+                stats.statuses[event.status] += 1
+            stats.bytes_sent += event.request_bytes
+            stats.bytes_received += event.response_bytes
+        for hook in list(self.hooks):
+            try:
+                hook(event)
+            except Exception as e:
+                warnings.warn(f"Telemetry hook {hook!r} raised {e!r}")
+
+    def record_decode(self, endpoint: str, seconds: float) -> None:
+        """Add the time spent decoding a response from an endpoint."""
+        self._endpoint(endpoint).decode.record(seconds)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.stats = {}
+
+    def snapshot(self) -> str:
+        """A plain text table of the statistics of every endpoint, slowest p99 first."""
+        lines = [
+            f"# manifoldpy telemetry at {time.strftime('%Y-%m-%d %H:%M:%S')}",
+            f"{'endpoint':<32} {'requests':>8} {'errors':>6} {'retries':>7} {'p50 ms':>8} {'p99 ms':>8} "
+            f"{'decode p99 ms':>13} {'sent':>10} {'received':>12}  statuses",
+        ]
+        rows = sorted(self.stats.items(), key=lambda kv: -kv[1].latency.percentile(0.99))
+        for endpoint, s in rows:
+            decode = s.decode.percentile(0.99) * 1000 if s.decode.count else math.nan
+            statuses = ",".join(f"{k}:{v}" for k, v in sorted(s.statuses.items()))
+            lines.append(
+                f"{endpoint:<32} {s.requests:>8} {s.errors:>6} {s.retries:>7} "
+                f"{s.latency.percentile(0.5) * 1000:>8.1f} {s.latency.percentile(0.99) * 1000:>8.1f} "
+                f"{decode:>13.2f} {s.bytes_sent:>10} {s.bytes_received:>12}  {statuses}"
+            )
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: Union[str, Path]) -> None:
+        """Write `snapshot` to a file."""
+        Path(path).write_text(self.snapshot())
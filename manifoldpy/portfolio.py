@@ -0,0 +1,157 @@
+"""Positions and profit for any number of users at once, computed locally from their bets.
+```
+from manifoldpy import api, portfolio
+from manifoldpy.betframe import BetFrame
+bets = BetFrame.from_api(userId="acvO0NAsghTTgGjnsdwt94O44OT2")
+probabilities = portfolio.market_probabilities(api.iter_markets())
+positions = portfolio.positions(bets, probabilities)
+print(portfolio.totals(positions))
+```
+
+Cost basis uses the average cost method: selling shares realizes the difference between what they sold for
+and their average cost, and leaves the average cost of the shares still held unchanged.
+"""
+from typing import Dict, Iterable, Mapping
+
+import numpy as np
+import pandas as pd
+
+from manifoldpy import api
+from manifoldpy.betframe import BetFrame
+
+# Positions smaller than this many shares count as closed, since sales leave floating point dust behind
+DUST = 1e-6
+
+KEYS = ("userId", "contractId", "answerId", "outcome")
+VALUES = ("shares", "invested", "proceeds", "cost_basis", "realized", "value", "unrealized", "pnl")
+
+
+def market_probabilities(markets: Iterable[api.Market]) -> Dict[str, float]:
+    """The price of a YES share in each market: its probability, or what a YES share paid out if it resolved.
+    Cancelled markets, and resolutions that don't pay out a probability, are left out.
+
+    Returns:
+        Probabilities keyed by market ID.
+    """
+    probabilities = {}
+    for m in markets:
+        if not m.isResolved:
+            probabilities[m.id] = m.probability
+        elif m.resolution == "YES":
+            probabilities[m.id] = 1.0
+        elif m.resolution == "NO":
+            probabilities[m.id] = 0.0
+        elif m.resolution == "MKT" and m.resolutionProbability is not None:
+            probabilities[m.id] = m.resolutionProbability
+    return probabilities
+
+
+def _prices(frame: BetFrame, probabilities: Mapping[str, float], keys: np.ndarray) -> np.ndarray:
+    """The price of a share of each position, from the probability of its answer, or else of its market."""
+    by_market = np.array([probabilities.get(c, np.nan) for c in frame.categories("contractId")])
+    by_answer = np.array([probabilities.get(a, np.nan) for a in frame.categories("answerId")])
+    prob = np.append(by_market, np.nan)[keys[:, 1]]
+    has_answer = keys[:, 2] >= 0
+    prob[has_answer] = by_answer[keys[has_answer, 2]]
+    outcomes = np.append(frame.categories("outcome"), "")[keys[:, 3]]
+    return np.select([outcomes == "YES", outcomes == "NO"], [prob, 1 - prob], np.nan)
+
+
+def positions(frame: BetFrame, probabilities: Mapping[str, float]) -> pd.DataFrame:
+    """Every position held by the users in a frame, with its cost basis and profit.
+    A position is the shares of one outcome (of one answer) of one market held by one user.
+    Bets that bought no shares, like unfilled limit orders, are skipped.
+
+    Args:
+        frame: The bets of any number of users, in any order.
+        probabilities: The probability of each market, keyed by market ID,
+            or by answer ID for the answers of multiple choice markets. See `market_probabilities`.
+            Positions in markets without a probability have NaN value.
+
+    Returns:
+        One row per position, with columns:
+            userId, contractId, answerId, outcome: The position.
+            shares: Shares held now.
+            invested: Mana spent buying shares.
+            proceeds: Mana received from selling shares, including redemptions.
+            cost_basis: The average cost of the shares held, times the number held.
+            realized: Profit from selling shares, i.e. proceeds less the cost of the shares sold.
+            value: What the shares held are worth at the current probability.
+            unrealized: Value less cost basis.
+            pnl: Realized plus unrealized profit.
+    """
+    shares = np.nan_to_num(frame.shares)
+    filled = np.flatnonzero(shares != 0)
+    if len(filled) == 0:
+        return pd.DataFrame(columns=list(KEYS + VALUES))
+    codes = [frame.codes(k)[filled] for k in KEYS]
+    # Each position's bets in time order, positions one after another
+    order = np.lexsort((frame.createdTime[filled], *codes[::-1]))
+    rows = filled[order]
+    sorted_codes = np.stack([c[order] for c in codes], axis=1)
+    new = np.concatenate(([True], np.any(np.diff(sorted_codes, axis=0) != 0, axis=1)))
+    starts = np.flatnonzero(new)
+    keys = sorted_codes[starts]
+    group = np.cumsum(new) - 1
+    n = len(keys)
+    counts = np.diff(np.append(starts, len(rows)))
+    index = np.arange(len(rows))
+    shares = shares[rows]
+    amount = np.nan_to_num(frame.amount[rows])
+
+    def cumsum(x: np.ndarray) -> np.ndarray:
+        """Inclusive running totals within each position."""
+        total = np.cumsum(x)
+        return total - np.repeat(total[starts] - x[starts], counts)
+
+    held = cumsum(shares)
+    before = held - shares
+    buy = shares > 0
+    sell = ~buy
+    closed = sell & (held < DUST)
+    # A partial sale scales the cost basis by the fraction of shares kept, so each purchase contributes its
+    # amount times the product of those fractions over later sales. Summed as logs to stay vectorized.
+    kept = np.log(np.where(sell & ~closed, held / np.where(before > 0, before, 1.0), 1.0))
+    later = np.repeat(np.add.reduceat(kept, starts), counts) - cumsum(kept)
+    # Purchases before the last time the position was closed out no longer count
+    last_close = np.maximum.reduceat(np.where(closed, index, -1), starts)
+    current = buy & (index > np.repeat(last_close, counts))
+    weights = np.where(current, amount * np.exp(later), 0.0)
+    cost_basis = np.bincount(group, weights=weights, minlength=n)
+
+    invested = np.bincount(group, weights=np.where(buy, amount, 0.0), minlength=n)
+    proceeds = -np.bincount(group, weights=np.where(sell, amount, 0.0), minlength=n)
+    held_now = np.bincount(group, weights=shares, minlength=n)
+    held_now[np.abs(held_now) < DUST] = 0.0
+    value = held_now * _prices(frame, probabilities, keys)
+    realized = proceeds - (invested - cost_basis)
+    unrealized = value - cost_basis
+
+    df = pd.DataFrame(
+        {
+            k: np.concatenate((frame.categories(k).astype(object), np.array([None])))[keys[:, i]]
+            for i, k in enumerate(KEYS)
+        }
+    )
+    for name, column in zip(
+        VALUES,
+        (held_now, invested, proceeds, cost_basis, realized, value, unrealized, realized + unrealized),
+    ):
+        df[name] = column
+    return df
+
+
+def market_pnl(positions: pd.DataFrame) -> pd.DataFrame:
+    """Totals of a `positions` table for each user and market, summing over outcomes and answers.
+    Positions with NaN value are left out of the value, unrealized and pnl totals.
+    """
+    columns = [c for c in VALUES if c != "shares"]
+    groups = positions.groupby(["userId", "contractId"], dropna=False)
+    return groups[columns].sum(min_count=1).reset_index()
+
+
+def totals(positions: pd.DataFrame) -> pd.DataFrame:
+    """Totals of a `positions` table for each user, over every market. See `market_pnl`."""
+    columns = [c for c in VALUES if c != "shares"]
+    groups = positions.groupby("userId", dropna=False)
+    return groups[columns].sum(min_count=1).reset_index()
@@ -0,0 +1,168 @@
+"""Client-side rate limiting, so many threads or processes stay just under Manifold's rate limit
+instead of bursting into it and getting throttled.
+
+The default transport allows `DEFAULT_RATE` requests per second overall. To give endpoints their own budgets,
+or to share the budget between every process on a host, install a transport with your own limiter:
+```
+from manifoldpy import ratelimit, transport
+limiter = ratelimit.RateLimiter(endpoints={"bets": (2, 10)}, path="/tmp/manifold-limits")
+transport.set_transport(transport.Transport(rate_limiter=limiter))
+```
+"""
+import os
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore
+
+# Manifold asks clients to stay under 500 requests per minute per IP
+DEFAULT_RATE = 500 / 60
+DEFAULT_BURST = 50
+
+_STATE = struct.Struct("dd")
+
+
+class TokenBucket:
+    """A thread-safe token bucket.
+    Requests that arrive while the bucket is empty reserve future tokens, so waiting callers are served in order.
+
+    Args:
+        rate: Tokens added per second.
+        burst: The most tokens the bucket can hold.
+    """
+
+    def __init__(self, rate: float, burst: float) -> None:
+        if rate <= 0 or burst < 1:
+            raise ValueError("rate must be positive and burst at least 1")
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _take(self, tokens: float, available: float, elapsed: float) -> Tuple[float, float]:
+        """Refill, take tokens, and return the new balance and how long to wait for it to become non-negative."""
+        available = min(self.burst, available + elapsed * self.rate) - tokens
+        return available, max(0.0, -available / self.rate)
+
+    def reserve(self, tokens: float = 1) -> float:
+        """Take tokens without waiting.
+
+        Returns:
+            How long to wait, in seconds, before using them.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens, delay = self._take(tokens, self._tokens, now - self._last)
+            self._last = now
+            return delay
+
+    def acquire(self, tokens: float = 1) -> float:
+        """Take tokens, sleeping until they're available.
+
+        Returns:
+            How long the call slept for.
+        """
+        delay = self.reserve(tokens)
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+
+class FileTokenBucket(TokenBucket):
+    """A token bucket whose state lives in a file, shared by every process that uses the same path.
+    Processes coordinate with `flock`, so this requires a POSIX system.
+
+    Args:
+        path: The file holding the bucket's state. Created if it doesn't exist.
+        rate: Tokens added per second.
+        burst: The most tokens the bucket can hold.
+    """
+
+    def __init__(self, path: Union[str, Path], rate: float, burst: float) -> None:
+        if fcntl is None:  # pragma: no cover
+            raise RuntimeError("Sharing a rate limit between processes requires fcntl")
+        super().__init__(rate, burst)
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+    def reserve(self, tokens: float = 1) -> float:
+        with self._lock:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                # Wall clock time, since monotonic clocks aren't comparable between processes on every platform
+                now = time.time()
+                state = os.pread(self._fd, _STATE.size, 0)
+                available, last = _STATE.unpack(state) if len(state) == _STATE.size else (self.burst, now)
+                available, delay = self._take(tokens, available, max(0.0, now - last))
+                os.pwrite(self._fd, _STATE.pack(available, now), 0)
+                return delay
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+
+class RateLimiter:
+    """Token buckets for the API as a whole and for individual endpoints.
+    A request waits until both the overall bucket and its endpoint's bucket (if it has one) allow it.
+
+    Args:
+        rate: Requests per second allowed overall.
+        burst: Requests allowed at once overall.
+        endpoints: `(rate, burst)` budgets of individual endpoints, keyed by endpoint name, e.g. `{"bets": (2, 10)}`.
+        path: If given, a directory holding the buckets' state, shared by every process using it.
+    """
+
+    def __init__(
+        self,
+        rate: float = DEFAULT_RATE,
+        burst: float = DEFAULT_BURST,
+        endpoints: Optional[Dict[str, Tuple[float, float]]] = None,
+        path: Optional[Union[str, Path]] = None,
+    ) -> None:
+        self.path = None if path is None else Path(path)
+        self.total = self._bucket("_total", rate, burst)
+        self.endpoints = {
+            name: self._bucket(name, r, b) for name, (r, b) in (endpoints or {}).items()
+        }
+
+    def _bucket(self, name: str, rate: float, burst: float) -> TokenBucket:
+        if self.path is None:
+            return TokenBucket(rate, burst)
+        filename = name.replace("/", "_").replace("{", "").replace("}", "")
+        return FileTokenBucket(self.path / f"{filename}.bucket", rate, burst)
+
+    def reserve(self, endpoint: str) -> float:
+        """Take a token for a request to an endpoint without waiting.
+
+        Args:
+            endpoint: The name of the endpoint, e.g. `market/{}`.
+
+        Returns:
+            How long to wait, in seconds, before sending the request.
+        """
+        delay = self.total.reserve()
+        bucket = self.endpoints.get(endpoint)
+        if bucket is not None:
+            delay = max(delay, bucket.reserve())
+        return delay
+
+    def acquire(self, endpoint: str) -> float:
+        """Wait until a request to an endpoint is allowed.
+
+        Returns:
+            How long the call slept for.
+        """
+        delay = self.reserve(endpoint)
+        if delay > 0:
+            time.sleep(delay)
+        return delay
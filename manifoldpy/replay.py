@@ -0,0 +1,160 @@
+"""Record every response from the API to a local archive, and replay them later without any network traffic.
+```
+from manifoldpy import api, replay, transport
+with replay.RecordingTransport("archive") as t:
+    transport.set_transport(t)
+    markets = api.get_markets()
+
+transport.set_transport(replay.ReplayTransport("archive"))
+assert api.get_markets() == markets
+```
+
+An archive is a directory holding:
+    bodies.bin      Response bodies, each zlib-compressed, back to back.
+    index.jsonl     One line per response: the request key, status, headers and where its body is in bodies.bin.
+
+Requests are matched on method, URL (including the query string) and a hash of the body.
+A request made several times is answered with its recorded responses in order, repeating the last one.
+"""
+import hashlib
+import json
+import mmap
+import threading
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from manifoldpy.transport import Transport
+
+# Headers that describe the bytes on the wire, which no longer apply once the body is decoded
+_WIRE_HEADERS = ("content-encoding", "transfer-encoding", "content-length", "connection")
+
+
+class ReplayMissError(requests.RequestException):
+    """A request that isn't in the archive being replayed."""
+
+
+def request_key(prepped: requests.PreparedRequest) -> str:
+    """The key a request is archived under."""
+    body = prepped.body or b""
+    if isinstance(body, str):
+        body = body.encode()
+    digest = hashlib.sha256(body).hexdigest()[:16] if body else "-"
+    return f"{prepped.method} {prepped.url} {digest}"
+
+
+class RecordingTransport(Transport):
+    """A transport that saves the final response to every request it sends (after any retries) to an archive.
+    Requests are archived as they were made, before any `base_url` rewrite.
+    Appends to an existing archive. Takes the same arguments as `Transport`.
+
+    Args:
+        path: The archive directory. Created if it doesn't exist.
+        compress_level: zlib compression level for bodies.
+    """
+
+    def __init__(self, path: Union[str, Path], compress_level: int = 6, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.compress_level = compress_level
+        self._bodies = (self.path / "bodies.bin").open("ab")
+        self._index = (self.path / "index.jsonl").open("a")
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        with self._lock:
+            self._bodies.close()
+            self._index.close()
+        super().close()
+
+    def send(
+        self,
+        prepped: requests.PreparedRequest,
+        endpoint: Optional[str] = None,
+        timeout: Optional[float] = None,
+        idempotent: Optional[bool] = None,
+    ) -> requests.Response:
+        # Only the final response is archived, so retried failures aren't replayed
+        response = super().send(prepped, endpoint, timeout, idempotent)
+        self._archive(prepped, response)
+        return response
+
+    def _archive(self, prepped: requests.PreparedRequest, response: requests.Response) -> None:
+        body = zlib.compress(response.content, self.compress_level)
+        headers = {k: v for k, v in response.headers.items() if k.lower() not in _WIRE_HEADERS}
+        with self._lock:
+            offset = self._bodies.tell()
+            self._bodies.write(body)
+            self._bodies.flush()
+            entry = {
+                "key": request_key(prepped),
+                "status": response.status_code,
+                "reason": response.reason,
+                "headers": headers,
+                "offset": offset,
+                "length": len(body),
+            }
+            self._index.write(json.dumps(entry) + "\n")
+            self._index.flush()
+
+
+class ReplayTransport(Transport):
+    """A transport that answers requests from an archive, without touching the network.
+    The index is held in memory and bodies are read from a memory map of the archive.
+    Takes the same arguments as `Transport`, e.g. a cache.
+
+    Args:
+        path: The archive directory.
+
+    Raises:
+        ReplayMissError: When a request isn't in the archive.
+    """
+
+    def __init__(self, path: Union[str, Path], **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.path = Path(path)
+        self._entries: Dict[str, List[Dict[str, Any]]] = {}
+        with (self.path / "index.jsonl").open() as f:
+            for line in f:
+                entry = json.loads(line)
+                self._entries.setdefault(entry["key"], []).append(entry)
+        self._calls: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        with (self.path / "bodies.bin").open("rb") as f:
+            size = f.seek(0, 2)
+            self._bodies: Optional[mmap.mmap] = (
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+            )
+
+    def __contains__(self, prepped: requests.PreparedRequest) -> bool:
+        return request_key(prepped) in self._entries
+
+    def close(self) -> None:
+        if self._bodies is not None:
+            self._bodies.close()
+        super().close()
+
+    def _dispatch(self, prepped: requests.PreparedRequest, timeout: float) -> requests.Response:
+        key = request_key(prepped)
+        entries = self._entries.get(key)
+        if entries is None:
+            raise ReplayMissError(f"Not in the archive: {key}", request=prepped)
+        with self._lock:
+            n = self._calls.get(key, 0)
+            self._calls[key] = n + 1
+        entry = entries[min(n, len(entries) - 1)]
+        start = entry["offset"]
+        body = zlib.decompress(self._bodies[start : start + entry["length"]]) if self._bodies else b""
+        response = requests.Response()
+        response.status_code = entry["status"]
+        response.reason = entry["reason"]
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response._content = body
+        response.url = prepped.url  # type: ignore
+        response.request = prepped
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        return response
@@ -0,0 +1,154 @@
+"""Retrying failed requests, and adapting the number of requests in flight to what the server accepts.
+
+The default transport retries throttled (429) and failed (5xx) requests with jittered exponential backoff,
+honouring `Retry-After`. Requests that aren't idempotent, like `make_bet`, are never retried unless the
+policy opts in with `retry_unsafe`, and even then only when the server can't have acted on them.
+"""
+import email.utils
+import random
+import threading
+import time
+from typing import Optional, Tuple, Union
+
+import requests
+from attr import define
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Methods that can be repeated without changing the result
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+
+Outcome = Union[requests.Response, requests.RequestException]
+
+
+def retry_after(response: requests.Response) -> Optional[float]:
+    """The delay requested by a response's `Retry-After` header, in seconds, if it has a valid one."""
+    value = response.headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+@define
+class RetryPolicy:
+    """When and how long to wait before retrying a request.
+
+    Attributes:
+        max_attempts: The most times a request is sent, including the first.
+        backoff: The base delay in seconds. Attempt `n` waits up to `backoff * 2 ** n`.
+        max_backoff: The longest delay in seconds, including delays asked for with `Retry-After`.
+        jitter: Wait a uniformly random fraction of the backoff, so clients that failed together don't retry together.
+        statuses: Response statuses that are retried.
+        retry_unsafe: Also retry non-idempotent requests, but only after a 429 response or a failure to connect,
+            since the server can't have acted on those.
+    """
+
+    max_attempts: int = 5
+    backoff: float = 0.5
+    max_backoff: float = 30
+    jitter: bool = True
+    statuses: Tuple[int, ...] = RETRY_STATUSES
+    retry_unsafe: bool = False
+
+    def should_retry(self, outcome: Outcome, attempt: int, idempotent: bool) -> bool:
+        """Check if a request should be sent again.
+
+        Args:
+            outcome: The response, or the exception raised while sending.
+            attempt: How many times the request has been sent.
+            idempotent: Whether sending the request twice has the same effect as sending it once.
+        """
+        if attempt >= self.max_attempts:
+            return False
+        if isinstance(outcome, requests.Response):
+            if outcome.status_code not in self.statuses:
+                return False
+            return idempotent or (self.retry_unsafe and outcome.status_code == 429)
+        if idempotent:
+            return isinstance(outcome, (requests.ConnectionError, requests.Timeout))
+        return self.retry_unsafe and isinstance(outcome, requests.ConnectTimeout)
+
+    def delay(self, outcome: Outcome, attempt: int) -> float:
+        """How long to wait before the next attempt.
+
+        Args:
+            outcome: The response, or the exception raised while sending.
+            attempt: How many times the request has been sent.
+        """
+        if isinstance(outcome, requests.Response):
+            requested = retry_after(outcome)
+            if requested is not None:
+                return min(requested, self.max_backoff)
+        backoff = min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+        return random.uniform(0, backoff) if self.jitter else backoff
+
+
+class AdaptiveLimit:
+    """A limit on requests in flight that adapts with additive increase, multiplicative decrease (AIMD).
+    Each success raises the limit by `increase / limit`, i.e. by about `increase` per round of requests,
+    and each throttled or failed request cuts it by a factor of `decrease`.
+    Cuts are applied at most once per round, so a burst of failures from one round only counts once.
+
+    Args:
+        initial: The starting limit.
+        minimum: The lowest the limit can go.
+        maximum: The highest the limit can go.
+        increase: How much the limit grows per round of successful requests.
+        decrease: What the limit is multiplied by after a failure.
+    """
+
+    def __init__(
+        self,
+        initial: float = 8,
+        minimum: float = 1,
+        maximum: float = 64,
+        increase: float = 1,
+        decrease: float = 0.5,
+    ) -> None:
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.increase = increase
+        self.decrease = decrease
+        self.in_flight = 0
+        self._sent = 0
+        self._last_cut = -1
+        self._cond = threading.Condition()
+
+    def acquire(self) -> int:
+        """Wait for a free slot.
+
+        Returns:
+            A ticket to pass to `release`.
+        """
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+            self._sent += 1
+            return self._sent
+
+    def release(self, ticket: int, ok: bool) -> None:
+        """Free a slot and adjust the limit.
+
+        Args:
+            ticket: The ticket returned by `acquire`.
+            ok: False if the request was throttled or failed.
+        """
+        with self._cond:
+            self.in_flight -= 1
+            if ok:
+                self.limit = min(self.maximum, self.limit + self.increase / self.limit)
+            elif ticket > self._last_cut:
+                # Requests sent before this cut took effect don't cut again
+                self.limit = max(self.minimum, self.limit * self.decrease)
+                self._last_cut = self._sent
+            self._cond.notify_all()
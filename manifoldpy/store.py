@@ -0,0 +1,201 @@
+"""A local, indexed SQLite store of markets, bets and comments."""
+import sqlite3
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+from manifoldpy import api, config, jsonlib
+from manifoldpy.betframe import BetFrame
+
+DB_LOC = config.DATA / "manifold.db"
+
+# Number of rows inserted per transaction
+BATCH_SIZE = 10000
+
+BET_FIELDS = [f.name for f in api.Bet.__attrs_attrs__]  # type: ignore
+COMMENT_FIELDS = [f.name for f in api.Comment.__attrs_attrs__]  # type: ignore
+MARKET_FIELDS = [f.name for f in api.Market.__attrs_attrs__ if f.name not in ("bets", "comments")]  # type: ignore
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS markets (
+    id TEXT PRIMARY KEY,
+    createdTime INTEGER,
+    lastUpdatedTime INTEGER,
+    json TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS bets (
+    id TEXT PRIMARY KEY,
+    contractId TEXT,
+    userId TEXT,
+    createdTime INTEGER,
+    json TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS comments (
+    id TEXT PRIMARY KEY,
+    contractId TEXT,
+    createdTime INTEGER,
+    json TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS markets_created ON markets (createdTime);
+CREATE INDEX IF NOT EXISTS bets_contract ON bets (contractId, createdTime);
+CREATE INDEX IF NOT EXISTS bets_user ON bets (userId, createdTime);
+CREATE INDEX IF NOT EXISTS bets_created ON bets (createdTime);
+CREATE INDEX IF NOT EXISTS comments_contract ON comments (contractId, createdTime);
+"""
+
+
+def _project(record: Dict[str, Any], fields: List[str]) -> Dict[str, Any]:
+    """Keep only the fields of a schema."""
+    return {k: record[k] for k in fields if k in record}
+
+
+class Store:
+    """Markets, bets and comments in a SQLite database.
+    Records are stored as JSON restricted to the fields of `Market`, `Bet` and `Comment`,
+    with indexed columns for lookups by market, user and time.
+
+    Args:
+        path: Location of the database. Created if it doesn't exist.
+    """
+
+    def __init__(self, path: Union[str, Path] = DB_LOC) -> None:
+        self.path = Path(path)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def __enter__(self) -> "Store":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def _insert(self, sql: str, rows: Iterable[Tuple[Any, ...]]) -> int:
+        count = 0
+        it = iter(rows)
+        while True:
+            batch = list(islice(it, BATCH_SIZE))
+            if len(batch) == 0:
+                return count
+            with self.conn:
+                self.conn.executemany(sql, batch)
+            count += len(batch)
+
+    # Writing
+
+    def add_markets(self, records: Iterable[Dict[str, Any]]) -> int:
+        """Insert or replace markets from JSON. Returns the number of markets written."""
+        rows = (
+            (r["id"], r.get("createdTime"), r.get("lastUpdatedTime"), jsonlib.dumps_str(_project(r, MARKET_FIELDS)))
+            for r in records
+        )
+        return self._insert("INSERT OR REPLACE INTO markets VALUES (?, ?, ?, ?)", rows)
+
+    def add_bets(self, records: Iterable[Dict[str, Any]]) -> int:
+        """Insert or replace bets from JSON. Returns the number of bets written."""
+        rows = (
+            (
+                r["id"],
+                r.get("contractId"),
+                r.get("userId"),
+                r.get("createdTime"),
+                jsonlib.dumps_str(_project(r, BET_FIELDS)),
+            )
+            for r in records
+        )
+        return self._insert("INSERT OR REPLACE INTO bets VALUES (?, ?, ?, ?, ?)", rows)
+
+    def add_comments(self, records: Iterable[Dict[str, Any]]) -> int:
+        """Insert or replace comments from JSON. Returns the number of comments written."""
+        rows = (
+            (r["id"], r.get("contractId"), r.get("createdTime"), jsonlib.dumps_str(_project(r, COMMENT_FIELDS)))
+            for r in records
+        )
+        return self._insert("INSERT OR REPLACE INTO comments VALUES (?, ?, ?, ?)", rows)
+
+    # Reading
+
+    def _select(self, table: str, where: Dict[str, Any], order: str) -> Iterator[Dict[str, Any]]:
+        clauses = [f"{k} = ?" for k, v in where.items() if v is not None]
+        sql = f"SELECT json FROM {table}"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += f" ORDER BY {order}"
+        params = [v for v in where.values() if v is not None]
+        for (row,) in self.conn.execute(sql, params):
+            yield jsonlib.loads(row)
+
+    def bets_json(
+        self, market_id: Optional[str] = None, user_id: Optional[str] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """Iterate over stored bets as JSON, newest first."""
+        return self._select(
+            "bets", {"contractId": market_id, "userId": user_id}, "createdTime DESC, id DESC"
+        )
+
+    def bets(self, market_id: Optional[str] = None, user_id: Optional[str] = None) -> List[api.Bet]:
+        """Get stored bets, newest first."""
+        return [api.weak_structure(x, api.Bet) for x in self.bets_json(market_id, user_id)]
+
+    def bet_frame(self, market_id: Optional[str] = None, user_id: Optional[str] = None) -> BetFrame:
+        """Get stored bets as a `BetFrame`, newest first."""
+        return BetFrame.from_json(self.bets_json(market_id, user_id))
+
+    def comments(self, market_id: Optional[str] = None) -> List[api.Comment]:
+        """Get stored comments, newest first."""
+        rows = self._select("comments", {"contractId": market_id}, "createdTime DESC, id DESC")
+        return [api.weak_structure(x, api.Comment) for x in rows]
+
+    def market(self, market_id: str, full: bool = False) -> Optional[api.Market]:
+        """Get a stored market, or None if it isn't stored.
+
+        Args:
+            market_id: The market's ID.
+            full: If true, include the market's stored bets and comments.
+        """
+        rows = list(self._select("markets", {"id": market_id}, "id"))
+        if len(rows) == 0:
+            return None
+        market = api.Market.from_json(rows[0])
+        if full:
+            market.bets = self.bets(market_id=market_id)
+            market.comments = self.comments(market_id=market_id)
+        return market
+
+    def markets(self) -> Iterator[api.Market]:
+        """Iterate over stored markets, newest first."""
+        for x in self._select("markets", {}, "createdTime DESC, id DESC"):
+            yield api.Market.from_json(x)
+
+    def latest_bet(self, market_id: str) -> Optional[Dict[str, Any]]:
+        """The newest stored bet on a market as JSON, or None if none are stored."""
+        return next(self._select("bets", {"contractId": market_id}, "createdTime DESC, id DESC LIMIT 1"), None)
+
+    def bet_ids_at(self, market_id: str, created_time: int) -> Set[str]:
+        """IDs of the stored bets on a market made at exactly this time."""
+        sql = "SELECT id FROM bets WHERE contractId = ? AND createdTime = ?"
+        return {row[0] for row in self.conn.execute(sql, (market_id, created_time))}
+
+    def open_orders(self, market_id: str) -> Dict[str, Dict[str, Any]]:
+        """Stored limit orders on a market that were neither filled nor cancelled, as JSON keyed by ID."""
+        sql = (
+            "SELECT json FROM bets WHERE contractId = ?"
+            " AND json_extract(json, '$.limitProb') IS NOT NULL"
+            " AND NOT coalesce(json_extract(json, '$.isFilled'), 0)"
+            " AND NOT coalesce(json_extract(json, '$.isCancelled'), 0)"
+        )
+        rows = (jsonlib.loads(row) for (row,) in self.conn.execute(sql, (market_id,)))
+        return {x["id"]: x for x in rows}
+
+    def count(self, table: str) -> int:
+        """Number of rows in `markets`, `bets` or `comments`."""
+        assert table in ("markets", "bets", "comments")
+        return self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    def latest_time(self, table: str) -> Optional[int]:
+        """The newest `createdTime` in `markets`, `bets` or `comments`, or None if the table is empty."""
+        assert table in ("markets", "bets", "comments")
+        return self.conn.execute(f"SELECT MAX(createdTime) FROM {table}").fetchone()[0]
@@ -0,0 +1,226 @@
+"""Keep a local copy of every market, with its bets and comments.
+After the first run only markets that have changed since the last sync are refetched.
+To keep the bets on a few busy markets current, `sync_bets` fetches only the bets made since the last poll.
+
+Can be run as a script:
+```
+python -m manifoldpy.sync --workers 16
+```
+"""
+import argparse
+import os
+import pickle
+from pathlib import Path
+from typing import Any, Collection, Dict, Iterator, List, Optional, Tuple
+
+from manifoldpy import api, config, jsonlib
+from manifoldpy.store import Store
+
+# Fields of a limit order that change as it is filled or cancelled
+ORDER_FIELDS = ("isFilled", "isCancelled", "fills", "amount", "shares")
+
+
+def _log_path(path: Path) -> Path:
+    return path.with_suffix(path.suffix + ".log")
+
+
+def load_markets(path: Path = config.CACHE_LOC) -> Dict[str, api.Market]:
+    """Load the locally synced markets, keyed by ID, including any checkpoints of an unfinished sync.
+    Returns an empty dict if there has been no sync yet.
+    """
+    markets: Dict[str, api.Market] = {}
+    if path.exists():
+        with path.open("rb") as f:
+            markets = pickle.load(f)
+    log = _log_path(path)
+    if log.exists():
+        with log.open("rb") as f:
+            while True:
+                try:
+                    markets.update(pickle.load(f))
+                except (EOFError, pickle.UnpicklingError):
+                    # The end of the log, or a checkpoint cut short by an interruption
+                    break
+    return markets
+
+
+def save_markets(markets: Dict[str, api.Market], path: Path = config.CACHE_LOC) -> None:
+    """Save every market atomically, so an interrupted save never corrupts the previous copy.
+    Replaces any checkpoints, since they're included.
+    """
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with tmp.open("wb") as f:
+        pickle.dump(markets, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+    _log_path(path).unlink(missing_ok=True)
+
+
+def append_markets(markets: Dict[str, api.Market], path: Path = config.CACHE_LOC) -> None:
+    """Checkpoint newly fetched markets by appending them to a log next to the saved markets.
+    Unlike `save_markets`, the cost only depends on the number of new markets.
+    """
+    with _log_path(path).open("ab") as f:
+        pickle.dump(markets, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def export_json(markets: Dict[str, api.Market], path: Path = config.JSON_CACHE_LOC) -> None:
+    """Write markets as a JSON list, with the same fields the API returns."""
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_bytes(jsonlib.dumps([api.weak_unstructure(m) for m in markets.values()]))
+    os.replace(tmp, path)
+
+
+def is_stale(local: Optional[api.Market], remote: api.Market) -> bool:
+    """Check if a local market is missing or out of date."""
+    return (
+        local is None
+        or local.bets is None
+        or local.lastUpdatedTime != remote.lastUpdatedTime
+        or local.lastBetTime != remote.lastBetTime
+        or local.lastCommentTime != remote.lastCommentTime
+    )
+
+
+def sync(
+    path: Path = config.CACHE_LOC,
+    max_workers: int = 8,
+    checkpoint_every: int = 500,
+    verbose: bool = False,
+) -> Dict[str, api.Market]:
+    """Bring the local copy of all markets up to date.
+    Every `checkpoint_every` markets, the markets fetched since the last checkpoint are appended to a log,
+    and everything is saved together at the end. Since only stale markets are fetched,
+    rerunning an interrupted sync resumes it.
+
+    Args:
+        path: Where the markets are stored.
+        max_workers: The maximum number of markets to fetch at once.
+        checkpoint_every: Number of fetched markets between saves.
+        verbose: If true, print progress.
+
+    Returns:
+        All markets, keyed by ID.
+    """
+    markets = load_markets(path)
+    if _log_path(path).exists():
+        # Fold in the checkpoints of an interrupted sync, so a cut short checkpoint can't hide later ones
+        save_markets(markets, path)
+    stale = [m.id for m in api.iter_markets() if is_stale(markets.get(m.id), m)]
+    if verbose:
+        print(f"{len(stale)} of {len(markets)} local markets need updating")
+
+    fetched: Dict[str, api.Market] = {}
+    for i, market in enumerate(api.get_full_markets(stale, max_workers=max_workers), 1):
+        markets[market.id] = market
+        fetched[market.id] = market
+        if i % checkpoint_every == 0:
+            append_markets(fetched, path)
+            fetched = {}
+            if verbose:
+                print(f"Fetched {i}/{len(stale)}")
+    save_markets(markets, path)
+    return markets
+
+
+def _bet_pages(market_id: str, first_page: int, **kwargs: Any) -> Iterator[List[Dict[str, Any]]]:
+    """Pages of a market's bets, newest first.
+    Pages start small and double in size, so polling a market with a few new bets costs one small request.
+    """
+    limit, before = first_page, None
+    while True:
+        page = api._get_bets(marketId=market_id, limit=limit, before=before, **kwargs)
+        if len(page) > 0:
+            yield page
+        if len(page) < limit:
+            return
+        before = page[-1]["id"]
+        limit = min(limit * 2, 1000)
+
+
+def fetch_bet_tail(
+    market_id: str,
+    latest: Optional[Dict[str, Any]],
+    open_orders: Dict[str, Dict[str, Any]],
+    first_page: int = 100,
+    tied: Collection[str] = (),
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Fetch the bets on a market made after the newest bet we have, and the limit orders we have that changed.
+    Bets are fetched newest first until `latest` is reached. Orders that are still open are refreshed with one
+    `kinds="open-limit"` query, and older pages are only fetched to find orders that were filled or cancelled since.
+
+    Args:
+        market_id: The market to fetch bets for.
+        latest: The newest bet we have on the market, as JSON, or None to fetch every bet.
+        open_orders: Our limit orders on the market that were neither filled nor cancelled, as JSON keyed by ID.
+        first_page: Number of bets in the first page requested. Each later page is twice as large.
+        tied: IDs of the other bets we have that were made at the same time as `latest`, which aren't new.
+
+    Returns:
+        The new bets and the changed orders, as JSON, newest first.
+    """
+    changed = []
+    closed = dict(open_orders)
+    if len(open_orders) > 0:
+        for page in _bet_pages(market_id, first_page, kinds="open-limit"):
+            for x in page:
+                old = closed.pop(x["id"], None)
+                if old is not None and any(old.get(k) != x.get(k) for k in ORDER_FIELDS):
+                    changed.append(x)
+    # Orders missing from the open ones were filled or cancelled, and none are older than this
+    horizon = min((x["createdTime"] for x in closed.values()), default=None)
+
+    # Bets made at the same time as the newest one can come back in any order
+    known = set(tied) if latest is None else {latest["id"], *tied}
+    new = []
+    reached = False
+    for page in _bet_pages(market_id, first_page):
+        for x in page:
+            if latest is not None and x["createdTime"] < latest["createdTime"]:
+                reached = True
+            if not reached and x["id"] not in known:
+                new.append(x)
+            elif x["id"] in closed:
+                del closed[x["id"]]
+                changed.append(x)
+            if reached and (len(closed) == 0 or x["createdTime"] < horizon):
+                return new, changed
+    return new, changed
+
+
+def sync_bets(store: Store, market_id: str, first_page: int = 100) -> Dict[str, int]:
+    """Bring the stored bets on a market up to date.
+    Only the bets made since the newest stored one are fetched, plus what's needed to update stored limit orders.
+
+    Args:
+        store: The store holding the market's bets.
+        market_id: The market to update.
+        first_page: Number of bets in the first page requested. See `fetch_bet_tail`.
+
+    Returns:
+        The number of new bets, and of changed orders, stored.
+    """
+    latest = store.latest_bet(market_id)
+    tied = () if latest is None else store.bet_ids_at(market_id, latest["createdTime"])
+    new, changed = fetch_bet_tail(
+        market_id, latest, store.open_orders(market_id), first_page, tied
+    )
+    store.add_bets(new + changed)
+    return {"new": len(new), "changed": len(changed)}
+
+
+def main() -> None:  # pragma: no cover
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--path", type=Path, default=config.CACHE_LOC)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--checkpoint-every", type=int, default=500)
+    parser.add_argument(
+        "--json", action="store_true", help=f"Also export to {config.JSON_CACHE_LOC}"
+    )
+    args = parser.parse_args()
+    markets = sync(args.path, args.workers, args.checkpoint_every, verbose=True)
+    if args.json:
+        export_json(markets)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
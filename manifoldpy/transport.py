@@ -0,0 +1,222 @@
+"""HTTP transport shared by the GET functions and `APIWrapper`.
+Every request made by `manifoldpy.api` goes through `Transport.send`.
+"""
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from manifoldpy import jsonlib
+from manifoldpy.metrics import RequestEvent, Telemetry
+from manifoldpy.ratelimit import RateLimiter
+from manifoldpy.retry import IDEMPOTENT_METHODS, AdaptiveLimit, Outcome, RetryPolicy
+
+if TYPE_CHECKING:  # pragma: no cover
+    from manifoldpy.cache import ResponseCache
+
+
+# Where requests are sent unless a transport has a different base_url
+API_URL = "https://api.manifold.markets/v0/"
+
+
+def endpoint_name(url: str) -> str:
+    """Get the name of an endpoint from its URL template, e.g. `market/{}`."""
+    return url.split("/v0/", 1)[-1]
+
+
+class Transport:
+    """A pooled, keep-alive HTTP transport.
+
+    Args:
+        pool_connections: Number of hosts to keep connection pools for.
+        pool_maxsize: Maximum number of connections kept alive per host.
+            Should be at least the number of threads making requests at once.
+        timeout: Default timeout in seconds, used when a request doesn't specify one.
+        cache: An optional cache for GET responses.
+        rate_limiter: An optional limit on the rate of requests. Cached responses don't count towards it.
+        retry: An optional policy for retrying throttled and failed requests.
+        concurrency: An optional adaptive limit on the number of requests in flight at once.
+        telemetry: Optional per-endpoint statistics and hooks, updated on every request.
+        base_url: Send requests for the Manifold API here instead, e.g. to a local stand-in server.
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = 4,
+        pool_maxsize: int = 16,
+        timeout: float = 20,
+        cache: Optional["ResponseCache"] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry: Optional[RetryPolicy] = None,
+        concurrency: Optional[AdaptiveLimit] = None,
+        telemetry: Optional[Telemetry] = None,
+        base_url: Optional[str] = None,
+    ) -> None:
+        self.timeout = timeout
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        self.retry = retry
+        self.concurrency = concurrency
+        self.telemetry = telemetry
+        self.base_url = base_url
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def __enter__(self) -> "Transport":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.session.close()
+
+    def get(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        endpoint: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ) -> requests.Response:
+        """Make a GET request.
+
+        Args:
+            url: The full URL to request.
+            params: Query parameters. Parameters set to None are dropped.
+            endpoint: The URL template of the endpoint, used to identify it. Defaults to `url`.
+            timeout: Timeout in seconds. Defaults to the transport's timeout.
+        """
+        prepped = self.session.prepare_request(requests.Request("GET", url, params=params))
+        endpoint = endpoint or url
+        if self.cache is not None and self.cache.caches(endpoint):
+            return self.cache.get(
+                prepped, endpoint, lambda p: self.send(p, endpoint=endpoint, timeout=timeout)
+            )
+        return self.send(prepped, endpoint=endpoint, timeout=timeout)
+
+    def send(
+        self,
+        prepped: requests.PreparedRequest,
+        endpoint: Optional[str] = None,
+        timeout: Optional[float] = None,
+        idempotent: Optional[bool] = None,
+    ) -> requests.Response:
+        """Send a prepared request, retrying it if the transport has a retry policy.
+
+        Args:
+            prepped: The request to send.
+            endpoint: The URL template of the endpoint, used to identify it. Defaults to the request URL.
+            timeout: Timeout in seconds. Defaults to the transport's timeout.
+            idempotent: Whether the request can safely be sent more than once. Defaults to True for GET requests
+                and other idempotent methods, and False for POST requests.
+        """
+        name = endpoint_name(endpoint or (prepped.url or "").split("?", 1)[0])
+        timeout = self.timeout if timeout is None else timeout
+        if idempotent is None:
+            idempotent = prepped.method in IDEMPOTENT_METHODS
+        if self.base_url is not None and (prepped.url or "").startswith(API_URL):
+            prepped = prepped.copy()
+            prepped.url = self.base_url + prepped.url[len(API_URL) :]  # type: ignore
+        start = time.perf_counter()
+        attempt = 1
+        outcome = self._attempt(prepped, name, timeout)
+        while self.retry is not None and self.retry.should_retry(outcome, attempt, idempotent):
+            if isinstance(outcome, requests.Response):
+                outcome.close()
+            time.sleep(self.retry.delay(outcome, attempt))
+            attempt += 1
+            outcome = self._attempt(prepped, name, timeout)
+        if self.telemetry is not None:
+            self._record(prepped, name, outcome, attempt, time.perf_counter() - start)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    def _record(
+        self,
+        prepped: requests.PreparedRequest,
+        name: str,
+        outcome: Outcome,
+        attempts: int,
+        elapsed: float,
+    ) -> None:
+        response = outcome if isinstance(outcome, requests.Response) else None
+        event = RequestEvent(
+            endpoint=name,
+            method=prepped.method or "",
+            status=None if response is None else response.status_code,
+            error=type(outcome).__name__ if response is None else None,
+            attempts=attempts,
+            elapsed=elapsed,
+            request_bytes=len(prepped.body or b""),
+            response_bytes=0 if response is None else len(response.content),
+        )
+        self.telemetry.record(event)  # type: ignore
+
+    def decode_json(self, response: requests.Response, endpoint: Optional[str] = None) -> Any:
+        """Decode a JSON response, recording the time taken if the transport has telemetry.
+
+        Args:
+            response: The response to decode.
+            endpoint: The URL template of the endpoint. Defaults to the response URL.
+        """
+        if self.telemetry is None:
+            return jsonlib.loads(response.content)
+        start = time.perf_counter()
+        decoded = jsonlib.loads(response.content)
+        name = endpoint_name(endpoint or response.url.split("?", 1)[0])
+        self.telemetry.record_decode(name, time.perf_counter() - start)
+        return decoded
+
+    def _attempt(self, prepped: requests.PreparedRequest, name: str, timeout: float) -> Outcome:
+        """Send a request once, within the rate and concurrency limits."""
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(name)
+        ticket = self.concurrency.acquire() if self.concurrency is not None else 0
+        ok = False
+        try:
+            response = self._dispatch(prepped, timeout)
+            ok = response.status_code != 429 and response.status_code < 500
+            return response
+        except requests.RequestException as e:
+            return e
+        finally:
+            if self.concurrency is not None:
+                self.concurrency.release(ticket, ok)
+
+    def _dispatch(self, prepped: requests.PreparedRequest, timeout: float) -> requests.Response:
+        """Put a request on the wire."""
+        return self.session.send(prepped, timeout=timeout)
+
+
+_transport: Optional[Transport] = None
+_transport_lock = threading.Lock()
+
+
+def get_transport() -> Transport:
+    """Get the transport used by default, creating it if necessary.
+    The default transport is limited to `ratelimit.DEFAULT_RATE` requests per second,
+    retries with the default `RetryPolicy`, adapts how many requests it sends at once, and collects telemetry.
+    """
+    global _transport
+    if _transport is None:
+        with _transport_lock:
+            if _transport is None:
+                _transport = Transport(
+                    rate_limiter=RateLimiter(),
+                    retry=RetryPolicy(),
+                    concurrency=AdaptiveLimit(),
+                    telemetry=Telemetry(),
+                )
+    return _transport
+
+
+def set_transport(transport: Transport) -> None:
+    """Replace the transport used by default."""
+    global _transport
+    with _transport_lock:
+        _transport = transport
@@ -0,0 +1,69 @@
+"""Tests of the async client against a local server."""
+import asyncio
+
+from aiohttp import web
+
+from manifoldpy import api, async_api
+
+
+def run_with_server(routes, test):
+    """Start a local server with the given routes, point the client at it and run `test(client)`."""
+
+    async def main():
+        app = web.Application()
+        app.add_routes(routes)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]  # type: ignore
+        local = f"http://127.0.0.1:{port}/v0/"
+        try:
+            async with async_api.AsyncClient("no_key") as client:
+                return await test(client, local)
+        finally:
+            await runner.cleanup()
+
+    return asyncio.run(main())
+
+
+def test_make_bet_matches_prepared(monkeypatch):
+    received = {}
+
+    async def bet(request):
+        received["body"] = await request.read()
+        received["auth"] = request.headers["Authorization"]
+        return web.json_response({"betId": "1"})
+
+    async def test(client, local):
+        monkeypatch.setattr(api, "MAKE_BET_URL", local + "bet")
+        resp = await client.make_bet(10, "1", "YES")
+        assert resp.status == 200
+        return await resp.json()
+
+    result = run_with_server([web.post("/v0/bet", bet)], test)
+    assert result == {"betId": "1"}
+    expected = api.APIWrapper("no_key")._prep_make_bet(10, "1", "YES")
+    assert received["body"] == expected.body
+    assert received["auth"] == "Key no_key"
+
+
+def test_iter_bets_pages(monkeypatch):
+    bets = [
+        {"id": str(i), "contractId": "c", "createdTime": i, "shares": 1.0, "amount": 1}
+        for i in range(7, 0, -1)
+    ]
+
+    async def get_bets(request):
+        assert request.query["contractId"] == "c"
+        limit = int(request.query["limit"])
+        before = request.query.get("before")
+        start = 0 if before is None else [b["id"] for b in bets].index(before) + 1
+        return web.json_response(bets[start : start + limit])
+
+    async def test(client, local):
+        monkeypatch.setattr(api, "BETS_URL", local + "bets")
+        return [b async for b in client.iter_bets(marketId="c", page_size=3)]
+
+    result = run_with_server([web.get("/v0/bets", get_bets)], test)
+    assert [b.id for b in result] == [str(i) for i in range(7, 0, -1)]
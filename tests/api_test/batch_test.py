@@ -0,0 +1,55 @@
+"""Tests of batch order submission, against a local server."""
+import json
+import time
+
+from manifoldpy import api, transport
+
+
+def slow_ok(record):
+    time.sleep(0.1)
+    return 200, {"Content-Type": "application/json"}, b'{"betId": "x"}'
+
+
+def setup(local_server, monkeypatch):
+    for path in ("/v0/bet", "/v0/bet/cancel/b1", "/v0/bet/cancel/b2", "/v0/market/m2/sell"):
+        local_server.routes[("POST", path)] = slow_ok
+    monkeypatch.setattr(api, "MAKE_BET_URL", local_server.url + "bet")
+    monkeypatch.setattr(api, "CANCEL_BET_URL", local_server.url + "bet/cancel/{}")
+    monkeypatch.setattr(api, "SELL_SHARES_URL", local_server.url + "market/{}/sell")
+    transport.set_transport(transport.Transport())
+
+
+def test_submit_batch(local_server, monkeypatch):
+    setup(local_server, monkeypatch)
+    orders = [
+        api.CancelOrder("b1", contractId="m1"),
+        api.BetOrder(10, "m1", "YES", limitProb=0.4),
+        api.SellOrder("m2", "NO"),
+        api.BetOrder(5, "m2", "YES"),
+        api.CancelOrder("b2"),
+        api.BetOrder(1, "m3", "NO"),
+        api.CancelOrder("missing"),
+    ]
+    start = time.monotonic()
+    results = api.APIWrapper("no_key").submit_batch(orders)
+    # Three rounds (m1 and m2 have two orders each) rather than seven
+    assert time.monotonic() - start < 0.5
+    assert [r.order for r in results] == orders
+    assert [r.ok for r in results] == [True] * 6 + [False]
+    assert all(r.elapsed > 0 for r in results[:6])
+
+    def position(path, contract=None):
+        for i, r in enumerate(local_server.requests):
+            if r["path"] == path and (contract is None or json.loads(r["body"])["contractId"] == contract):
+                return i
+
+    assert position("/v0/bet/cancel/b1") < position("/v0/bet", "m1")
+    assert position("/v0/market/m2/sell") < position("/v0/bet", "m2")
+
+
+def test_submit_batch_errors(local_server, monkeypatch):
+    setup(local_server, monkeypatch)
+    monkeypatch.setattr(api, "SELL_SHARES_URL", "http://127.0.0.1:1/v0/market/{}/sell")
+    results = api.APIWrapper("no_key").submit_batch([api.SellOrder("m2"), api.BetOrder(5, "m2", "YES")])
+    assert results[0].response is None and results[0].error is not None
+    assert results[1].ok
@@ -0,0 +1,70 @@
+"""Tests of the response cache, against a local server."""
+import json
+
+import pytest
+
+from manifoldpy import api, cache, transport
+
+USER = {
+    "id": "u1",
+    "createdTime": 0,
+    "name": "Test",
+    "username": "test",
+    "url": "",
+    "avatarUrl": "",
+    "balance": 0,
+    "totalDeposits": 0,
+    "profitCached": {},
+    "creatorVolumeCached": {},
+}
+
+
+@pytest.fixture
+def cached(local_server, monkeypatch):
+    monkeypatch.setattr(api, "USER_ID_URL", local_server.url + "user/by-id/{}")
+    monkeypatch.setattr(api, "USERS_URL", local_server.url + "users")
+    response_cache = cache.ResponseCache(maxsize=2, ttls={"user/by-id/{}": 60})
+    transport.set_transport(transport.Transport(cache=response_cache))
+    return response_cache
+
+
+def etag_route(record):
+    body = json.dumps({**USER, "id": record["path"].split("/")[-1]}).encode()
+    if record["headers"].get("If-None-Match") == '"v1"':
+        return 304, {"ETag": '"v1"'}, b""
+    return 200, {"ETag": '"v1"', "Content-Type": "application/json"}, body
+
+
+def test_hits(local_server, cached):
+    local_server.routes[("GET", "/v0/user/by-id/u1")] = etag_route
+    for _ in range(3):
+        assert api.get_user_by_id("u1").id == "u1"
+    assert len(local_server.requests) == 1
+    assert cached.stats == cache.CacheStats(hits=2, misses=1)
+
+
+def test_revalidation(local_server, cached):
+    local_server.routes[("GET", "/v0/user/by-id/u1")] = etag_route
+    cached.ttls["user/by-id/{}"] = 0
+    api.get_user_by_id("u1")
+    assert api.get_user_by_id("u1").id == "u1"
+    assert local_server.requests[1]["headers"]["If-None-Match"] == '"v1"'
+    assert cached.stats.revalidations == 1
+
+
+def test_eviction(local_server, cached):
+    for user_id in ["u1", "u2", "u3"]:
+        local_server.routes[("GET", f"/v0/user/by-id/{user_id}")] = etag_route
+        api.get_user_by_id(user_id)
+    assert len(cached) == 2
+    assert cached.stats.evictions == 1
+    api.get_user_by_id("u1")
+    assert cached.stats.misses == 4
+
+
+def test_uncached_endpoint(local_server, cached):
+    local_server.json_route("GET", "/v0/users", [USER])
+    api.get_users()
+    api.get_users()
+    assert len(local_server.requests) == 2
+    assert len(cached) == 0
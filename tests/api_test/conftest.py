@@ -0,0 +1,90 @@
+"""A local HTTP server for offline tests of the transport layer."""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Tuple
+from urllib.parse import urlsplit
+
+from pytest import fixture
+
+from manifoldpy import transport
+
+Reply = Tuple[int, Dict[str, str], bytes]
+
+
+class LocalServer:
+    """Serves canned replies, and records every request it receives.
+    Routes map `(method, path)` to a function from the request record to `(status, headers, body)`.
+    """
+
+    def __init__(self) -> None:
+        self.routes: Dict[Tuple[str, str], Callable[[Dict[str, Any]], Reply]] = {}
+        self.requests: List[Dict[str, Any]] = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+            def handle_request(self) -> None:
+                parts = urlsplit(self.path)
+                length = int(self.headers.get("Content-Length") or 0)
+                record = {
+                    "method": self.command,
+                    "path": parts.path,
+                    "query": parts.query,
+                    "headers": dict(self.headers),
+                    "body": self.rfile.read(length) if length else None,
+                    "client": self.client_address,
+                }
+                server.requests.append(record)
+                route = server.routes.get((self.command, parts.path))
+                if route is None:
+                    status, headers, body = 404, {}, b"{}"
+                else:
+                    status, headers, body = route(record)
+                self.send_response(status)
+                for k, v in headers.items():
+                    self.send_header(k, v)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = handle_request
+            do_POST = handle_request
+
+        class Server(ThreadingHTTPServer):
+            def handle_error(self, request: Any, client_address: Any) -> None:
+                # Clients hanging up early (e.g. timeout tests) are expected
+                pass
+
+        self.httpd = Server(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/v0/"
+        self.thread = threading.Thread(
+            target=self.httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+        self.thread.start()
+
+    def json_route(self, method: str, path: str, payload: Any, status: int = 200) -> None:
+        body = json.dumps(payload).encode()
+        self.routes[(method, path)] = lambda _: (
+            status,
+            {"Content-Type": "application/json"},
+            body,
+        )
+
+    def close(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@fixture
+def local_server(monkeypatch):
+    """A local server, with a fresh default transport so no connections leak between tests."""
+    server = LocalServer()
+    monkeypatch.setattr(transport, "_transport", None)
+    yield server
+    server.close()
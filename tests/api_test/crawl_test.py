@@ -0,0 +1,90 @@
+"""Tests of the sharded crawler, against a local server."""
+import json
+from urllib.parse import parse_qs
+
+import pytest
+
+from manifoldpy import crawl, transport
+from manifoldpy.store import Store
+
+from helpers import bet_json
+
+
+def serve_markets(local_server, market_ids):
+    for i, market_id in enumerate(market_ids):
+        local_server.json_route("GET", f"/v0/market/{market_id}", {"id": market_id, "createdTime": i})
+
+    def by_market(make):
+        def route(record):
+            market_id = parse_qs(record["query"])["contractId"][0]
+            return 200, {"Content-Type": "application/json"}, json.dumps(make(market_id)).encode()
+
+        return route
+
+    # Every market also has the same shared bet, to check that merging deduplicates
+    local_server.routes[("GET", "/v0/bets")] = by_market(
+        lambda m: [bet_json(1, contract=m, id=f"{m}-b1"), bet_json(0, contract=m, id="shared")]
+    )
+    local_server.routes[("GET", "/v0/comments")] = by_market(
+        lambda m: [{"id": f"{m}-c", "contractId": m, "createdTime": 0}]
+    )
+
+
+def test_crawl_and_merge(local_server, tmp_path):
+    market_ids = [f"m{i}" for i in range(5)]
+    serve_markets(local_server, market_ids)
+    out = tmp_path / "crawl"
+    assert crawl.crawl(out, workers=2, market_ids=market_ids, base_url=local_server.url) == 0
+    assert crawl.plan(out, 2) == [["m0", "m2", "m4"], ["m1", "m3"]]
+    assert len(list(crawl.iter_shards(out, "bets"))) == 10
+
+    # Resuming a finished crawl fetches nothing
+    n_requests = len(local_server.requests)
+    assert crawl.crawl(out, base_url=local_server.url) == 0
+    assert len(local_server.requests) == n_requests
+
+    with Store(tmp_path / "test.db") as store:
+        assert crawl.merge(out, store) == {"markets": 5, "bets": 6, "comments": 5}
+        assert store.count("bets") == 6
+        # The last copy of the shared bet wins
+        assert [b.id for b in store.bets(market_id="m3")] == ["m3-b1", "shared"]
+
+
+def test_crawl_lists_markets_from_base_url(local_server, tmp_path):
+    serve_markets(local_server, ["m0", "m1"])
+    local_server.json_route("GET", "/v0/markets", [{"id": "m0"}, {"id": "m1"}])
+    out = tmp_path / "crawl"
+    assert crawl.crawl(out, workers=2, base_url=local_server.url) == 0
+    assert crawl.plan(out, 2) == [["m0"], ["m1"]]
+
+
+def test_crawl_warns_on_failed_worker(local_server, tmp_path):
+    serve_markets(local_server, ["m0", "m1"])
+    # A body that isn't JSON kills the worker, rather than being skipped like a failed request
+    local_server.routes[("GET", "/v0/market/m1")] = lambda _: (200, {}, b"not json")
+    with pytest.warns(UserWarning, match="shard 1 exited"):
+        missing = crawl.crawl(tmp_path / "crawl", 2, ["m0", "m1"], base_url=local_server.url)
+    assert missing == 1
+
+
+def test_crawl_shard_resumes(local_server, tmp_path):
+    serve_markets(local_server, ["m0", "m2"])
+    transport.set_transport(transport.Transport(base_url=local_server.url))
+    shard = tmp_path / "shard-000"
+    # m1 isn't served, so it fails and is left for the next run
+    with pytest.warns(UserWarning, match="m1"):
+        assert crawl.crawl_shard(shard, ["m0", "m1", "m2"]) == (2, 1)
+    assert crawl.read_checkpoint(shard)[0] == {"m0", "m2"}
+
+    # A crawl killed partway through writing a market
+    with (shard / "bets.jsonl").open("ab") as f:
+        f.write(b'{"id": "torn')
+    with (shard / "checkpoint.jsonl").open("ab") as f:
+        f.write(b'{"id": "m1", "si')
+    serve_markets(local_server, ["m0", "m1", "m2"])
+    local_server.requests.clear()
+    assert crawl.crawl_shard(shard, ["m0", "m1", "m2"]) == (1, 0)
+    assert {r["path"] for r in local_server.requests} == {"/v0/market/m1", "/v0/bets", "/v0/comments"}
+    assert crawl.read_checkpoint(shard)[0] == {"m0", "m1", "m2"}
+    bets = [json.loads(line) for line in (shard / "bets.jsonl").read_bytes().splitlines()]
+    assert [b["id"] for b in bets] == ["m0-b1", "shared", "m2-b1", "shared", "m1-b1", "shared"]
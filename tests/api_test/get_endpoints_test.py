@@ -173,3 +173,12 @@ def test_get_full_data():
     m.get_full_data()
     assert m.bets is not None
     assert m.comments is not None
+
+
+def test_get_full_markets():
+    ids = ["pBPJS5ebbd3QD3RVi8AN", "Le040Y0ZGkyAYCIEnpA2"]
+    markets = list(api.get_full_markets(ids, max_workers=2))
+    assert sorted(m.id for m in markets) == sorted(ids)
+    for market in markets:
+        assert market.bets is not None
+        assert market.comments is not None
@@ -0,0 +1,53 @@
+"""Tests of the low-latency bet path, against a local server."""
+import json
+
+import numpy as np
+import pytest
+
+from manifoldpy import api, orders, ratelimit, transport
+
+
+def test_bet_sender(local_server, monkeypatch):
+    local_server.json_route("POST", "/v0/bet", {"betId": "1"})
+    local_server.json_route("GET", "/v0/me", {"id": "u1"})
+    monkeypatch.setattr(api, "MAKE_BET_URL", local_server.url + "bet")
+    monkeypatch.setattr(api, "ME_URL", local_server.url + "me")
+    sender = orders.BetSender("abc", transport=transport.Transport())
+    assert sender.warm().json() == {"id": "u1"}
+    assert sender.make_bet(10, "c1", "YES").json() == {"betId": "1"}
+    sender.make_bet(np.float64(2.5), "c1", "YES", limitProb=0.25)
+    sender.make_bet(1, 'c"2', "NO")
+
+    bodies = [json.loads(r["body"]) for r in local_server.requests[1:]]
+    assert bodies == [
+        {"contractId": "c1", "outcome": "YES", "amount": 10},
+        {"contractId": "c1", "outcome": "YES", "amount": 2.5, "limitProb": 0.25},
+        {"contractId": 'c"2', "outcome": "NO", "amount": 1},
+    ]
+    expected = api.APIWrapper("abc")._prep_make_bet(1, "c1", "YES").headers
+    for r in local_server.requests[1:]:
+        assert r["headers"]["Authorization"] == expected["Authorization"] == "Key abc"
+        assert r["headers"]["Content-Type"] == "application/json"
+    assert len({r["client"] for r in local_server.requests}) == 1
+    assert sender.histogram.count == 3
+
+
+def test_bet_sender_rejects_non_finite(local_server):
+    sender = orders.BetSender("abc", transport=transport.Transport())
+    with pytest.raises(ValueError):
+        sender.prepare(float("nan"), "c1", "YES")
+    with pytest.raises(ValueError):
+        sender.prepare(10, "c1", "YES", limitProb=np.inf)
+    assert local_server.requests == []
+
+
+def test_bet_sender_latency_excludes_waits(local_server, monkeypatch):
+    local_server.json_route("POST", "/v0/bet", {"betId": "1"})
+    monkeypatch.setattr(api, "MAKE_BET_URL", local_server.url + "bet")
+    limiter = ratelimit.RateLimiter(endpoints={"bet": (5, 1)})
+    sender = orders.BetSender("abc", transport=transport.Transport(rate_limiter=limiter))
+    for _ in range(3):
+        sender.make_bet(10, "c1", "YES")
+    # The last two bets each wait about 0.2s for the rate limiter
+    assert sender.histogram.count == 3
+    assert sender.histogram.max < 0.1
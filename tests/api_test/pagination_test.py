@@ -0,0 +1,76 @@
+"""Tests of the paginated iterators, using a fake endpoint in place of the network."""
+from typing import Any, Dict, List, Optional
+
+from manifoldpy import api
+
+
+def fake_endpoint(n: int):
+    records = [{"id": str(i), "createdTime": i} for i in range(n, 0, -1)]
+    calls: List[Optional[str]] = []
+
+    def fetch(limit: int = 1000, before: Optional[str] = None, **kwargs: Any) -> List[Dict[str, Any]]:
+        calls.append(before)
+        start = 0
+        if before is not None:
+            start = [r["id"] for r in records].index(before) + 1
+        return records[start : start + limit]
+
+    return fetch, calls
+
+
+def test_paginate_follows_cursor():
+    fetch, calls = fake_endpoint(25)
+    pages = list(api._paginate(fetch, page_size=10))
+    assert [len(p) for p in pages] == [10, 10, 5]
+    assert calls == [None, "16", "6"]
+    ids = [r["id"] for p in pages for r in p]
+    assert ids == [str(i) for i in range(25, 0, -1)]
+
+
+def test_paginate_exact_multiple():
+    fetch, calls = fake_endpoint(20)
+    pages = list(api._paginate(fetch, page_size=10))
+    assert [len(p) for p in pages] == [10, 10]
+    assert calls == [None, "11", "1"]
+
+
+def test_paginate_empty():
+    fetch, _ = fake_endpoint(0)
+    assert list(api._paginate(fetch, page_size=10)) == []
+
+
+def test_iter_bets(monkeypatch):
+    bets = [
+        {
+            "id": str(i),
+            "contractId": "c",
+            "createdTime": i,
+            "shares": 1.0,
+            "amount": 1,
+            "probAfter": 0.5,
+            "probBefore": 0.5,
+            "outcome": "YES",
+            "answerId": None,
+        }
+        for i in range(5, 0, -1)
+    ]
+
+    def fetch(limit=1000, before=None, **kwargs):
+        assert kwargs["marketId"] == "c"
+        start = 0 if before is None else [b["id"] for b in bets].index(before) + 1
+        return bets[start : start + limit]
+
+    monkeypatch.setattr(api, "_get_bets", fetch)
+    result = list(api.iter_bets(marketId="c", page_size=2))
+    assert [b.id for b in result] == ["5", "4", "3", "2", "1"]
+    assert all(isinstance(b, api.Bet) for b in result)
+
+
+def test_get_full_markets(monkeypatch):
+    def fake_full_market(market_id):
+        return market_id
+
+    monkeypatch.setattr(api, "get_full_market", fake_full_market)
+    ids = [str(i) for i in range(20)]
+    result = list(api.get_full_markets(ids, max_workers=3))
+    assert sorted(result) == sorted(ids)
@@ -0,0 +1,52 @@
+"""Tests of recording responses from a local server, and replaying them without it."""
+import pytest
+
+from manifoldpy import api, replay, transport
+
+
+def test_record_replay(local_server, tmp_path):
+    calls = []
+
+    def comments(record):
+        calls.append(record)
+        return 200, {"Content-Type": "application/json", "ETag": "x"}, b'[{"id": "c%d"}]' % len(calls)
+
+    local_server.routes[("GET", "/v0/comments")] = comments
+    local_server.json_route("POST", "/v0/bet", {"betId": "1"})
+    with replay.RecordingTransport(tmp_path / "archive", base_url=local_server.url) as t:
+        transport.set_transport(t)
+        first = api._get_comments(marketId="1")
+        second = api._get_comments(marketId="1")
+        other = api._get_comments(marketId="2")
+        bet = api.APIWrapper("no_key").make_bet(10, "1", "YES")
+    assert (first, second, other) == ([{"id": "c1"}], [{"id": "c2"}], [{"id": "c3"}])
+    n_requests = len(local_server.requests)
+
+    t = replay.ReplayTransport(tmp_path / "archive")
+    transport.set_transport(t)
+    assert api._get_comments(marketId="1") == first
+    assert api._get_comments(marketId="1") == second
+    # Repeated requests keep getting the last recorded response
+    assert api._get_comments(marketId="1") == second
+    assert api._get_comments(marketId="2") == other
+    replayed = api.APIWrapper("no_key").make_bet(10, "1", "YES")
+    assert replayed.content == bet.content
+    assert replayed.status_code == 200
+    assert replayed.headers["Content-Type"] == "application/json"
+    assert replayed.json() == {"betId": "1"}
+    with pytest.raises(replay.ReplayMissError):
+        api.APIWrapper("no_key").make_bet(11, "1", "YES")
+    with pytest.raises(replay.ReplayMissError):
+        api._get_comments(marketId="3")
+    assert len(local_server.requests) == n_requests
+    t.close()
+
+
+def test_empty_archive(tmp_path, monkeypatch):
+    # Don't leave the replay transport installed for later tests
+    monkeypatch.setattr(transport, "_transport", None)
+    replay.RecordingTransport(tmp_path).close()
+    with replay.ReplayTransport(tmp_path) as t:
+        transport.set_transport(t)
+        with pytest.raises(replay.ReplayMissError):
+            api._get_comments()
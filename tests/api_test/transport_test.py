@@ -0,0 +1,142 @@
+"""Tests of the shared transport, against a local server."""
+import time
+
+import pytest
+import requests
+
+from manifoldpy import api, metrics, ratelimit, retry, transport
+
+
+def test_get_functions_reuse_connection(local_server, monkeypatch):
+    local_server.json_route("GET", "/v0/comments", [])
+    monkeypatch.setattr(api, "COMMENTS_URL", local_server.url + "comments")
+    for _ in range(3):
+        assert api._get_comments(marketId="1") == []
+    assert len(local_server.requests) == 3
+    assert len({r["client"] for r in local_server.requests}) == 1
+    assert local_server.requests[0]["query"] == "contractId=1"
+
+
+def test_wrapper_reuses_connection(local_server, monkeypatch):
+    local_server.json_route("POST", "/v0/bet", {"betId": "1"})
+    monkeypatch.setattr(api, "MAKE_BET_URL", local_server.url + "bet")
+    wrapper = api.APIWrapper("no_key")
+    for _ in range(3):
+        resp = wrapper.make_bet(10, "1", "YES")
+        assert resp.json() == {"betId": "1"}
+    assert len({r["client"] for r in local_server.requests}) == 1
+    assert local_server.requests[0]["body"] == b'{"amount": 10, "contractId": "1", "outcome": "YES"}'
+
+
+def test_default_timeout(local_server, monkeypatch):
+    def slow(record):
+        time.sleep(0.5)
+        return 200, {}, b"[]"
+
+    local_server.routes[("GET", "/v0/comments")] = slow
+    monkeypatch.setattr(api, "COMMENTS_URL", local_server.url + "comments")
+    transport.set_transport(transport.Transport(timeout=0.1))
+    with pytest.raises(requests.exceptions.Timeout):
+        api._get_comments()
+
+
+def test_wrapper_transport():
+    t = transport.Transport()
+    assert api.APIWrapper("no_key", transport=t).transport is t
+    assert api.APIWrapper("no_key").transport is None
+
+
+def test_transport_rate_limit(local_server, monkeypatch):
+    local_server.json_route("GET", "/v0/comments", [])
+    monkeypatch.setattr(api, "COMMENTS_URL", local_server.url + "comments")
+    limiter = ratelimit.RateLimiter(rate=1000, burst=10, endpoints={"comments": (20, 1)})
+    transport.set_transport(transport.Transport(rate_limiter=limiter))
+    start = time.monotonic()
+    for _ in range(3):
+        api._get_comments()
+    assert time.monotonic() - start >= 0.1
+    assert transport.get_transport().rate_limiter is limiter
+
+
+def flaky(statuses, headers=None):
+    replies = iter(statuses)
+
+    def route(record):
+        status = next(replies, 200)
+        return status, headers or {}, b"[]"
+
+    return route
+
+
+def test_get_retries(local_server, monkeypatch):
+    local_server.routes[("GET", "/v0/comments")] = flaky([503, 429])
+    monkeypatch.setattr(api, "COMMENTS_URL", local_server.url + "comments")
+    policy = retry.RetryPolicy(backoff=0.01)
+    transport.set_transport(transport.Transport(retry=policy, concurrency=retry.AdaptiveLimit()))
+    assert api._get_comments() == []
+    assert len(local_server.requests) == 3
+
+
+def test_retry_after_honoured(local_server, monkeypatch):
+    local_server.routes[("GET", "/v0/comments")] = flaky([429], {"Retry-After": "0.2"})
+    monkeypatch.setattr(api, "COMMENTS_URL", local_server.url + "comments")
+    transport.set_transport(transport.Transport(retry=retry.RetryPolicy(backoff=0.01)))
+    start = time.monotonic()
+    api._get_comments()
+    assert time.monotonic() - start >= 0.2
+
+
+def test_post_not_retried(local_server, monkeypatch):
+    local_server.routes[("POST", "/v0/bet")] = flaky([503, 429])
+    monkeypatch.setattr(api, "MAKE_BET_URL", local_server.url + "bet")
+    t = transport.Transport(retry=retry.RetryPolicy(backoff=0.01))
+    assert api.APIWrapper("no_key", transport=t).make_bet(10, "1", "YES").status_code == 503
+    assert len(local_server.requests) == 1
+    # Opting in only retries failures the server can't have acted on
+    t.retry = retry.RetryPolicy(backoff=0.01, retry_unsafe=True)
+    assert api.APIWrapper("no_key", transport=t).make_bet(10, "1", "YES").status_code == 200
+    assert len(local_server.requests) == 3
+
+
+def test_idempotent_post_retried(local_server, monkeypatch):
+    local_server.routes[("POST", "/v0/bet/cancel/1")] = flaky([503])
+    monkeypatch.setattr(api, "CANCEL_BET_URL", local_server.url + "bet/cancel/{}")
+    monkeypatch.setattr(api, "IDEMPOTENT_POSTS", (api.CANCEL_BET_URL,))
+    t = transport.Transport(retry=retry.RetryPolicy(backoff=0.01))
+    assert api.APIWrapper("no_key", transport=t).cancel_bet("1").status_code == 200
+    assert len(local_server.requests) == 2
+
+
+def test_telemetry(local_server, monkeypatch):
+    local_server.routes[("GET", "/v0/market/1")] = flaky([503])
+    local_server.json_route("POST", "/v0/bet", {"betId": "1"})
+    monkeypatch.setattr(api, "SINGLE_MARKET_URL", local_server.url + "market/{}")
+    monkeypatch.setattr(api, "MAKE_BET_URL", local_server.url + "bet")
+    telemetry = metrics.Telemetry()
+    events = []
+    telemetry.add_hook(events.append)
+    transport.set_transport(
+        transport.Transport(retry=retry.RetryPolicy(backoff=0.01), telemetry=telemetry)
+    )
+    api._get_json(api.SINGLE_MARKET_URL, "1")
+    api.APIWrapper("no_key").make_bet(10, "1", "YES")
+    market = telemetry.stats["market/{}"]
+    assert (market.requests, market.retries, market.decode.count) == (1, 1, 1)
+    assert market.statuses == {200: 1}
+    assert market.bytes_received == 2
+    assert telemetry.stats["bet"].bytes_sent == len(local_server.requests[-1]["body"])
+    assert [e.endpoint for e in events] == ["market/{}", "bet"]
+    assert "market/{}" in telemetry.snapshot()
+
+
+def test_base_url(local_server):
+    local_server.json_route("GET", "/v0/comments", [{"id": "c1"}])
+    local_server.json_route("POST", "/v0/bet", {"betId": "1"})
+    t = transport.Transport(base_url=local_server.url)
+    transport.set_transport(t)
+    assert api._get_comments(marketId="1") == [{"id": "c1"}]
+    assert api.APIWrapper("no_key", transport=t).make_bet(10, "1", "YES").ok
+    assert [(r["method"], r["path"], r["query"]) for r in local_server.requests] == [
+        ("GET", "/v0/comments", "contractId=1"),
+        ("POST", "/v0/bet", ""),
+    ]
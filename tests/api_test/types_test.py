@@ -1,5 +1,10 @@
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+
 from manifoldpy import api
 
+from helpers import make_bet, make_market, market_json
+
 
 def test_weak_unstructure():
     json_dict = {
@@ -96,3 +101,87 @@ def test_weak_structure():
         "comments": [],
     }
     m = api.Market.from_json(json_dict)
+
+
+def test_probability_history():
+    # Bets arrive newest first from the API
+    bets = [make_bet(2, 300, 0.6, 0.7, "u2"), make_bet(1, 200, 0.5, 0.6), make_bet(0, 150, 0.5, 0.5)]
+    market = make_market(bets=bets, createdTime=100, probability=0.9)
+    times, probs = market.probability_history()
+    assert times.tolist() == [100, 150, 200, 300]
+    assert probs.tolist() == [0.5, 0.5, 0.6, 0.7]
+    assert market.start_probability() == 0.5
+    assert market.final_probability() == 0.7
+    assert market.num_traders() == 2
+    times, probs = market.get_updates()
+    assert times.tolist() == [150, 200, 300]
+    assert probs.tolist() == [0.5, 0.6, 0.7]
+
+
+def test_probability_history_no_bets():
+    market = make_market(bets=[], createdTime=100, probability=0.9)
+    times, probs = market.probability_history()
+    assert times.tolist() == [100]
+    assert probs.tolist() == [0.9]
+    assert market.num_traders() == 0
+
+
+def test_decoder_defaults_and_unknown_keys():
+    json = market_json(p=0.3, deleted=True, newField=1)
+    del json["resolution"]
+    api.UNKNOWN_KEYS.clear()
+    market = api.weak_structure(json, api.Market)
+    assert market.id == "c1"
+    assert market.p == 0.3
+    assert market.deleted is True
+    assert market.resolution is None
+    assert api.UNKNOWN_KEYS == {("Market", "newField"): 1}
+    bet = make_bet(0, 100, 0.5, 0.6)
+    assert api.weak_structure(api.weak_unstructure(bet), api.Bet) == bet
+    assert api.UNKNOWN_KEYS == {("Market", "newField"): 1}
+
+
+def test_unknown_keys_counted_across_threads():
+    decode = api.decoder(api.Bet)
+    json = dict(api.weak_unstructure(make_bet(0, 100, 0.5, 0.6)), newField=1)
+    api.UNKNOWN_KEYS.clear()
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda _: [decode(json) for _ in range(2000)], range(8)))
+    assert api.UNKNOWN_KEYS == {("Bet", "newField"): 16000}
+
+
+def test_lazy_market():
+    bets = [api.weak_unstructure(make_bet(0, 150, 0.5, 0.6))]
+    json = market_json(createdTime=100, probability=0.9, bets=bets)
+    del json["resolution"]
+    eager = api.Market.from_json(dict(json))
+    lazy = api.LazyMarket.from_json(dict(json))
+    assert isinstance(lazy, api.Market)
+    assert "bets" in lazy._raw
+    assert lazy.id == "c1"
+    assert lazy.resolution is None
+    assert lazy.bets == eager.bets
+    assert "bets" not in lazy._raw and "probability" in lazy._raw
+    assert lazy.probability_history()[1].tolist() == [0.5, 0.6]
+    lazy.probability = 0.2
+    assert lazy.probability == 0.2
+    assert "probability" not in lazy._raw
+    eager.probability = 0.2
+    assert api.weak_unstructure(lazy) == api.weak_unstructure(eager)
+    assert api.weak_unstructure(pickle.loads(pickle.dumps(lazy))) == api.weak_unstructure(eager)
+    assert lazy == eager and eager == lazy
+    assert lazy != api.Market.from_json(dict(json))
+    built = api.LazyMarket(**{f.name: getattr(eager, f.name) for f in api.Market.__attrs_attrs__})  # type: ignore
+    assert api.weak_unstructure(built) == api.weak_unstructure(eager)
+
+
+def test_lazy_market_pickle():
+    json = market_json(createdTime=100, probability=0.9)
+    lazy = api.LazyMarket.from_json(dict(json))
+    assert lazy.id == "c1"
+    unpickled = pickle.loads(pickle.dumps(lazy))
+    # Fields that weren't read are still raw JSON
+    assert "id" not in unpickled._raw and "probability" in unpickled._raw
+    assert unpickled == lazy == api.Market.from_json(dict(json))
+    unpickled.probability = 0.5
+    assert "probability" not in unpickled._raw
@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from manifoldpy import api, betframe
+from manifoldpy.betframe import BetFrame
+
+from helpers import bet_json
+
+
+@pytest.fixture
+def records():
+    return [
+        bet_json(0),
+        bet_json(1, isFilled=True, limitProb=0.4, fills=[{"amount": 1, "shares": 2}]),
+        bet_json(2, contract="c2", isFilled=False, isCancelled=True),
+        bet_json(3, contract="c2", user="u2", fees={"creatorFee": 0}),
+        bet_json(4, contract="c3", user="u2"),
+    ]
+
+
+def test_round_trip(records):
+    frame = BetFrame.from_json(records)
+    assert len(frame) == 5
+    expected = [api.weak_structure(r, api.Bet) for r in records]
+    assert frame.to_bets() == expected
+    assert frame[1].isFilled is True
+    assert frame[0].isFilled is None
+    assert frame[1].limitProb == 0.4
+    assert frame[0].limitProb is None
+
+
+def test_column_types(records):
+    frame = BetFrame.from_json(records)
+    assert frame.createdTime.dtype == np.int64
+    assert frame.probAfter.dtype == np.float64
+    assert frame.codes("contractId").dtype == np.int32
+    assert list(frame.categories("contractId")) == ["c1", "c2", "c3"]
+    assert list(frame.contractId) == ["c1", "c1", "c2", "c2", "c3"]
+    assert list(frame.mask("isFilled")) == [False, True, False, False, False]
+    assert frame.column("answerId").tolist() == [None] * 5
+    assert frame.column("sale").tolist() == [None] * 5
+
+
+def test_filter_sort_slice(records):
+    frame = BetFrame.from_json(records)
+    c2 = frame.where(contractId="c2")
+    assert [b.id for b in c2] == ["b002", "b003"]
+    assert len(frame.where(contractId="missing")) == 0
+    by_user = frame.sort(["userId", "createdTime"], descending=True)
+    assert list(by_user.id) == ["b004", "b003", "b002", "b001", "b000"]
+    sliced = frame[1:3]
+    assert np.shares_memory(sliced.probAfter, frame.probAfter)
+    assert sliced.to_bets() == frame.to_bets()[1:3]
+    assert frame.filter(frame.mask("isCancelled")).to_bets() == [frame[2]]
+    assert list(frame.isin("userId", ["u2"])) == [False, False, False, True, True]
+
+
+def test_concat_merges_categories(records, monkeypatch):
+    monkeypatch.setattr(betframe, "CHUNK_SIZE", 2)
+    chunked = BetFrame.from_json(iter(records))
+    whole = BetFrame.from_json(records)
+    assert chunked.to_bets() == whole.to_bets()
+    assert list(chunked.categories("userId")) == ["u1", "u2"]
+
+
+def test_from_bets(records):
+    bets = [api.weak_structure(r, api.Bet) for r in records]
+    assert BetFrame.from_bets(bets).to_bets() == bets
+
+
+def test_empty():
+    frame = BetFrame.from_json([])
+    assert len(frame) == 0
+    assert frame.to_bets() == []
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from manifoldpy import calibration
+
+from helpers import make_bet, make_market
+
+
+def test_brier_and_log():
+    probs = np.array([0.9, 0.2, 0.5])
+    outcomes = np.array([1, 0, 1])
+    assert calibration.brier_score(probs, outcomes) == pytest.approx((0.01 + 0.04 + 0.25) / 3)
+    expected_log = (np.log(0.9) + np.log(0.8) + np.log(0.5)) / 3
+    assert calibration.log_score(probs, outcomes) == pytest.approx(expected_log)
+    assert np.isfinite(calibration.log_score(np.array([0.0]), np.array([1])))
+
+
+def test_calibration_curve():
+    probs = np.array([0.05, 0.15, 0.12, 0.95, 1.0])
+    outcomes = np.array([0, 1, 0, 1, 1])
+    mean_prob, freq, counts = calibration.calibration_curve(probs, outcomes)
+    assert counts.tolist() == [1, 2, 0, 0, 0, 0, 0, 0, 0, 2]
+    assert freq[1] == 0.5
+    assert np.isnan(freq[2])
+    assert mean_prob[9] == pytest.approx(0.975)
+
+
+def test_market_set_accuracy():
+    accuracy = calibration.market_set_accuracy(np.array([0.85, 0.81]), np.array([0.82, 0.1]))
+    assert accuracy[8] == pytest.approx(2 / 3)
+    assert accuracy[1] == 0
+
+
+def resolved_market(market_id, resolution, close, bets):
+    for b in bets:
+        b.contractId = market_id
+    return make_market(
+        market_id, bets, createdTime=0, closeTime=close, resolution=resolution, probability=0.3
+    )
+
+
+def test_build_dataframe():
+    markets = [
+        resolved_market(
+            "a",
+            "YES",
+            100,
+            [make_bet(1, 60, 0.6, 0.8), make_bet(0, 10, 0.5, 0.6), make_bet(2, 150, 0.8, 0.99)],
+        ),
+        resolved_market("b", "NO", 100, []),
+        resolved_market("c", "CANCEL", None, [make_bet(3, 5, 0.4, 0.45)]),
+    ]
+    df, histories = calibration.build_dataframe(markets)
+    a, b, c = df.to_dict("records")
+    assert (a["start"], a["midpoint"], a["close"], a["final"]) == (0.5, 0.6, 0.8, 0.99)
+    assert (b["start"], b["close"]) == (0.3, 0.3)
+    assert (c["start"], c["close"], c["final"]) == (0.4, 0.45, 0.45)
+    assert df["outcome"].tolist()[:2] == [1.0, 0.0]
+    assert np.isnan(df["outcome"].tolist()[2])
+    assert "a" in histories
+
+    scores = calibration.score_points(df)
+    assert scores.loc["close", "n"] == 2
+    assert scores.loc["close", "brier"] == pytest.approx((0.2**2 + 0.3**2) / 2)
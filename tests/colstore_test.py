@@ -0,0 +1,42 @@
+import numpy as np
+
+from manifoldpy.betframe import BetFrame
+from manifoldpy.colstore import ColumnStore, write_colstore
+
+from helpers import bet_json
+
+
+def make_frame():
+    records = [
+        bet_json(i, contract=f"c{i % 3}", isFilled=i % 2 == 0, fills=[{"i": i}] if i == 4 else None)
+        for i in range(20)
+    ]
+    return BetFrame.from_json(records)
+
+
+def test_round_trip(tmp_path):
+    frame = make_frame()
+    write_colstore(frame, tmp_path)
+    store = ColumnStore(tmp_path)
+    assert len(store) == 20
+    assert list(store.market_ids) == ["c0", "c1", "c2"]
+    for market in ["c0", "c1", "c2"]:
+        expected = frame.where(contractId=market).sort("createdTime").to_bets()
+        assert store.bets(market).to_bets() == expected
+    assert store.bets("c1")[1].fills == [{"i": 4}]
+
+
+def test_views_are_memory_mapped(tmp_path):
+    write_colstore(make_frame(), tmp_path)
+    store = ColumnStore(tmp_path)
+    bets = store.bets("c2")
+    assert isinstance(bets.probAfter.base, np.memmap) or isinstance(bets.probAfter, np.memmap)
+    assert store.rows("c0") == (0, 7)
+    assert store.rows("c2") == (14, 20)
+
+
+def test_missing_market(tmp_path):
+    write_colstore(make_frame(), tmp_path)
+    store = ColumnStore(tmp_path)
+    assert "c9" not in store
+    assert len(store.bets("c9")) == 0
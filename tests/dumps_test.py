@@ -0,0 +1,80 @@
+import gzip
+import io
+import json
+import zipfile
+
+import pytest
+
+from manifoldpy import api, dumps
+from manifoldpy.store import Store
+
+from helpers import bet_json
+
+
+@pytest.fixture
+def store(tmp_path):
+    with Store(tmp_path / "test.db") as s:
+        yield s
+
+
+def test_iter_json_array_small_reads():
+    records = [bet_json(i, note="x" * i) for i in range(50)]
+    text = json.dumps(records, indent=1)
+    parsed = list(dumps.iter_json_array(io.StringIO(text), read_size=7))
+    assert parsed == records
+
+
+def test_iter_json_lines():
+    records = [bet_json(i) for i in range(5)]
+    text = "\n".join(json.dumps(r) for r in records) + "\n"
+    assert list(dumps.iter_json_array(io.StringIO(text), read_size=16)) == records
+
+
+def test_iter_json_array_truncated():
+    with pytest.raises(json.JSONDecodeError):
+        list(dumps.iter_json_array(io.StringIO('[{"id": "a"}, {"id": '), read_size=4))
+
+
+def test_iter_json_array_malformed():
+    f = io.StringIO('[{"id": "a"}, {"id": x}, ' + '{"id": "b"}, ' * 10000 + "]")
+    with pytest.raises(json.JSONDecodeError):
+        list(dumps.iter_json_array(f, read_size=16, max_record=64))
+    # Gives up without reading the rest of the stream
+    assert f.tell() < 200
+
+
+def test_load_formats(tmp_path, store):
+    records = [bet_json(i, contract=f"c{i % 2}") for i in range(10)]
+    with gzip.open(tmp_path / "manifold-dump-bets-1.json.gz", "wt") as f:
+        json.dump(records[:5], f)
+    with zipfile.ZipFile(tmp_path / "manifold-dump-bets-2.zip", "w") as z:
+        z.writestr("bets.jsonl", "\n".join(json.dumps(r) for r in records[5:]))
+    assert dumps.load_dump(tmp_path / "manifold-dump-bets-1.json.gz", store) == 5
+    assert dumps.load_dump(tmp_path / "manifold-dump-bets-2.zip", store) == 5
+    assert store.count("bets") == 10
+    c0 = store.bets(market_id="c0")
+    assert [b.id for b in c0] == ["b008", "b006", "b004", "b002", "b000"]
+    assert c0[0] == api.weak_structure(records[8], api.Bet)
+    assert len(store.bet_frame(user_id="u1")) == 10
+
+
+def test_dump_kind():
+    assert dumps.dump_kind("manifold-dump-contracts-04082023.json") == "markets"
+    assert dumps.dump_kind("bets-0.json") == "bets"
+    with pytest.raises(ValueError):
+        dumps.dump_kind("data.json")
+
+
+def test_catch_up(store, monkeypatch):
+    store.add_bets([bet_json(i) for i in range(5)])
+    live = [bet_json(i) for i in range(12, -1, -1)]
+
+    def get_bets(limit=1000, before=None):
+        start = 0 if before is None else [b["id"] for b in live].index(before) + 1
+        return live[start : start + limit]
+
+    monkeypatch.setattr(api, "_get_bets", get_bets)
+    monkeypatch.setattr(api, "_get_markets", lambda limit=1000, before=None: [])
+    assert dumps.catch_up(store) == {"bets": 8, "markets": 0}
+    assert store.count("bets") == 13
+    assert store.latest_time("bets") == 1012
@@ -0,0 +1,48 @@
+"""Builders for the bet and market records used across the tests."""
+from manifoldpy import api
+
+
+def bet_json(i: int, contract: str = "c1", user: str = "u1", **kwargs):
+    json = {
+        "id": f"b{i:03d}",
+        "contractId": contract,
+        "createdTime": 1000 + i,
+        "shares": float(i),
+        "amount": 10,
+        "probAfter": 0.5 + i / 1000,
+        "probBefore": 0.5,
+        "outcome": "YES" if i % 2 else "NO",
+        "answerId": None,
+        "userId": user,
+    }
+    json.update(kwargs)
+    return json
+
+
+def make_bet(i: int, created: int, before: float, after: float, user: str = "u1") -> api.Bet:
+    return api.Bet(
+        contractId="c1",
+        createdTime=created,
+        shares=1.0,
+        amount=1,
+        probAfter=after,
+        probBefore=before,
+        id=str(i),
+        outcome="YES",
+        answerId=None,  # type: ignore
+        userId=user,
+    )
+
+
+def market_json(market_id: str = "c1", **kwargs):
+    """JSON for a binary market, with every field not given set to None."""
+    json = {f.name: None for f in api.Market.__attrs_attrs__}  # type: ignore
+    json.update(id=market_id, outcomeType="BINARY")
+    json.update(kwargs)
+    return json
+
+
+def make_market(market_id: str = "c1", bets=None, **kwargs) -> api.Market:
+    market = api.Market.from_json(market_json(market_id, **kwargs))
+    market.bets = bets
+    return market
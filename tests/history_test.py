@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+from manifoldpy import history
+from manifoldpy.betframe import BetFrame
+
+from helpers import bet_json
+
+
+def random_frame(n_markets: int = 20, n_bets: int = 300, seed: int = 0) -> BetFrame:
+    rng = np.random.default_rng(seed)
+    records = []
+    for i in range(n_bets):
+        records.append(
+            bet_json(
+                i,
+                contract=f"m{rng.integers(n_markets):02d}",
+                createdTime=int(rng.integers(1000, 2000)),
+                probBefore=float(rng.random()),
+                probAfter=float(rng.random()),
+            )
+        )
+    return BetFrame.from_json(records)
+
+
+def test_matches_single_market():
+    frame = random_frame()
+    created = {m: 500 + i for i, m in enumerate(frame.categories("contractId"))}
+    histories = history.probability_histories(frame, created)
+    assert list(histories.market_ids) == sorted(set(frame.contractId))
+    for market_id in histories.market_ids:
+        bets = frame.where(contractId=market_id)
+        times = np.sort(bets.createdTime, kind="stable")
+        order = np.argsort(bets.createdTime, kind="stable")
+        expected_probs = np.concatenate(([bets.probBefore[order[0]]], bets.probAfter[order]))
+        t, p = histories[market_id]
+        assert t.tolist() == [created[market_id]] + times.tolist()
+        assert np.array_equal(p, expected_probs)
+
+
+def test_start_final():
+    frame = random_frame()
+    ids, start, final = history.start_final_probabilities(frame)
+    histories = history.probability_histories(frame)
+    for i, market_id in enumerate(ids):
+        _, p = histories[market_id]
+        assert start[i] == p[0]
+        assert final[i] == p[-1]
+
+
+def test_empty():
+    histories = history.probability_histories(BetFrame.from_json([]))
+    assert len(histories) == 0
+    with pytest.raises(KeyError):
+        histories["missing"]
+
+
+def step_frame() -> BetFrame:
+    # Market a: 0.5 from t=0, 0.7 from t=10, 0.1 from t=20. Market b: 0.2 from t=5, 0.4 from t=15.
+    records = [
+        bet_json(0, contract="a", createdTime=0, probBefore=0.5, probAfter=0.5),
+        bet_json(1, contract="a", createdTime=10, probBefore=0.5, probAfter=0.7),
+        bet_json(2, contract="a", createdTime=20, probBefore=0.7, probAfter=0.1),
+        bet_json(3, contract="b", createdTime=5, probBefore=0.2, probAfter=0.2),
+        bet_json(4, contract="b", createdTime=15, probBefore=0.2, probAfter=0.4),
+    ]
+    return BetFrame.from_json(records)
+
+
+def test_probability_at_last():
+    matrix = history.probability_at(step_frame(), [-1, 0, 9, 10, 25], ["b", "a", "missing"])
+    assert matrix.shape == (3, 5)
+    assert np.allclose(matrix[0], [np.nan, np.nan, 0.2, 0.2, 0.4], equal_nan=True)
+    assert np.allclose(matrix[1], [np.nan, 0.5, 0.5, 0.7, 0.1], equal_nan=True)
+    assert np.isnan(matrix[2]).all()
+
+
+def test_probability_at_twap():
+    matrix = history.probability_at(step_frame(), [10, 20, 30], method="twap")
+    # a: [0, 10] all at 0.5; [10, 20] all at 0.7; [20, 30] all at 0.1
+    assert np.allclose(matrix[0], [0.5, 0.7, 0.1])
+    # b: [5, 10] at 0.2; [10, 20] half at 0.2, half at 0.4; [20, 30] at 0.4
+    assert np.allclose(matrix[1], [0.2, 0.3, 0.4])
+
+
+def test_probability_at_twap_before_start():
+    matrix = history.probability_at(step_frame(), [2, 5, 7], ["b"], method="twap")
+    assert np.isnan(matrix[0, 0])
+    assert np.allclose(matrix[0, 1:], [0.2, 0.2])
+    with pytest.raises(ValueError):
+        history.probability_at(step_frame(), [5, 2], method="twap")
@@ -0,0 +1,25 @@
+import pytest
+
+from manifoldpy import jsonlib
+
+
+@pytest.fixture(params=list(jsonlib.BACKENDS))
+def backend(request):
+    previous = jsonlib.backend
+    yield jsonlib.set_backend(request.param)
+    jsonlib.set_backend(previous)
+
+
+def test_round_trip(backend):
+    obj = {"id": "é", "n": 2**40, "p": 0.5, "fills": [{"a": None, "b": True}]}
+    encoded = jsonlib.dumps(obj)
+    assert isinstance(encoded, bytes)
+    assert jsonlib.loads(encoded) == obj
+    assert jsonlib.loads(jsonlib.dumps_str(obj)) == obj
+    assert jsonlib.loads(bytearray(encoded)) == obj
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        jsonlib.set_backend("simdjson")
+    assert jsonlib.backend in jsonlib.BACKENDS
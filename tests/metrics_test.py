@@ -0,0 +1,57 @@
+import math
+
+import pytest
+
+from manifoldpy.metrics import LatencyHistogram, RequestEvent, Telemetry
+
+
+def test_percentiles():
+    hist = LatencyHistogram()
+    assert math.isnan(hist.percentile(0.5))
+    for ms in range(1, 101):
+        hist.record(ms / 1000)
+    assert hist.count == 100
+    assert hist.mean == pytest.approx(0.0505)
+    assert hist.percentile(0.5) == pytest.approx(0.05, rel=0.1)
+    assert hist.percentile(0.99) == pytest.approx(0.099, rel=0.1)
+    assert hist.percentile(1.0) == 0.1
+    assert hist.summary()["min"] == 0.001
+    assert str(hist).startswith("n=100 mean=50.50ms")
+
+
+def test_extremes_and_merge():
+    a, b = LatencyHistogram(), LatencyHistogram()
+    a.record(0)
+    b.record(1000)
+    a.merge(b)
+    assert a.count == 2
+    assert a.percentile(0.5) <= 1e-5
+    assert a.percentile(1.0) == 1000
+    with pytest.raises(ValueError):
+        a.merge(LatencyHistogram(buckets_per_doubling=4))
+
+
+def test_telemetry():
+    telemetry = Telemetry()
+    events = []
+    telemetry.add_hook(events.append)
+    bad_hook = lambda e: 1 / 0  # noqa: E731
+    telemetry.add_hook(bad_hook)
+    event = RequestEvent("bets", "GET", 200, None, 1, 0.05, 0, 1000)
+    with pytest.warns(UserWarning):
+        telemetry.record(event)
+    telemetry.remove_hook(bad_hook)
+    telemetry.record(RequestEvent("bets", "GET", 503, None, 3, 1.5, 0, 10))
+    telemetry.record(RequestEvent("bet", "POST", None, "ConnectionError", 1, 0.01, 50, 0))
+    telemetry.record_decode("bets", 0.002)
+    assert events[0] is event and len(events) == 3
+    bets = telemetry.stats["bets"]
+    assert (bets.requests, bets.errors, bets.retries) == (2, 1, 2)
+    assert bets.statuses == {200: 1, 503: 1}
+    assert bets.bytes_received == 1010
+    assert bets.decode.count == 1
+    assert telemetry.stats["bet"].bytes_sent == 50
+    lines = telemetry.snapshot().splitlines()
+    assert lines[1].startswith("endpoint")
+    assert lines[2].startswith("bets ") and lines[2].endswith("200:1,503:1")
+    assert lines[3].startswith("bet ")
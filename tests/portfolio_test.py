@@ -0,0 +1,122 @@
+import numpy as np
+import pytest
+
+from manifoldpy import portfolio
+from manifoldpy.betframe import BetFrame
+
+from helpers import bet_json, make_market
+
+
+def trade(i, amount, shares, outcome="YES", **kwargs):
+    return bet_json(i, amount=amount, shares=shares, outcome=outcome, **kwargs)
+
+
+def reference(bets, price):
+    """Average cost accounting, one bet at a time."""
+    held, cost, invested, proceeds, realized = 0.0, 0.0, 0.0, 0.0, 0.0
+    for b in sorted(bets, key=lambda b: b["createdTime"]):
+        if b["shares"] > 0:
+            held += b["shares"]
+            cost += b["amount"]
+            invested += b["amount"]
+        elif b["shares"] < 0:
+            sold_cost = cost * -b["shares"] / held
+            held += b["shares"]
+            cost -= sold_cost
+            proceeds -= b["amount"]
+            realized += -b["amount"] - sold_cost
+    return held, cost, invested, proceeds, realized, held * price
+
+
+def test_market_probabilities():
+    resolutions = [("b", "YES", None), ("c", "NO", None), ("d", "MKT", 0.6), ("e", "CANCEL", None)]
+    markets = [make_market("a", probability=0.3, isResolved=False)] + [
+        make_market(m, probability=0.3, isResolved=True, resolution=r, resolutionProbability=p)
+        for m, r, p in resolutions
+    ]
+    assert portfolio.market_probabilities(markets) == {"a": 0.3, "b": 1.0, "c": 0.0, "d": 0.6}
+
+
+def test_positions():
+    records = [
+        # u1 buys YES twice, sells a quarter at a profit, and buys again
+        trade(0, 10, 20),
+        trade(1, 30, 20),
+        trade(2, -15, -10),
+        trade(3, 5, 10),
+        # u1 closes a NO position, then opens a new one
+        trade(4, 10, 10, "NO"),
+        trade(5, -12, -10, "NO"),
+        trade(6, 8, 16, "NO"),
+        # An unfilled limit order
+        trade(7, 0, 0, limitProb=0.1, isFilled=False),
+        trade(8, 10, 25, contract="c2", user="u2"),
+    ]
+    df = portfolio.positions(BetFrame.from_json(records[::-1]), {"c1": 0.5, "c2": 1.0})
+    assert list(df[["userId", "contractId", "outcome"]].itertuples(index=False, name=None)) == [
+        ("u1", "c1", "NO"),
+        ("u1", "c1", "YES"),
+        ("u2", "c2", "YES"),
+    ]
+    assert df["answerId"].isna().all()
+    expected = {
+        "shares": [16, 40, 25],
+        "invested": [18, 45, 10],
+        "proceeds": [12, 15, 0],
+        "cost_basis": [8, 35, 10],
+        "realized": [2, 5, 0],
+        "value": [8, 20, 25],
+        "unrealized": [0, -15, 15],
+        "pnl": [2, -10, 15],
+    }
+    for column, values in expected.items():
+        np.testing.assert_allclose(df[column], values, err_msg=column)
+
+    by_market = portfolio.market_pnl(df)
+    assert list(by_market["contractId"]) == ["c1", "c2"]
+    np.testing.assert_allclose(by_market["pnl"], [-8, 15])
+    totals = portfolio.totals(df)
+    assert list(totals["userId"]) == ["u1", "u2"]
+    np.testing.assert_allclose(totals["realized"], [7, 0])
+    np.testing.assert_allclose(totals["unrealized"], [-15, 15])
+
+
+def test_positions_match_reference():
+    rng = np.random.default_rng(0)
+    records = []
+    held = {}
+    for i in range(3000):
+        key = (f"u{rng.integers(5)}", f"c{rng.integers(4)}", ["YES", "NO"][rng.integers(2)])
+        current = held.get(key, 0.0)
+        if current > 0 and rng.random() < 0.4:
+            sold = current if rng.random() < 0.2 else current * rng.random()
+            amount, shares = -sold * rng.uniform(0.2, 0.8), -sold
+        else:
+            shares = rng.uniform(1, 100)
+            amount = shares * rng.uniform(0.2, 0.8)
+        held[key] = current + shares
+        records.append(trade(i, amount, shares, key[2], user=key[0], contract=key[1]))
+    probabilities = {f"c{i}": p for i, p in enumerate(rng.random(4))}
+    df = portfolio.positions(BetFrame.from_json(records), probabilities)
+    assert len(df) == len(held)
+    for row in df.itertuples():
+        bets = [
+            b
+            for b in records
+            if (b["userId"], b["contractId"], b["outcome"]) == (row.userId, row.contractId, row.outcome)
+        ]
+        p = probabilities[row.contractId]
+        price = p if row.outcome == "YES" else 1 - p
+        shares, cost, invested, proceeds, realized, value = reference(bets, price)
+        assert row.shares == pytest.approx(shares, abs=1e-6)
+        assert row.cost_basis == pytest.approx(cost, rel=1e-9, abs=1e-6)
+        assert row.invested == pytest.approx(invested)
+        assert row.proceeds == pytest.approx(proceeds)
+        assert row.realized == pytest.approx(realized, rel=1e-9, abs=1e-6)
+        assert row.value == pytest.approx(value, rel=1e-9, abs=1e-6)
+
+
+def test_positions_empty():
+    df = portfolio.positions(BetFrame.empty(), {})
+    assert len(df) == 0
+    assert list(df.columns) == list(portfolio.KEYS + portfolio.VALUES)
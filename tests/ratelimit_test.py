@@ -0,0 +1,55 @@
+import multiprocessing
+import threading
+import time
+
+import pytest
+
+from manifoldpy import ratelimit
+
+
+def test_bucket_burst_then_rate():
+    bucket = ratelimit.TokenBucket(rate=100, burst=5)
+    assert [bucket.reserve() for _ in range(5)] == [0] * 5
+    assert bucket.reserve() == pytest.approx(0.01, abs=2e-3)
+    assert bucket.reserve() == pytest.approx(0.02, abs=2e-3)
+
+
+def test_bucket_threads():
+    bucket = ratelimit.TokenBucket(rate=200, burst=1)
+
+    def work():
+        for _ in range(10):
+            bucket.acquire()
+
+    start = time.monotonic()
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert time.monotonic() - start >= 39 / 200
+
+
+def _reserve_many(path, n, out):
+    bucket = ratelimit.FileTokenBucket(path, rate=0.01, burst=5)
+    out.put(sum(bucket.reserve() == 0 for _ in range(n)))
+    bucket.close()
+
+
+def test_file_bucket_shared_between_processes(tmp_path):
+    path = tmp_path / "limits" / "total.bucket"
+    ctx = multiprocessing.get_context("fork")
+    out = ctx.Queue()
+    procs = [ctx.Process(target=_reserve_many, args=(path, 4, out)) for _ in range(2)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+    assert out.get() + out.get() == 5
+
+
+def test_limiter_endpoint_budget(tmp_path):
+    limiter = ratelimit.RateLimiter(rate=1000, burst=10, endpoints={"bets": (10, 1)}, path=tmp_path)
+    assert limiter.reserve("bets") == 0
+    assert limiter.reserve("markets") == 0
+    assert limiter.reserve("bets") == pytest.approx(0.1, abs=0.01)
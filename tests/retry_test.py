@@ -0,0 +1,75 @@
+import threading
+import time
+from email.utils import formatdate
+
+import requests
+
+from manifoldpy.retry import AdaptiveLimit, RetryPolicy, retry_after
+
+
+def response(status: int, **headers: str) -> requests.Response:
+    resp = requests.Response()
+    resp.status_code = status
+    resp.headers.update(headers)
+    return resp
+
+
+def test_retry_after():
+    assert retry_after(response(429, **{"Retry-After": "3"})) == 3
+    assert 8 < retry_after(response(503, **{"Retry-After": formatdate(time.time() + 10)})) <= 10  # type: ignore
+    assert retry_after(response(503, **{"Retry-After": "soon"})) is None
+    assert retry_after(response(503)) is None
+
+
+def test_should_retry():
+    policy = RetryPolicy(max_attempts=3)
+    assert policy.should_retry(response(503), 1, idempotent=True)
+    assert not policy.should_retry(response(503), 3, idempotent=True)
+    assert not policy.should_retry(response(404), 1, idempotent=True)
+    assert policy.should_retry(requests.ReadTimeout(), 1, idempotent=True)
+    # Non-idempotent requests are never retried by default...
+    assert not policy.should_retry(response(429), 1, idempotent=False)
+    assert not policy.should_retry(requests.ConnectTimeout(), 1, idempotent=False)
+    # ...and only when the server can't have acted on them if opted in
+    unsafe = RetryPolicy(retry_unsafe=True)
+    assert unsafe.should_retry(response(429), 1, idempotent=False)
+    assert unsafe.should_retry(requests.ConnectTimeout(), 1, idempotent=False)
+    assert not unsafe.should_retry(response(503), 1, idempotent=False)
+    assert not unsafe.should_retry(requests.ReadTimeout(), 1, idempotent=False)
+
+
+def test_delay():
+    policy = RetryPolicy(backoff=1, max_backoff=5, jitter=False)
+    assert [policy.delay(response(503), n) for n in range(1, 5)] == [1, 2, 4, 5]
+    assert policy.delay(response(429, **{"Retry-After": "2"}), 4) == 2
+    assert policy.delay(response(429, **{"Retry-After": "60"}), 1) == 5
+    jittered = RetryPolicy(backoff=1)
+    assert all(0 <= jittered.delay(requests.ConnectionError(), 3) <= 4 for _ in range(20))
+
+
+def test_adaptive_limit():
+    limit = AdaptiveLimit(initial=4, minimum=1, maximum=6)
+    tickets = [limit.acquire() for _ in range(4)]
+    for t in tickets:
+        limit.release(t, ok=True)
+    assert 4.9 < limit.limit < 5
+    # Failures from requests sent in the same round only cut once
+    tickets = [limit.acquire() for _ in range(4)]
+    for t in tickets:
+        limit.release(t, ok=False)
+    assert 2.4 < limit.limit < 2.5
+    for _ in range(100):
+        limit.release(limit.acquire(), ok=True)
+    assert limit.limit == 6
+
+
+def test_adaptive_limit_blocks():
+    limit = AdaptiveLimit(initial=1)
+    ticket = limit.acquire()
+    acquired = threading.Event()
+    thread = threading.Thread(target=lambda: acquired.set() if limit.acquire() else None)
+    thread.start()
+    assert not acquired.wait(0.05)
+    limit.release(ticket, ok=True)
+    assert acquired.wait(1)
+    thread.join()
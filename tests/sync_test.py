@@ -0,0 +1,141 @@
+"""Tests of incremental market syncing, with the API replaced by fakes."""
+import json
+
+from manifoldpy import api, sync
+from manifoldpy.store import Store
+
+from helpers import bet_json, make_market
+
+
+def fake_api(monkeypatch, remote):
+    fetched = []
+
+    def get_full_markets(ids, max_workers=8):
+        for i in ids:
+            fetched.append(i)
+            market = remote[i]
+            market.bets = []
+            market.comments = []
+            yield market
+
+    monkeypatch.setattr(api, "iter_markets", lambda: iter(list(remote.values())))
+    monkeypatch.setattr(api, "get_full_markets", get_full_markets)
+    return fetched
+
+
+def test_sync_only_fetches_changed(monkeypatch, tmp_path):
+    path = tmp_path / "markets.pkl"
+    remote = {"a": make_market("a", lastUpdatedTime=1), "b": make_market("b", lastUpdatedTime=1)}
+    fetched = fake_api(monkeypatch, remote)
+    sync.sync(path)
+    assert sorted(fetched) == ["a", "b"]
+
+    remote = {m: make_market(m, lastUpdatedTime=t) for m, t in (("a", 1), ("b", 2), ("c", 1))}
+    fetched = fake_api(monkeypatch, remote)
+    markets = sync.sync(path)
+    assert sorted(fetched) == ["b", "c"]
+    assert markets["b"].lastUpdatedTime == 2
+    assert sync.load_markets(path).keys() == {"a", "b", "c"}
+
+
+def test_sync_resumes(monkeypatch, tmp_path):
+    path = tmp_path / "markets.pkl"
+    remote = {str(i): make_market(str(i), lastUpdatedTime=1) for i in range(5)}
+    fake_api(monkeypatch, remote)
+
+    real_append = sync.append_markets
+    saves = []
+
+    def crashing_append(markets, path):
+        real_append(markets, path)
+        saves.append(len(markets))
+        if len(saves) == 2:
+            raise KeyboardInterrupt
+
+    monkeypatch.setattr(sync, "append_markets", crashing_append)
+    try:
+        sync.sync(path, checkpoint_every=2)
+    except KeyboardInterrupt:
+        pass
+    # Each checkpoint only holds the markets fetched since the last one
+    assert saves == [2, 2]
+    assert not path.exists()
+
+    monkeypatch.setattr(sync, "append_markets", real_append)
+    fetched = fake_api(monkeypatch, remote)
+    sync.sync(path)
+    assert len(fetched) == 1
+    assert len(sync.load_markets(path)) == 5
+    assert not path.with_suffix(".pkl.log").exists()
+
+
+def test_load_markets_ignores_cut_short_checkpoint(tmp_path):
+    path = tmp_path / "markets.pkl"
+    sync.save_markets({"a": make_market("a", lastUpdatedTime=1)}, path)
+    sync.append_markets({"b": make_market("b", lastUpdatedTime=1)}, path)
+    sync.append_markets({"c": make_market("c", lastUpdatedTime=1)}, path)
+    log = path.with_suffix(".pkl.log")
+    log.write_bytes(log.read_bytes()[:-10])
+    assert sync.load_markets(path).keys() == {"a", "b"}
+
+
+def test_export_json(tmp_path):
+    path = tmp_path / "markets.json"
+    sync.export_json({"a": make_market("a", lastUpdatedTime=1)}, path)
+    assert [m["id"] for m in json.loads(path.read_text())] == ["a"]
+
+
+def fake_bets(monkeypatch, live):
+    requests = []
+
+    def get_bets(marketId=None, limit=1000, before=None, kinds=None):
+        requests.append((limit, before, kinds))
+        bets = [b for b in live if kinds is None or (b.get("limitProb") and not b.get("isFilled"))]
+        bets = [b for b in bets if not b.get("isCancelled") or kinds is None]
+        start = 0 if before is None else [b["id"] for b in bets].index(before) + 1
+        return bets[start : start + limit]
+
+    monkeypatch.setattr(api, "_get_bets", get_bets)
+    return requests
+
+
+def test_sync_bets(monkeypatch, tmp_path):
+    live = [bet_json(i) for i in range(49, -1, -1)]
+    live[40] = bet_json(9, limitProb=0.4, isFilled=False)
+    live[30] = bet_json(19, limitProb=0.4, isFilled=False)
+    live[20] = bet_json(29, limitProb=0.4, isFilled=False)
+    requests = fake_bets(monkeypatch, live)
+    with Store(tmp_path / "test.db") as store:
+        assert sync.sync_bets(store, "c1", first_page=4) == {"new": 50, "changed": 0}
+        assert requests[-1] == (32, "b022", None)
+        assert store.open_orders("c1").keys() == {"b009", "b019", "b029"}
+
+        # Nothing new: one small request for the tail, one for open orders
+        requests.clear()
+        assert sync.sync_bets(store, "c1", first_page=4) == {"new": 0, "changed": 0}
+        assert requests == [(4, None, "open-limit"), (4, None, None)]
+
+        # Two new bets, one order partly filled and one filled
+        live[30] = bet_json(19, limitProb=0.4, isFilled=False, fills=[{"amount": 5}])
+        live[40] = bet_json(9, limitProb=0.4, isFilled=True)
+        live[:0] = [bet_json(51), bet_json(50)]
+        requests.clear()
+        assert sync.sync_bets(store, "c1", first_page=4) == {"new": 2, "changed": 2}
+        # The tail is only followed back to the filled order
+        assert requests[-1] == (32, "b024", None)
+        assert store.count("bets") == 52
+        assert store.latest_bet("c1")["id"] == "b051"
+        assert store.open_orders("c1").keys() == {"b019", "b029"}
+        assert store.bets("c1")[32].fills == [{"amount": 5}]
+
+
+def test_sync_bets_same_time(monkeypatch, tmp_path):
+    live = [bet_json(i, createdTime=2000) for i in (10, 11, 12)] + [bet_json(i) for i in range(3, 0, -1)]
+    fake_bets(monkeypatch, live)
+    with Store(tmp_path / "test.db") as store:
+        assert sync.sync_bets(store, "c1") == {"new": 6, "changed": 0}
+        # The bets tied with the newest stored one aren't new, whatever order they come back in
+        live[:3] = [live[1], live[0], live[2]]
+        live[:0] = [bet_json(13, createdTime=2000)]
+        assert sync.sync_bets(store, "c1") == {"new": 1, "changed": 0}
+        assert store.count("bets") == 7